@@ -31,6 +31,7 @@ def main():
     ## Available Strategies
     
     - **Calendar Spread**: Analyze and backtest calendar spread strategies for NSE futures
+    - **Pattern Screener**: Scan every stock of an index for candlestick patterns
     - More strategies coming soon!
     
     ## How to Use
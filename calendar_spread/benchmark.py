@@ -0,0 +1,468 @@
+"""
+End-to-end benchmark of the calendar spread universe scan.
+
+Runs the scan of ``pages/01_spread.py`` (continuous table update, backtest
+and signal for every stock) against ``nse_replay`` recordings served from
+this process, in up to three modes:
+
+- cold: empty futures cache and continuous store, so every expiry is
+  fetched, parsed and written
+- warm: the caches left by the cold run, as in a second app session
+- rebuild: warm futures cache but no stored continuous tables, so every
+  table is rebuilt from the cached expiries
+
+Stage times come from ``calendar_spread.timing``; time spent outside the
+instrumented stages is reported as 'other'. Peak Python memory of each mode
+is traced with tracemalloc, which also slows the scan down, so a report is
+only compared with a baseline made the same way. When the recordings have
+no universe yet they are seeded from the futures cache first.
+
+Usage:
+    python -m calendar_spread.benchmark --limit 50
+    python -m calendar_spread.benchmark --save-baseline
+    python -m calendar_spread.benchmark --compare
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from calendar_spread import market_calendar, timing
+from calendar_spread.continuous_store import ContinuousStore
+from calendar_spread.fetch_log import FetchLog
+from calendar_spread.futures_cache import CACHE_DIR, FuturesCache
+from calendar_spread.futures_data import backtest_calendar_spread, spread_signal
+from calendar_spread.http_cache import ResponseCache
+from calendar_spread.nse_api import NSE_DATE_FORMAT, NSEDataFetcher, NSESession
+from calendar_spread.nse_replay import (
+    HISTORICAL_PATH,
+    RECORDINGS_DIR,
+    Faults,
+    RecordingStore,
+    ReplayServer,
+    record_body,
+    seed_from_cache,
+)
+
+BENCHMARK_DIR = Path(__file__).parent / "benchmarks"
+REPORT_PATH = BENCHMARK_DIR / "latest.json"
+BASELINE_PATH = BENCHMARK_DIR / "baseline.json"
+
+MODES = ("cold", "warm", "rebuild")
+STAGES = (
+    "fetch",
+    "parse",
+    "cache_read",
+    "cache_write",
+    "build",
+    "backtest",
+    "signal",
+)
+UNIVERSE_PATH = "/api/underlying-information"
+
+# Slowdowns smaller than these are noise, whatever the ratio
+MIN_SECONDS = 0.05
+MIN_BYTES = 1024**2
+
+
+def latest_session(recordings: RecordingStore) -> Optional[date]:
+    """Latest trading day in the recorded historical futures responses."""
+    latest = None
+    for path in recordings.directory.glob("*.json"):
+        with open(path, "r") as f:
+            record = json.load(f)
+        if not record["key"].startswith(HISTORICAL_PATH):
+            continue
+        for row in json.loads(record_body(record)).get("data", []):
+            day = datetime.strptime(row["FH_TIMESTAMP"], NSE_DATE_FORMAT).date()
+            if latest is None or day > latest:
+                latest = day
+    return latest
+
+
+@contextlib.contextmanager
+def replay_session(url: str) -> Iterator[None]:
+    """Point new NSE sessions at a replay server for the block."""
+    saved = NSESession.BASE_URL, NSESession.COOKIE_WAIT, NSESession._instance
+    NSESession.BASE_URL = url
+    # Replay sets its cookies at once, so skip the wait meant for NSE
+    NSESession.COOKIE_WAIT = 0
+    NSESession._instance = None
+    try:
+        yield
+    finally:
+        (
+            NSESession.BASE_URL,
+            NSESession.COOKIE_WAIT,
+            NSESession._instance,
+        ) = saved
+
+
+def scan(
+    fetcher: NSEDataFetcher,
+    store: ContinuousStore,
+    now: datetime,
+    symbols: Optional[Iterable[str]] = None,
+    limit: Optional[int] = None,
+    spread_column: str = "Spread",
+) -> Dict[str, object]:
+    """
+    Scan the universe the way the spread page does.
+
+    Returns:
+        dict: Counts of symbols, tables, rows, trades and signals, for
+            checking that compared runs did the same work
+    """
+    stocks = [
+        stock["symbol"] for stock in fetcher.get_underlying_info()["stocks"]
+    ]
+    if symbols:
+        wanted = set(symbols)
+        stocks = [symbol for symbol in stocks if symbol in wanted]
+    stocks = stocks[:limit]
+
+    summary = {"symbols": len(stocks), "tables": 0, "rows": 0, "trades": 0}
+    signals = Counter()
+    for symbol in stocks:
+        continuous_df = store.update(
+            symbol, use_cache_for_future=False, now=now
+        )
+        if continuous_df.empty:
+            continue
+        summary["tables"] += 1
+        summary["rows"] += len(continuous_df)
+
+        with timing.stage("backtest"):
+            backtest_df, trades_df = backtest_calendar_spread(
+                continuous_df, spread_column
+            )
+        if trades_df.empty:
+            continue
+        summary["trades"] += len(trades_df)
+
+        with timing.stage("signal"):
+            signal = spread_signal(backtest_df, trades_df, spread_column)
+        signals[signal.split(" ")[0]] += 1
+    with timing.stage("cache_write"):
+        fetcher.futures_cache.flush_stats()
+    summary["signals"] = dict(sorted(signals.items()))
+    return summary
+
+
+def run_mode(
+    mode: str,
+    workdir: Path,
+    server_url: str,
+    now: datetime,
+    trace_memory: bool = True,
+    **scan_args,
+) -> Dict[str, object]:
+    """
+    Prepare the caches for a mode, scan and collect the measurements.
+
+    Args:
+        mode: One of ``MODES``
+        workdir: Directory holding the caches across modes
+        server_url: Replay server to fetch from
+        now: Moment the scan runs at
+        trace_memory: Record peak memory with tracemalloc
+        **scan_args: Passed on to ``scan``
+    """
+    if mode == "cold" and workdir.exists():
+        shutil.rmtree(workdir)
+    elif mode == "rebuild":
+        shutil.rmtree(workdir / "continuous", ignore_errors=True)
+    workdir.mkdir(parents=True, exist_ok=True)
+
+    fetcher = NSEDataFetcher(
+        ResponseCache(workdir / "http_cache.sqlite"),
+        FetchLog(workdir / "http_cache.sqlite"),
+    )
+    fetcher.CACHE_DIR = workdir / "futures"
+    fetcher.BASE_URL = server_url
+    store = ContinuousStore(workdir / "continuous", fetcher)
+
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    with timing.record() as times:
+        summary = scan(fetcher, store, now, **scan_args)
+    seconds = time.perf_counter() - start
+    peak = None
+    if trace_memory:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    stages = times.as_dict()
+    stages["other"] = {
+        "seconds": seconds - sum(stage["seconds"] for stage in stages.values()),
+        "calls": 0,
+    }
+    return {
+        "seconds": seconds,
+        "peak_memory_bytes": peak,
+        "stages": stages,
+        **summary,
+    }
+
+
+def run_benchmark(
+    recordings: RecordingStore,
+    modes: Iterable[str] = MODES,
+    as_of: Optional[date] = None,
+    faults: Optional[Faults] = None,
+    trace_memory: bool = True,
+    workdir: Optional[Path] = None,
+    verbose: bool = False,
+    **scan_args,
+) -> Dict[str, object]:
+    """
+    Benchmark the scan in each mode against a replay of the recordings.
+
+    Args:
+        recordings: Replay data, seeded from the futures cache if it has no
+            universe
+        modes: Modes to run, in order; warm and rebuild need a cold run
+            before them in the same ``workdir``
+        as_of: Day the scan runs after the close of, default the latest
+            recorded session
+        faults: Latency and errors of the replay server
+        trace_memory: Record peak memory with tracemalloc
+        workdir: Cache directory, default a temporary one
+        verbose: Keep the scan's console output
+        **scan_args: 'symbols', 'limit' and 'spread_column' of ``scan``
+
+    Returns:
+        dict: The report
+    """
+    if recordings.get(UNIVERSE_PATH) is None:
+        print(f"Seeding {recordings.directory} from the futures cache")
+        seed_from_cache(recordings, FuturesCache(CACHE_DIR, track_reads=False))
+    as_of = as_of or latest_session(recordings)
+    now = market_calendar.publish_time(as_of)
+
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "as_of": as_of.isoformat(),
+        "memory_traced": trace_memory,
+        "replay": {
+            "latency": faults.latency if faults else 0.0,
+            "error_rate": faults.error_rate if faults else 0.0,
+        },
+        "modes": {},
+    }
+    server = ReplayServer(recordings, faults).start()
+    with contextlib.ExitStack() as stack:
+        stack.callback(server.stop)
+        if workdir is None:
+            workdir = Path(stack.enter_context(tempfile.TemporaryDirectory()))
+        stack.enter_context(replay_session(server.url))
+        for mode in modes:
+            print(f"Running {mode} scan...")
+            with contextlib.ExitStack() as output:
+                if not verbose:
+                    output.enter_context(
+                        contextlib.redirect_stdout(io.StringIO())
+                    )
+                result = run_mode(
+                    mode,
+                    Path(workdir),
+                    server.url,
+                    now,
+                    trace_memory,
+                    **scan_args,
+                )
+            report["modes"][mode] = result
+    return report
+
+
+def compare(
+    report: dict,
+    baseline: dict,
+    tolerance: float = 0.25,
+    min_seconds: float = MIN_SECONDS,
+    min_bytes: int = MIN_BYTES,
+) -> List[Dict[str, object]]:
+    """
+    Compare the times and memory of a report with a baseline.
+
+    A metric regressed when it grew by more than ``tolerance`` and by more
+    than the noise floor (``min_seconds`` or ``min_bytes``).
+
+    Returns:
+        list: One row per metric present in both, with a 'regressed' flag
+    """
+    rows = []
+    for mode, result in report["modes"].items():
+        base = baseline.get("modes", {}).get(mode)
+        if base is None:
+            continue
+        metrics = [("total", result["seconds"], base["seconds"], min_seconds)]
+        for stage in (*STAGES, "other"):
+            if stage in result["stages"] and stage in base["stages"]:
+                metrics.append(
+                    (
+                        stage,
+                        result["stages"][stage]["seconds"],
+                        base["stages"][stage]["seconds"],
+                        min_seconds,
+                    )
+                )
+        if result["peak_memory_bytes"] and base["peak_memory_bytes"]:
+            metrics.append(
+                (
+                    "peak_memory",
+                    result["peak_memory_bytes"],
+                    base["peak_memory_bytes"],
+                    min_bytes,
+                )
+            )
+        for metric, current, previous, floor in metrics:
+            rows.append(
+                {
+                    "mode": mode,
+                    "metric": metric,
+                    "baseline": previous,
+                    "current": current,
+                    "ratio": current / previous if previous else None,
+                    "regressed": current > previous * (1 + tolerance)
+                    and current - previous > floor,
+                }
+            )
+    return rows
+
+
+def workload_mismatch(report: dict, baseline: dict) -> List[str]:
+    """Ways the report's workload differs from the baseline's."""
+    problems = []
+    for key in ("as_of", "memory_traced", "replay"):
+        if report.get(key) != baseline.get(key):
+            problems.append(f"{key}: {baseline.get(key)} -> {report.get(key)}")
+    for mode, result in report["modes"].items():
+        base = baseline.get("modes", {}).get(mode, {})
+        for key in ("symbols", "tables", "rows"):
+            if key in base and result[key] != base[key]:
+                problems.append(f"{mode} {key}: {base[key]} -> {result[key]}")
+    return problems
+
+
+def print_report(report: dict) -> None:
+    stages = (*STAGES, "other")
+    print(f"{'mode':<8} {'total':>8} " + " ".join(f"{s:>11}" for s in stages))
+    for mode, result in report["modes"].items():
+        times = " ".join(
+            f"{result['stages'].get(stage, {}).get('seconds', 0.0):>11.3f}"
+            for stage in stages
+        )
+        print(f"{mode:<8} {result['seconds']:>8.3f} {times}")
+    for mode, result in report["modes"].items():
+        peak = result["peak_memory_bytes"]
+        memory = f", peak {peak / 1024**2:.1f} MB" if peak else ""
+        print(
+            f"{mode}: {result['tables']}/{result['symbols']} tables, "
+            f"{result['rows']} rows, {result['trades']} trades, "
+            f"signals {result['signals']}{memory}"
+        )
+
+
+def print_comparison(rows: List[Dict[str, object]]) -> None:
+    for row in rows:
+        ratio = f"{row['ratio']:.2f}x" if row["ratio"] is not None else "-"
+        flag = "  REGRESSED" if row["regressed"] else ""
+        print(
+            f"{row['mode']:<8} {row['metric']:<12} {row['baseline']:>14.3f} "
+            f"-> {row['current']:>14.3f} {ratio:>7}{flag}"
+        )
+
+
+def _write_json(path: Path, data: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the spread scan")
+    parser.add_argument(
+        "--recordings", default=str(RECORDINGS_DIR), help="Replay data"
+    )
+    parser.add_argument("--symbols", nargs="+", help="Default: the universe")
+    parser.add_argument("--limit", type=int, help="Scan the first N symbols")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=MODES)
+    parser.add_argument("--spread", default="Spread", help="Spread to trade")
+    parser.add_argument(
+        "--as-of",
+        type=date.fromisoformat,
+        help="Scan day (YYYY-MM-DD), default the latest recorded session",
+    )
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--no-memory", action="store_true", help="Skip tracemalloc"
+    )
+    parser.add_argument("--workdir", help="Cache directory, default temporary")
+    parser.add_argument("--report", default=str(REPORT_PATH))
+    parser.add_argument("--baseline", default=str(BASELINE_PATH))
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Also store the report as the baseline",
+    )
+    parser.add_argument(
+        "--compare",
+        action="store_true",
+        help="Compare with the baseline, exit 1 on regressions",
+    )
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    report = run_benchmark(
+        RecordingStore(Path(args.recordings)),
+        modes=args.modes,
+        as_of=args.as_of,
+        faults=Faults(latency=args.latency, error_rate=args.error_rate, seed=0),
+        trace_memory=not args.no_memory,
+        workdir=Path(args.workdir) if args.workdir else None,
+        verbose=args.verbose,
+        symbols=args.symbols,
+        limit=args.limit,
+        spread_column=args.spread,
+    )
+    print_report(report)
+    _write_json(Path(args.report), report)
+    print(f"Report written to {args.report}")
+    if args.save_baseline:
+        _write_json(Path(args.baseline), report)
+        print(f"Baseline written to {args.baseline}")
+
+    if args.compare:
+        try:
+            with open(args.baseline, "r") as f:
+                baseline = json.load(f)
+        except FileNotFoundError:
+            print(f"No baseline at {args.baseline}, run with --save-baseline")
+            sys.exit(1)
+        for problem in workload_mismatch(report, baseline):
+            print(f"Warning: workload differs from the baseline, {problem}")
+        rows = compare(report, baseline, args.tolerance)
+        print_comparison(rows)
+        if any(row["regressed"] for row in rows):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
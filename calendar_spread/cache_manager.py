@@ -0,0 +1,238 @@
+"""
+Size budget, retention and compaction for the futures data cache.
+
+``prune`` first drops expiries older than the retention window, then evicts
+the least recently read entries until the cache fits the byte budget.
+Entries never read since read tracking started count as read when they
+were last written. A legacy ``<SYMBOL>.json`` file is evicted as a whole;
+``compact`` splits it into per-expiry files first.
+
+Usage:
+    python -m calendar_spread.cache_manager report
+    python -m calendar_spread.cache_manager prune --budget 200MB --retention-months 12
+    python -m calendar_spread.cache_manager compact [SYMBOL ...]
+"""
+
+import argparse
+import re
+from datetime import date
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+import numpy as np
+
+from calendar_spread.expiry_calendar import parse_expiry
+from calendar_spread.futures_cache import CACHE_DIR, FuturesCache
+from calendar_spread.nse_api import parse_futures_frame
+
+SIZE_UNITS = {"": 1, "B": 1, "KB": 1024, "MB": 1024**2, "GB": 1024**3}
+
+
+class CachedFile(NamedTuple):
+    symbol: str
+    # None for a legacy <SYMBOL>.json holding many expiries
+    expiry: Optional[str]
+    path: Path
+    size: int
+    # Last read time, or the modification time if never read
+    last_used: float
+
+
+def parse_size(text: str) -> int:
+    """Parse a byte count such as '500MB', '1.5GB' or '1048576'."""
+    match = re.fullmatch(r"\s*([\d.]+)\s*([KMG]?B?)\s*", text.upper())
+    if not match:
+        raise ValueError(f"Invalid size: {text}")
+    return int(float(match.group(1)) * SIZE_UNITS[match.group(2)])
+
+
+def format_size(size: float) -> str:
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def cached_files(cache: FuturesCache) -> List[CachedFile]:
+    """Every data file in the cache with its size and last use."""
+    last_reads = cache.stats.last_reads() if cache.stats else {}
+    files = []
+    for symbol in cache.symbols():
+        legacy = cache.legacy_path(symbol)
+        if legacy.exists():
+            stat = legacy.stat()
+            reads = [ts for (s, _), ts in last_reads.items() if s == symbol]
+            last_used = max([stat.st_mtime, *reads])
+            files.append(
+                CachedFile(symbol, None, legacy, stat.st_size, last_used)
+            )
+        symbol_dir = cache.symbol_dir(symbol)
+        if not symbol_dir.exists():
+            continue
+        for path in symbol_dir.glob("*.json"):
+            stat = path.stat()
+            last_used = last_reads.get((symbol, path.stem), stat.st_mtime)
+            files.append(
+                CachedFile(symbol, path.stem, path, stat.st_size, last_used)
+            )
+    return files
+
+
+def expired(
+    files: Iterable[CachedFile], retention_months: int, today: date
+) -> List[CachedFile]:
+    """Expiry files of contracts that expired over N months ago."""
+    cutoff = (
+        (np.datetime64(today, "M") - retention_months)
+        .astype("datetime64[D]")
+        .astype(date)
+    )
+    return [f for f in files if f.expiry and parse_expiry(f.expiry) < cutoff]
+
+
+def least_recently_used(
+    files: Iterable[CachedFile], budget: int
+) -> List[CachedFile]:
+    """Files to evict, least recently used first, to fit in ``budget``."""
+    files = sorted(files, key=lambda f: f.last_used)
+    excess = sum(f.size for f in files) - budget
+    evict = []
+    for f in files:
+        if excess <= 0:
+            break
+        evict.append(f)
+        excess -= f.size
+    return evict
+
+
+def evict(cache: FuturesCache, files: Iterable[CachedFile]) -> int:
+    """Delete cached files and count them as evictions. Returns bytes."""
+    freed = 0
+    keys = []
+    for f in files:
+        if f.expiry is None:
+            keys.extend(
+                (f.symbol, expiry)
+                for expiry in cache.expiries(f.symbol)
+                if not cache.path(f.symbol, expiry).exists()
+            )
+        else:
+            keys.append((f.symbol, f.expiry))
+        freed += cache.delete(f.symbol, f.expiry)
+    if cache.stats is not None and keys:
+        cache.stats.record_evictions(keys)
+    return freed
+
+
+def prune(
+    cache: FuturesCache,
+    budget: Optional[int] = None,
+    retention_months: Optional[int] = None,
+    today: Optional[date] = None,
+) -> List[CachedFile]:
+    """
+    Apply the retention window, then the byte budget.
+
+    Args:
+        cache: Futures cache to prune
+        budget: Maximum total bytes of data files
+        retention_months: Keep contracts that expired within this many
+            months
+        today: Override for the current date
+
+    Returns:
+        list: Evicted files
+    """
+    today = today or date.today()
+    files = cached_files(cache)
+    evicted = []
+    if retention_months is not None:
+        evicted = expired(files, retention_months, today)
+        files = [f for f in files if f not in evicted]
+    if budget is not None:
+        evicted += least_recently_used(files, budget)
+    evict(cache, evicted)
+    return evicted
+
+
+def compact(
+    cache: FuturesCache, symbols: Optional[Iterable[str]] = None
+) -> Dict[str, int]:
+    """
+    Rewrite symbols into compact per-expiry files with the ingest schema.
+
+    Returns:
+        dict: Total 'before' and 'after' bytes
+    """
+    totals = {"before": 0, "after": 0}
+    for symbol in symbols or cache.symbols():
+        before, after = cache.compact(symbol, parse_futures_frame)
+        totals["before"] += before
+        totals["after"] += after
+    return totals
+
+
+def report(cache: FuturesCache) -> Dict[str, float]:
+    """Cache size, file counts and lookup counters."""
+    files = cached_files(cache)
+    counters = cache.stats.counters() if cache.stats else {}
+    lookups = counters.get("hits", 0) + counters.get("misses", 0)
+    return {
+        "symbols": len({f.symbol for f in files}),
+        "expiry_files": sum(1 for f in files if f.expiry),
+        "legacy_files": sum(1 for f in files if f.expiry is None),
+        "bytes": sum(f.size for f in files),
+        **counters,
+        "hit_rate": counters.get("hits", 0) / lookups if lookups else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Manage the futures cache")
+    parser.add_argument(
+        "--cache-dir", default=str(CACHE_DIR), help="Cache directory"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("report", help="Show size and hit/miss counters")
+    prune_parser = commands.add_parser("prune", help="Evict cached expiries")
+    prune_parser.add_argument("--budget", type=parse_size, help="e.g. 200MB")
+    prune_parser.add_argument(
+        "--retention-months",
+        type=int,
+        help="Drop contracts that expired more than N months ago",
+    )
+    compact_parser = commands.add_parser(
+        "compact", help="Rewrite symbols as compact per-expiry files"
+    )
+    compact_parser.add_argument("symbols", nargs="*", help="Default: all")
+    commands.add_parser("reset-counters", help="Zero the hit/miss counters")
+    args = parser.parse_args()
+
+    cache = FuturesCache(Path(args.cache_dir))
+    if args.command == "prune":
+        evicted = prune(cache, args.budget, args.retention_months)
+        freed = sum(f.size for f in evicted)
+        print(f"Evicted {len(evicted)} files, freed {format_size(freed)}")
+    elif args.command == "compact":
+        totals = compact(cache, args.symbols)
+        print(
+            f"Compacted {format_size(totals['before'])} "
+            f"into {format_size(totals['after'])}"
+        )
+    elif args.command == "reset-counters":
+        cache.stats.reset()
+
+    stats = report(cache)
+    print(
+        f"{stats['symbols']} symbols, {stats['expiry_files']} expiry files, "
+        f"{stats['legacy_files']} legacy files, {format_size(stats['bytes'])}"
+    )
+    print(
+        f"hits={stats['hits']} misses={stats['misses']} "
+        f"evictions={stats['evictions']} hit rate={stats['hit_rate']:.1%}"
+    )
+
+
+if __name__ == "__main__":
+    main()
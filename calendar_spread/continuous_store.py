@@ -0,0 +1,237 @@
+"""
+Persisted continuous futures tables with incremental daily updates.
+
+The continuous table of each symbol is kept in one pickle under
+``cache/continuous``. ``update`` fetches only the contracts trading since
+the last stored row, aligns the days after it and appends them, seeding the
+forward fill from that row, so a daily refresh of the whole universe never
+rebuilds the stored history. Stored tables cover the last ``lookback_days``
+days, like a full build, so the spread statistics of the backtest do not
+drift as days are appended.
+
+Usage:
+    python -m calendar_spread.continuous_store SBIN RELIANCE
+"""
+
+import argparse
+import os
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Iterable, Optional
+
+import pandas as pd
+
+from calendar_spread import market_calendar, timing
+from calendar_spread.expiry_calendar import ExpiryCalendar, get_expiry_calendar
+from calendar_spread.futures_data import (
+    LEGS,
+    LOOKBACK_DAYS,
+    SPREADS,
+    build_continuous_table,
+    fetch_futures_contracts,
+)
+from calendar_spread.nse_api import NSEDataFetcher
+
+STORE_DIR = Path(__file__).parent / "cache" / "continuous"
+
+
+def _seed_legs(new_rows: pd.DataFrame, last_row: pd.Series) -> pd.DataFrame:
+    """
+    Carry the stored last row into new rows of the same contracts.
+
+    New rows are forward-filled among themselves already, so a leg that is
+    still missing has no newer price for its contract than the stored one.
+    """
+    for leg in LEGS:
+        same_contract = new_rows[f"{leg} Expiry"] == last_row[f"{leg} Expiry"]
+        missing = same_contract & new_rows[leg].isna()
+        new_rows.loc[missing, leg] = last_row[leg]
+    for spread, (front, back) in SPREADS.items():
+        new_rows[spread] = new_rows[back] - new_rows[front]
+    return new_rows
+
+
+class ContinuousStore:
+    """Continuous futures tables per symbol, updated by appending days."""
+
+    def __init__(
+        self,
+        store_dir: Path = STORE_DIR,
+        fetcher: Optional[NSEDataFetcher] = None,
+        expiry_calendar: Optional[ExpiryCalendar] = None,
+        lookback_days: int = LOOKBACK_DAYS,
+    ):
+        self.store_dir = Path(store_dir)
+        self._fetcher = fetcher
+        self.expiry_calendar = expiry_calendar or get_expiry_calendar()
+        self.lookback_days = lookback_days
+
+    @property
+    def fetcher(self) -> NSEDataFetcher:
+        if self._fetcher is None:
+            self._fetcher = NSEDataFetcher()
+        return self._fetcher
+
+    def path(self, symbol: str) -> Path:
+        return self.store_dir / f"{symbol}.pkl"
+
+    def load(self, symbol: str) -> Optional[pd.DataFrame]:
+        """Stored continuous table of a symbol, None if not stored."""
+        path = self.path(symbol)
+        if not path.exists():
+            return None
+        try:
+            with timing.stage("cache_read"):
+                return pd.read_pickle(path)
+        except Exception as e:
+            print(f"Error reading continuous table of {symbol}: {str(e)}")
+            return None
+
+    def save(self, symbol: str, df: pd.DataFrame) -> None:
+        """Atomically replace the stored continuous table of a symbol."""
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        path = self.path(symbol)
+        tmp_path = path.with_suffix(".pkl.tmp")
+        with timing.stage("cache_write"):
+            df.to_pickle(tmp_path)
+            os.replace(tmp_path, path)
+
+    def _fetch(
+        self,
+        symbol: str,
+        today,
+        use_cache_for_future: bool,
+        since=None,
+    ) -> dict:
+        # Same window as a full build, so cached expiries keep their range
+        return fetch_futures_contracts(
+            symbol,
+            today - timedelta(days=self.lookback_days),
+            today,
+            use_cache_for_future,
+            fetcher=self.fetcher,
+            expiry_calendar=self.expiry_calendar,
+            since=since,
+        )
+
+    def _trim(self, df: pd.DataFrame, today) -> pd.DataFrame:
+        """Rows of the last ``lookback_days`` days."""
+        start = today - timedelta(days=self.lookback_days)
+        if df.empty or df["Date"].iloc[0] >= start:
+            return df
+        return df[df["Date"] >= start].reset_index(drop=True)
+
+    def build(
+        self,
+        symbol: str,
+        use_cache_for_future: bool = False,
+        now: Optional[datetime] = None,
+    ) -> pd.DataFrame:
+        """Build the full continuous table of a symbol and store it."""
+        today = (now or market_calendar.now_ist()).date()
+        futures_data = self._fetch(symbol, today, use_cache_for_future)
+        with timing.stage("build"):
+            df = build_continuous_table(futures_data, self.expiry_calendar)
+            df = self._trim(df, today)
+        if not df.empty:
+            self.save(symbol, df)
+        return df
+
+    def update(
+        self,
+        symbol: str,
+        use_cache_for_future: bool = False,
+        now: Optional[datetime] = None,
+    ) -> pd.DataFrame:
+        """
+        Bring the stored continuous table of a symbol up to date.
+
+        Nothing is fetched while the last stored row is the latest published
+        session. Otherwise only the contracts trading since the last stored
+        date (its current, near and far months up to today's far month) are
+        fetched, and only their rows from that date onwards are aligned, so
+        the legs are forward-filled from the stored row within the same
+        contract. The new rows are appended and rows older than
+        ``lookback_days`` are dropped.
+
+        Args:
+            symbol: Stock symbol (e.g., 'SBIN')
+            use_cache_for_future: Use cached data even for live contracts
+            now: Override for the current time
+
+        Returns:
+            pd.DataFrame: The stored table including any appended rows
+        """
+        stored = self.load(symbol)
+        today = (now or market_calendar.now_ist()).date()
+        if stored is None or stored.empty:
+            return self.build(symbol, use_cache_for_future, now)
+
+        last_date = stored["Date"].iloc[-1]
+        if last_date >= market_calendar.last_published_session(now):
+            return stored
+        if last_date < today - timedelta(days=self.lookback_days):
+            return self.build(symbol, use_cache_for_future, now)
+
+        since = pd.Timestamp(last_date)
+        live = self._fetch(symbol, today, use_cache_for_future, last_date)
+        futures_data = {
+            expiry: df[df["Date"] >= since] for expiry, df in live.items()
+        }
+        with timing.stage("build"):
+            recent = build_continuous_table(futures_data, self.expiry_calendar)
+            new_rows = recent[recent["Date"] > last_date]
+            if new_rows.empty:
+                return stored
+
+            new_rows = _seed_legs(new_rows.copy(), stored.iloc[-1])
+            df = pd.concat([stored, new_rows], ignore_index=True)
+            df = self._trim(df, today)
+        self.save(symbol, df)
+        print(f"Appended {len(new_rows)} rows to {symbol}")
+        return df
+
+    def update_all(
+        self,
+        symbols: Iterable[str],
+        use_cache_for_future: bool = False,
+        now: Optional[datetime] = None,
+    ) -> dict:
+        """Update many symbols, returning symbol -> continuous table."""
+        tables = {}
+        for symbol in symbols:
+            try:
+                tables[symbol] = self.update(symbol, use_cache_for_future, now)
+            except Exception as e:
+                print(f"Error updating {symbol}: {str(e)}")
+        if self._fetcher is not None:
+            self._fetcher.futures_cache.flush_stats()
+        return tables
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Update stored continuous futures tables"
+    )
+    parser.add_argument("symbols", nargs="+", help="Symbols to update")
+    parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Rebuild the full tables instead of appending new days",
+    )
+    args = parser.parse_args()
+
+    store = ContinuousStore()
+    for symbol in args.symbols:
+        if args.rebuild:
+            df = store.build(symbol)
+        else:
+            df = store.update(symbol)
+        if df.empty:
+            print(f"{symbol}: no data")
+        else:
+            print(f"{symbol}: {len(df)} rows up to {df['Date'].iloc[-1]}")
+
+
+if __name__ == "__main__":
+    main()
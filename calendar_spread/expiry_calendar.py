@@ -0,0 +1,233 @@
+"""
+Precomputed monthly F&O expiry calendar with binary-search lookups.
+
+Monthly stock futures expire on the last Thursday of the month, and on the
+last Tuesday for contracts expiring from September 2025. When that day is an
+exchange holiday the contract expires on the previous trading day. All
+expiries for the covered years are computed once into a sorted datetime64
+array, so finding the contract of any date is a ``searchsorted`` call.
+
+Holidays are only known for the years in ``market_calendar.NSE_HOLIDAYS``,
+so the NSE calendar ends with the last of them by default and warns about
+any year it covers without a complete holiday list. Earlier years need the
+actual expiries NSE lists for them.
+"""
+
+import warnings
+from datetime import date, datetime
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from calendar_spread.market_calendar import (
+    BUSDAY_CALENDAR,
+    FIRST_HOLIDAY_YEAR,
+    LAST_HOLIDAY_YEAR,
+    NSE_HOLIDAYS,
+    PROVISIONAL_HOLIDAY_YEARS,
+)
+
+TUESDAY = 1
+THURSDAY = 3
+
+# (first expiry month, weekday) in force from that month onwards
+EXPIRY_WEEKDAYS: Tuple[Tuple[str, int], ...] = (
+    ("1900-01", THURSDAY),
+    ("2025-09", TUESDAY),
+)
+
+EXPIRY_FORMAT = "%d-%b-%Y"
+
+
+def format_expiry(day) -> str:
+    """Expiry date in NSE's DD-Mon-YYYY format (e.g. '30-Jan-2025')."""
+    return np.datetime64(day, "D").astype(date).strftime(EXPIRY_FORMAT)
+
+
+def parse_expiry(expiry: str) -> date:
+    """Parse an expiry in NSE's DD-Mon-YYYY format."""
+    return datetime.strptime(expiry, EXPIRY_FORMAT).date()
+
+
+def monthly_expiries(
+    start_year: int,
+    end_year: int,
+    weekday: Optional[int] = None,
+    busdaycal: np.busdaycalendar = BUSDAY_CALENDAR,
+) -> np.ndarray:
+    """
+    Monthly expiries of every month from ``start_year`` to ``end_year``.
+
+    Args:
+        start_year: First year covered
+        end_year: Last year covered
+        weekday: Expiry weekday (Monday=0) for all months, instead of the
+            ``EXPIRY_WEEKDAYS`` schedule
+        busdaycal: Trading calendar used to move expiries off holidays
+
+    Returns:
+        numpy.ndarray: Sorted datetime64[D] expiry dates
+    """
+    months = np.arange(
+        np.datetime64(f"{start_year}-01"),
+        np.datetime64(f"{end_year + 1}-01"),
+        dtype="datetime64[M]",
+    )
+    if weekday is None:
+        starts = np.array(
+            [m for m, _ in EXPIRY_WEEKDAYS], dtype="datetime64[M]"
+        )
+        weekdays = np.array([w for _, w in EXPIRY_WEEKDAYS])
+        weekday = weekdays[np.searchsorted(starts, months, side="right") - 1]
+
+    last_days = (months + 1).astype("datetime64[D]") - 1
+    # 1970-01-01 was a Thursday
+    last_weekdays = (last_days.astype(np.int64) + THURSDAY) % 7
+    expiries = last_days - (last_weekdays - weekday) % 7
+    return np.busday_offset(expiries, 0, roll="backward", busdaycal=busdaycal)
+
+
+def _months_of(year: int) -> np.ndarray:
+    return np.arange(
+        np.datetime64(f"{year}-01"),
+        np.datetime64(f"{year + 1}-01"),
+        dtype="datetime64[M]",
+    )
+
+
+class ExpiryCalendar:
+    """Sorted monthly expiries with current/next contract lookups."""
+
+    def __init__(
+        self,
+        start_year: int = FIRST_HOLIDAY_YEAR,
+        end_year: Optional[int] = None,
+        weekday: Optional[int] = None,
+        busdaycal: np.busdaycalendar = BUSDAY_CALENDAR,
+        listed_expiries: Sequence = (),
+    ):
+        """
+        Args:
+            start_year: First year covered
+            end_year: Last year covered (default: the last year with listed
+                holidays, and at least next year so far-month contracts
+                resolve)
+            weekday: Expiry weekday for all months instead of the schedule
+            busdaycal: Trading calendar used to move expiries off holidays
+            listed_expiries: Actual expiries (e.g. from NSE's expiry list)
+                replacing the computed expiry of their month. Years they
+                cover in full need no listed holidays.
+
+        Raises:
+            ValueError: If the NSE calendar would cover years before its
+                holidays are listed that ``listed_expiries`` do not cover
+
+        Warns:
+            UserWarning: If the NSE calendar covers years whose holidays are
+                not listed or only provisionally listed
+        """
+        end_year = end_year or max(LAST_HOLIDAY_YEAR, date.today().year + 1)
+        listed = np.unique(np.asarray(listed_expiries, dtype="datetime64[D]"))
+        listed_months = listed.astype("datetime64[M]")
+        covered = {
+            year
+            for year in range(start_year, end_year + 1)
+            if np.isin(_months_of(year), listed_months).all()
+        }
+        if busdaycal is BUSDAY_CALENDAR:
+            early = [
+                year
+                for year in range(start_year, FIRST_HOLIDAY_YEAR)
+                if year not in covered
+            ]
+            if early:
+                raise ValueError(
+                    f"NSE holidays are listed from {FIRST_HOLIDAY_YEAR} and "
+                    f"no expiries are listed for {early}"
+                )
+            incomplete = [
+                year
+                for year in range(start_year, end_year + 1)
+                if year not in covered
+                and (
+                    year not in NSE_HOLIDAYS
+                    or year in PROVISIONAL_HOLIDAY_YEARS
+                )
+            ]
+            if incomplete:
+                warnings.warn(
+                    f"NSE holidays of {incomplete} are not fully listed, "
+                    "expiries on unlisted holidays are not moved",
+                    stacklevel=2,
+                )
+        self.start_year = start_year
+        self.expiries = monthly_expiries(
+            start_year, end_year, weekday, busdaycal
+        )
+
+        # One listed expiry per month, the latest if a month has several
+        latest = listed_months != np.roll(listed_months, -1)
+        latest[-1:] = True
+        listed, listed_months = listed[latest], listed_months[latest]
+        months = self.expiries.astype("datetime64[M]")
+        positions = np.searchsorted(months, listed_months)
+        inside = positions < len(months)
+        inside[inside] = months[positions[inside]] == listed_months[inside]
+        self.expiries[positions[inside]] = listed[inside]
+
+    def positions(self, dates, offset: int = 0) -> np.ndarray:
+        """
+        Index into ``expiries`` of the contract ``offset`` months out.
+
+        The current contract (offset 0) of a date is the first expiry on or
+        after it, so a contract is current up to and including its expiry.
+        """
+        days = np.asarray(dates, dtype="datetime64[D]")
+        return np.searchsorted(self.expiries, days, side="left") + offset
+
+    def expiries_for(self, dates, offset: int = 0) -> np.ndarray:
+        """
+        Vectorized contract lookup for an array of dates.
+
+        Args:
+            dates: Dates as datetime64, datetime or date values
+            offset: 0 for the current month, 1 near month, 2 far month
+
+        Returns:
+            numpy.ndarray: datetime64[D] expiry of each date
+        """
+        positions = self.positions(dates, offset)
+        if np.any(positions >= len(self.expiries)):
+            raise ValueError("Dates beyond the last precomputed expiry")
+        return self.expiries[positions]
+
+    def current_expiry(self, day) -> date:
+        """Expiry of the current month contract on a date."""
+        return self.expiries_for(day).astype(date)
+
+    def next_expiry(self, day) -> date:
+        """Expiry of the near month contract on a date."""
+        return self.expiries_for(day, 1).astype(date)
+
+    def expiries_between(self, start, end) -> List[date]:
+        """Expiries from ``start`` to ``end`` inclusive."""
+        lo = np.searchsorted(self.expiries, np.datetime64(start, "D"), "left")
+        hi = np.searchsorted(self.expiries, np.datetime64(end, "D"), "right")
+        return self.expiries[lo:hi].astype(date).tolist()
+
+    def upcoming(self, day, count: int = 3) -> List[date]:
+        """The ``count`` contracts trading on a date, current month first."""
+        start = int(self.positions(day))
+        return self.expiries[start : start + count].astype(date).tolist()
+
+
+@lru_cache(maxsize=None)
+def get_expiry_calendar() -> ExpiryCalendar:
+    """Process-wide expiry calendar with the default schedule."""
+    return ExpiryCalendar()
+
+
+def format_expiries(expiries: Sequence) -> List[str]:
+    """Format many expiries in NSE's DD-Mon-YYYY format."""
+    return [format_expiry(expiry) for expiry in expiries]
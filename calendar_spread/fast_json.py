@@ -0,0 +1,66 @@
+"""
+Fast decoding of NSE JSON responses into column arrays.
+
+``loads`` uses orjson when it is installed and the standard library json
+module otherwise. ``record_columns`` turns the decoded ``data`` rows into
+one list per wanted field, so no intermediate DataFrame is built from row
+dicts. ``parse_numbers`` converts NSE's string numbers ('30,543,750') of a
+whole column set at once through a single joined buffer.
+"""
+
+import json
+from typing import Any, Dict, Iterable, List, Sequence
+
+import numpy as np
+import pandas as pd
+
+try:
+    import orjson
+except ImportError:  # optional speedup, see loads()
+    orjson = None
+
+# Separator that never occurs in NSE numbers
+_SEP = "\x1f"
+
+
+def loads(content: bytes) -> Any:
+    """Decode a JSON document with orjson if available, else json."""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def record_columns(
+    records: Sequence[dict], fields: Iterable[str]
+) -> Dict[str, List[Any]]:
+    """
+    Column lists of the wanted fields of decoded JSON rows.
+
+    Fields missing from the first row are skipped, so optional fields NSE
+    did not send do not become columns of nulls.
+    """
+    if not records:
+        return {}
+    first = records[0]
+    return {
+        field: [record.get(field) for record in records]
+        for field in fields
+        if field in first
+    }
+
+
+def parse_numbers(values: Sequence[Any]) -> np.ndarray:
+    """
+    Parse numbers written with thousands separators as float64.
+
+    Every value is joined into one string so the separators are removed in
+    a single replace. Values that are not numbers ('-', '', None) become NaN.
+    """
+    text = _SEP.join(map(str, values)).replace(",", "")
+    parts = text.split(_SEP) if values else []
+    try:
+        return np.array(parts, dtype=object).astype(np.float64)
+    except ValueError:
+        return pd.to_numeric(pd.Series(parts), errors="coerce").to_numpy(
+            dtype=np.float64
+        )
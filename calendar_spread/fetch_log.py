@@ -0,0 +1,225 @@
+"""
+Negative cache and retry queue for futures data fetches.
+
+(symbol, expiry) combinations NSE answered with no data are remembered for
+``EMPTY_TTL`` seconds so scans stop re-requesting them. Requests that failed
+with an error are queued with exponential backoff, so a later run can retry
+just those items instead of refetching whole symbols.
+
+Usage:
+    python -m calendar_spread.fetch_log
+"""
+
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from calendar_spread.http_cache import CACHE_PATH, DAY, connect
+
+EMPTY_TTL = DAY
+RETRY_BASE_DELAY = 5 * 60
+RETRY_MAX_DELAY = 6 * 60 * 60
+MAX_ATTEMPTS = 5
+
+
+class FetchLog:
+    """Known-empty and failed (symbol, expiry) fetches in SQLite."""
+
+    def __init__(self, path: Path = CACHE_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with connect(self.path) as conn, conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS empty_results (
+                    symbol TEXT NOT NULL,
+                    expiry TEXT NOT NULL,
+                    recorded_at REAL NOT NULL,
+                    PRIMARY KEY (symbol, expiry)
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS retry_queue (
+                    symbol TEXT NOT NULL,
+                    expiry TEXT NOT NULL,
+                    from_date TEXT NOT NULL,
+                    to_date TEXT NOT NULL,
+                    attempts INTEGER NOT NULL,
+                    last_error TEXT,
+                    next_attempt REAL NOT NULL,
+                    PRIMARY KEY (symbol, expiry)
+                )
+                """
+            )
+
+    def is_known_empty(
+        self,
+        symbol: str,
+        expiry: str,
+        ttl: float = EMPTY_TTL,
+        now: Optional[float] = None,
+    ) -> bool:
+        """Whether NSE returned no data for this pair within ``ttl`` seconds."""
+        now = time.time() if now is None else now
+        with connect(self.path) as conn:
+            row = conn.execute(
+                "SELECT recorded_at FROM empty_results "
+                "WHERE symbol = ? AND expiry = ?",
+                (symbol, expiry),
+            ).fetchone()
+        return row is not None and now - row[0] <= ttl
+
+    def mark_empty(
+        self, symbol: str, expiry: str, now: Optional[float] = None
+    ) -> None:
+        """Remember that NSE has no data for this pair."""
+        now = time.time() if now is None else now
+        with connect(self.path) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO empty_results VALUES (?, ?, ?)",
+                (symbol, expiry, now),
+            )
+            conn.execute(
+                "DELETE FROM retry_queue WHERE symbol = ? AND expiry = ?",
+                (symbol, expiry),
+            )
+
+    def record_failure(
+        self,
+        symbol: str,
+        from_date: str,
+        to_date: str,
+        expiry: str,
+        error: str,
+        now: Optional[float] = None,
+    ) -> int:
+        """
+        Queue a failed fetch for a later retry.
+
+        Returns:
+            int: Number of failed attempts so far
+        """
+        now = time.time() if now is None else now
+        with connect(self.path) as conn, conn:
+            row = conn.execute(
+                "SELECT attempts FROM retry_queue "
+                "WHERE symbol = ? AND expiry = ?",
+                (symbol, expiry),
+            ).fetchone()
+            attempts = (row[0] if row else 0) + 1
+            delay = min(RETRY_BASE_DELAY * 2 ** (attempts - 1), RETRY_MAX_DELAY)
+            conn.execute(
+                "INSERT OR REPLACE INTO retry_queue "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    symbol,
+                    expiry,
+                    from_date,
+                    to_date,
+                    attempts,
+                    error,
+                    now + delay,
+                ),
+            )
+        return attempts
+
+    def attempts(self, symbol: str, expiry: str) -> Optional[int]:
+        """Failed attempts of a queued pair, None if it is not queued."""
+        with connect(self.path) as conn:
+            row = conn.execute(
+                "SELECT attempts FROM retry_queue "
+                "WHERE symbol = ? AND expiry = ?",
+                (symbol, expiry),
+            ).fetchone()
+        return row[0] if row else None
+
+    def clear(self, symbol: str, expiry: str) -> None:
+        """Forget a pair after it was fetched successfully."""
+        with connect(self.path) as conn, conn:
+            for table in ("empty_results", "retry_queue"):
+                conn.execute(
+                    f"DELETE FROM {table} WHERE symbol = ? AND expiry = ?",
+                    (symbol, expiry),
+                )
+
+    def pending(
+        self, now: Optional[float] = None, max_attempts: int = MAX_ATTEMPTS
+    ) -> List[Dict[str, str]]:
+        """Queued fetches that are due for a retry, oldest first."""
+        now = time.time() if now is None else now
+        with connect(self.path) as conn:
+            rows = conn.execute(
+                "SELECT symbol, expiry, from_date, to_date, attempts, "
+                "last_error FROM retry_queue "
+                "WHERE next_attempt <= ? AND attempts < ? "
+                "ORDER BY next_attempt",
+                (now, max_attempts),
+            ).fetchall()
+        keys = ("symbol", "expiry", "from_date", "to_date", "attempts", "error")
+        return [dict(zip(keys, row)) for row in rows]
+
+
+def retry_failed_fetches(
+    fetcher=None, now: Optional[float] = None
+) -> Dict[str, int]:
+    """
+    Retry every due fetch in the queue.
+
+    Every retry goes to NSE unless the cache already holds fresh data for
+    the pair, in which case the queue entry is dropped without a request.
+    Only data that came from the network counts as fetched.
+
+    Args:
+        fetcher: NSEDataFetcher to use (default: a new one)
+        now: Override for the current time
+
+    Returns:
+        dict: Counts of 'fetched', 'empty', 'failed' and 'cached' retries
+    """
+    if fetcher is None:
+        from calendar_spread.nse_api import NSEDataFetcher
+
+        fetcher = NSEDataFetcher()
+
+    fetch_log = fetcher.fetch_log
+    counts = {"fetched": 0, "empty": 0, "failed": 0, "cached": 0}
+    for item in fetch_log.pending(now):
+        symbol, expiry = item["symbol"], item["expiry"]
+        print(f"Retrying {symbol} expiry {expiry}...")
+        fetcher.get_futures_data(
+            symbol,
+            item["from_date"],
+            item["to_date"],
+            expiry,
+            use_cache_for_future=False,
+        )
+        # A fetch clears the entry, an empty answer moves it to the
+        # negative cache and a failure bumps its attempts
+        attempts = fetch_log.attempts(symbol, expiry)
+        if fetch_log.is_known_empty(symbol, expiry):
+            counts["empty"] += 1
+        elif attempts is None:
+            counts["fetched"] += 1
+        elif attempts > item["attempts"]:
+            counts["failed"] += 1
+        else:
+            # Served from fresh cached data without a request
+            fetch_log.clear(symbol, expiry)
+            counts["cached"] += 1
+    return counts
+
+
+def main() -> None:
+    """Retry the queued futures fetches that are due."""
+    counts = retry_failed_fetches()
+    print(
+        f"Retried {sum(counts.values())} fetches: {counts['fetched']} fetched, "
+        f"{counts['empty']} empty, {counts['failed']} still failing, "
+        f"{counts['cached']} already cached"
+    )
+
+
+if __name__ == "__main__":
+    main()
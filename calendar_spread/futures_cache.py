@@ -0,0 +1,412 @@
+"""
+On-disk cache of NSE futures data with one file per symbol and expiry.
+
+Layout::
+
+    cache/<SYMBOL>/<DD-Mon-YYYY>.json   {"meta": {...}, "data": [rows]}
+    cache/<SYMBOL>/.lock                per-symbol lock file
+
+Fetching a new expiry adds a file and refreshing a live one rewrites only
+that expiry, never the rest of the symbol's history. Writes go to a temp
+file that replaces the entry atomically while the symbol's lock is held,
+so concurrent scans (two Streamlit sessions, the app and a cron job) can
+neither corrupt an entry nor interleave with a compaction. Readers need no
+lock. Symbols cached in the older single-file layout (``<SYMBOL>.json``)
+are read from that file until they are rewritten or compacted.
+
+Lookups are counted in ``cache_stats.sqlite``, together with the last read
+time of each entry, for the eviction policy in ``cache_manager``. They are
+buffered in memory and written in one transaction per scan (``flush``), so
+warm reads stay read-only on disk.
+"""
+
+import atexit
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from io import StringIO
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import pandas as pd
+
+from calendar_spread import fast_json
+from calendar_spread.expiry_calendar import parse_expiry
+from calendar_spread.http_cache import connect
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to an in-process lock only
+    fcntl = None
+
+CACHE_DIR = Path(__file__).parent / "cache"
+
+# Key of the per-expiry fetch metadata inside a legacy <SYMBOL>.json file
+LEGACY_META_KEY = "_meta"
+
+LOCK_FILE = ".lock"
+STATS_FILE = "cache_stats.sqlite"
+
+# Buffered lookups that trigger a flush before the scan ends
+FLUSH_EVERY = 1000
+
+
+class CacheEntry(NamedTuple):
+    data: pd.DataFrame
+    # 'fetched_at' and 'final', None for legacy entries without metadata
+    meta: Optional[dict]
+
+
+_thread_locks: Dict[Tuple[Path, str], threading.Lock] = {}
+_thread_locks_guard = threading.Lock()
+
+
+def _thread_lock(cache_dir: Path, symbol: str) -> threading.Lock:
+    with _thread_locks_guard:
+        return _thread_locks.setdefault((cache_dir, symbol), threading.Lock())
+
+
+class CacheStats:
+    """
+    Last read time of every cached expiry and hit/miss/eviction counts.
+
+    Lookups are buffered until ``flush``, which callers run once per scan;
+    anything still buffered is flushed at exit.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._reads: Dict[Tuple[str, str], float] = {}
+        self._counts: Dict[str, int] = {}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with connect(self.path) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS reads (
+                    symbol TEXT NOT NULL,
+                    expiry TEXT NOT NULL,
+                    last_read REAL NOT NULL,
+                    PRIMARY KEY (symbol, expiry)
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS counters (
+                    name TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL
+                )
+                """
+            )
+
+    def _increment(self, conn: sqlite3.Connection, name: str, by: int) -> None:
+        conn.execute(
+            "INSERT INTO counters VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            (name, by),
+        )
+
+    def record_read(
+        self, symbol: str, expiry: str, hit: bool, now: Optional[float] = None
+    ) -> None:
+        """Count a cache lookup and remember when a hit was read."""
+        now = time.time() if now is None else now
+        name = "hits" if hit else "misses"
+        with self._lock:
+            self._counts[name] = self._counts.get(name, 0) + 1
+            if hit:
+                self._reads[(symbol, expiry)] = now
+            pending = len(self._reads) + sum(self._counts.values())
+        _unflushed.add(self)
+        if pending >= FLUSH_EVERY:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the buffered lookups in one transaction."""
+        with self._lock:
+            reads, self._reads = self._reads, {}
+            counts, self._counts = self._counts, {}
+        _unflushed.discard(self)
+        if not reads and not counts:
+            return
+        with connect(self.path) as conn, conn:
+            for name, by in counts.items():
+                self._increment(conn, name, by)
+            conn.executemany(
+                "INSERT OR REPLACE INTO reads VALUES (?, ?, ?)",
+                [(*key, ts) for key, ts in reads.items()],
+            )
+
+    def record_evictions(self, keys: List[Tuple[str, str]]) -> None:
+        """Count evicted (symbol, expiry) entries and forget their reads."""
+        self.flush()
+        with connect(self.path) as conn, conn:
+            self._increment(conn, "evictions", len(keys))
+            conn.executemany(
+                "DELETE FROM reads WHERE symbol = ? AND expiry = ?", keys
+            )
+
+    def last_reads(self) -> Dict[Tuple[str, str], float]:
+        """(symbol, expiry) -> last read time of every entry read so far."""
+        self.flush()
+        with connect(self.path) as conn:
+            rows = conn.execute(
+                "SELECT symbol, expiry, last_read FROM reads"
+            ).fetchall()
+        return {(symbol, expiry): ts for symbol, expiry, ts in rows}
+
+    def counters(self) -> Dict[str, int]:
+        """Lookup and eviction counts, zero for events not seen yet."""
+        self.flush()
+        with connect(self.path) as conn:
+            rows = dict(conn.execute("SELECT name, value FROM counters"))
+        return {
+            name: rows.get(name, 0) for name in ("hits", "misses", "evictions")
+        }
+
+    def reset(self) -> None:
+        """Set all counters back to zero."""
+        with self._lock:
+            self._counts = {}
+        with connect(self.path) as conn, conn:
+            conn.execute("DELETE FROM counters")
+
+
+_unflushed: "weakref.WeakSet[CacheStats]" = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_all() -> None:
+    for stats in list(_unflushed):
+        stats.flush()
+
+
+class FuturesCache:
+    """Per-expiry futures data files under a cache directory."""
+
+    def __init__(self, cache_dir: Path = CACHE_DIR, track_reads: bool = True):
+        self.cache_dir = Path(cache_dir)
+        self._legacy: Dict[str, Tuple[int, dict]] = {}
+        self.stats = (
+            CacheStats(self.cache_dir / STATS_FILE) if track_reads else None
+        )
+
+    def symbol_dir(self, symbol: str) -> Path:
+        return self.cache_dir / symbol
+
+    def path(self, symbol: str, expiry: str) -> Path:
+        return self.symbol_dir(symbol) / f"{expiry}.json"
+
+    def legacy_path(self, symbol: str) -> Path:
+        return self.cache_dir / f"{symbol}.json"
+
+    @contextmanager
+    def lock(self, symbol: str) -> Iterator[None]:
+        """Hold the symbol's lock across threads and processes."""
+        symbol_dir = self.symbol_dir(symbol)
+        symbol_dir.mkdir(parents=True, exist_ok=True)
+        with _thread_lock(self.cache_dir, symbol):
+            with open(symbol_dir / LOCK_FILE, "a") as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def symbols(self) -> List[str]:
+        """Symbols with cached data in either layout."""
+        if not self.cache_dir.exists():
+            return []
+        names = set()
+        for path in self.cache_dir.iterdir():
+            if path.suffix == ".json" and path.is_file():
+                names.add(path.stem)
+            elif (path / LOCK_FILE).exists():
+                names.add(path.name)
+        return sorted(names)
+
+    def expiries(self, symbol: str) -> List[str]:
+        """Cached expiries of a symbol in either layout, oldest first."""
+        expiries = set(self._load_legacy(symbol)) - {LEGACY_META_KEY}
+        symbol_dir = self.symbol_dir(symbol)
+        if symbol_dir.exists():
+            expiries.update(path.stem for path in symbol_dir.glob("*.json"))
+        return sorted(expiries, key=parse_expiry)
+
+    def _load_legacy(self, symbol: str) -> dict:
+        """Legacy single-file cache of a symbol, parsed once per change."""
+        path = self.legacy_path(symbol)
+        try:
+            mtime = path.stat().st_mtime_ns
+        except OSError:
+            return {}
+        cached = self._legacy.get(symbol)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        try:
+            with open(path, "rb") as f:
+                data = fast_json.loads(f.read())
+        except (OSError, ValueError) as e:
+            print(f"Error reading cache: {e}")
+            data = {}
+        self._legacy[symbol] = (mtime, data)
+        return data
+
+    def read(
+        self, symbol: str, expiry: str, track: bool = True
+    ) -> Optional[CacheEntry]:
+        """
+        Cached data of one expiry, None on a miss.
+
+        Rows are returned as stored; legacy entries keep their raw NSE
+        fields and string numbers. Lookups are counted in ``stats`` unless
+        ``track`` is False, for callers that only count an entry once they
+        decide to serve it (``record_lookup``).
+        """
+        entry = self._read(symbol, expiry)
+        if track:
+            self.record_lookup(symbol, expiry, entry is not None)
+        return entry
+
+    def record_lookup(self, symbol: str, expiry: str, hit: bool) -> None:
+        """Count a lookup as a hit (entry served) or a miss."""
+        if self.stats is not None:
+            self.stats.record_read(symbol, expiry, hit)
+
+    def flush_stats(self) -> None:
+        """Write buffered lookup counts, once per scan."""
+        if self.stats is not None:
+            self.stats.flush()
+
+    def _read(self, symbol: str, expiry: str) -> Optional[CacheEntry]:
+        path = self.path(symbol, expiry)
+        try:
+            with open(path, "rb") as f:
+                entry = fast_json.loads(f.read())
+        except FileNotFoundError:
+            return self._read_legacy(symbol, expiry)
+        except (OSError, ValueError) as e:
+            print(f"Error reading cache: {e}")
+            return None
+
+        rows = entry.get("data") or []
+        columns = fast_json.record_columns(rows, rows[0] if rows else [])
+        return CacheEntry(pd.DataFrame(columns), entry.get("meta"))
+
+    def _read_legacy(self, symbol: str, expiry: str) -> Optional[CacheEntry]:
+        legacy = self._load_legacy(symbol)
+        if expiry not in legacy:
+            return None
+        try:
+            df = pd.read_json(
+                StringIO(legacy[expiry]),
+                orient="records",
+                convert_dates=["Date"],
+                dtype=False,
+            )
+        except ValueError as e:
+            print(f"Error reading cache: {e}")
+            return None
+        return CacheEntry(df, legacy.get(LEGACY_META_KEY, {}).get(expiry))
+
+    @staticmethod
+    def _content(data: pd.DataFrame, meta: Optional[dict]) -> str:
+        # Prices are quoted in paise
+        rows = data.to_json(
+            orient="records", date_format="iso", double_precision=2
+        )
+        return f'{{"meta": {json.dumps(meta)}, "data": {rows}}}'
+
+    def write(
+        self, symbol: str, expiry: str, data: pd.DataFrame, meta: dict
+    ) -> Path:
+        """Atomically replace the cached data of one expiry."""
+        path = self.path(symbol, expiry)
+        with self.lock(symbol):
+            self._replace(path, self._content(data, meta))
+        return path
+
+    def delete(self, symbol: str, expiry: Optional[str] = None) -> int:
+        """
+        Delete one expiry file, or the legacy file when ``expiry`` is None.
+
+        Returns:
+            int: Bytes freed
+        """
+        if expiry is None:
+            path = self.legacy_path(symbol)
+        else:
+            path = self.path(symbol, expiry)
+        with self.lock(symbol):
+            try:
+                size = path.stat().st_size
+                path.unlink()
+            except FileNotFoundError:
+                return 0
+        self._legacy.pop(symbol, None)
+        return size
+
+    def disk_usage(self, symbol: str) -> int:
+        """Bytes used by a symbol's files in both layouts."""
+        paths = [self.legacy_path(symbol)]
+        symbol_dir = self.symbol_dir(symbol)
+        if symbol_dir.exists():
+            paths.extend(symbol_dir.iterdir())
+        return sum(path.stat().st_size for path in paths if path.is_file())
+
+    def compact(
+        self,
+        symbol: str,
+        transform: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None,
+    ) -> Tuple[int, int]:
+        """
+        Rewrite a symbol's cache as one compact file per expiry.
+
+        Expiries still in the legacy file are moved into expiry files, which
+        take precedence when both exist, and the legacy file is removed.
+        Every entry is rewritten through ``transform`` (e.g. the ingest
+        schema), and temp files left behind by interrupted writes are
+        deleted.
+
+        Returns:
+            tuple: Bytes used before and after
+        """
+        with self.lock(symbol):
+            before = self.disk_usage(symbol)
+            for expiry in self.expiries(symbol):
+                entry = self._read(symbol, expiry)
+                if entry is None:
+                    continue
+                data = entry.data
+                if transform is not None and not data.empty:
+                    data = transform(data)
+                content = self._content(data, entry.meta)
+                self._replace(self.path(symbol, expiry), content)
+            for tmp_path in self.symbol_dir(symbol).glob(".*.tmp"):
+                tmp_path.unlink()
+            self.legacy_path(symbol).unlink(missing_ok=True)
+            self._legacy.pop(symbol, None)
+            return before, self.disk_usage(symbol)
+
+    @staticmethod
+    def _replace(path: Path, content: str) -> None:
+        """Write a file through a temp file in the same directory."""
+        fd, tmp_path = tempfile.mkstemp(
+            dir=path.parent, prefix=f".{path.name}.", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
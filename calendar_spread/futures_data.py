@@ -1,220 +1,234 @@
-import calendar
-from datetime import datetime, timedelta
-from typing import List
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
 
+import numpy as np
 import pandas as pd
+from calendar_spread.expiry_calendar import (
+    EXPIRY_FORMAT,
+    ExpiryCalendar,
+    format_expiries,
+    get_expiry_calendar,
+    parse_expiry,
+)
 from calendar_spread.nse_api import NSEDataFetcher
 
+LOOKBACK_DAYS = 200
 
-def get_last_thursday(year: int, month: int) -> datetime:
-    """Get the last Thursday of the given month and year."""
-    last_day = calendar.monthrange(year, month)[1]
-    last_date = datetime(year, month, last_day)
+LEGS = ("Current Month", "Near Month", "Far Month")
 
-    while last_date.weekday() != 3:
-        last_date -= timedelta(days=1)
-
-    return last_date
+# Spread column -> (front leg, back leg); each spread is back minus front
+SPREADS = {
+    "Spread": ("Current Month", "Near Month"),
+    "Near-Far Spread": ("Near Month", "Far Month"),
+    "Current-Far Spread": ("Current Month", "Far Month"),
+}
 
 
 def get_expiry_dates() -> List[str]:
     """Get current, near and far month expiry dates."""
-    current_date = datetime.now()
-    expiry_dates = []
+    return format_expiries(
+        get_expiry_calendar().upcoming(datetime.now().date(), 3)
+    )
+
+
+def _ffill_within(values: np.ndarray, groups: np.ndarray) -> np.ndarray:
+    """Forward-fill NaNs without crossing the boundaries of sorted groups."""
+    positions = np.arange(len(values))
+    last_valid = np.where(np.isnan(values), -1, positions)
+    last_valid = (
+        np.maximum.accumulate(last_valid) if len(values) else last_valid
+    )
+    group_starts = np.searchsorted(groups, groups, side="left")
+    last_valid[last_valid < group_starts] = -1
+    return np.where(last_valid >= 0, values[last_valid], np.nan)
+
+
+def build_continuous_table(
+    futures_data: Dict[str, pd.DataFrame],
+    expiry_calendar: Optional[ExpiryCalendar] = None,
+) -> pd.DataFrame:
+    """
+    Build current, near and far month legs and their spreads in one pass.
+
+    Closing prices of all fetched contracts are laid out as a (dates,
+    expiries) matrix, and each leg gathers its contract's column for every
+    date at once. Missing prices are forward-filled only within the same
+    contract.
+
+    Args:
+        futures_data: Expiry (DD-Mon-YYYY) -> DataFrame with Date and Close
+        expiry_calendar: Calendar deciding the contract of each leg
+
+    Returns:
+        pd.DataFrame: Date, the three legs, ``SPREADS`` and leg expiries
+    """
+    expiry_calendar = expiry_calendar or get_expiry_calendar()
+    columns = ["Date", *LEGS, *SPREADS, *(f"{leg} Expiry" for leg in LEGS)]
+    if not futures_data:
+        return pd.DataFrame(columns=columns)
 
-    # Get current month expiry
-    current_month_expiry = get_last_thursday(current_date.year, current_date.month)
+    contracts = sorted(
+        futures_data.items(), key=lambda item: parse_expiry(item[0])
+    )
+    expiries = np.array(
+        [parse_expiry(expiry) for expiry, _ in contracts], dtype="datetime64[D]"
+    )
+    frames = [
+        df.drop_duplicates("Date")["Date"].to_numpy(dtype="datetime64[D]")
+        for _, df in contracts
+    ]
+    dates = np.unique(np.concatenate(frames))
+
+    # Closing price of every fetched contract on every trading date
+    closes = np.full((len(dates), len(expiries)), np.nan)
+    for column, ((_, df), contract_dates) in enumerate(zip(contracts, frames)):
+        closes[
+            np.searchsorted(dates, contract_dates), column
+        ] = df.drop_duplicates("Date")["Close"].to_numpy(dtype=float)
+
+    result = {"Date": dates.astype(date)}
+    leg_expiries = {}
+    for offset, leg in enumerate(LEGS):
+        leg_expiry = expiry_calendar.expiries_for(dates, offset)
+        column = np.searchsorted(expiries, leg_expiry)
+        fetched = column < len(expiries)
+        fetched[fetched] = expiries[column[fetched]] == leg_expiry[fetched]
+        prices = np.where(
+            fetched,
+            closes[
+                np.arange(len(dates)), np.minimum(column, len(expiries) - 1)
+            ],
+            np.nan,
+        )
+        result[leg] = _ffill_within(prices, leg_expiry)
+        leg_expiries[f"{leg} Expiry"] = pd.DatetimeIndex(leg_expiry).strftime(
+            EXPIRY_FORMAT
+        )
+
+    for spread, (front, back) in SPREADS.items():
+        result[spread] = result[back] - result[front]
+    result.update(leg_expiries)
+
+    result_df = pd.DataFrame(result, columns=columns)
+
+    # Remove rows where both current and near month are missing
+    return result_df.dropna(
+        subset=["Current Month", "Near Month"], how="all"
+    ).reset_index(drop=True)
+
+
+def fetch_futures_contracts(
+    symbol: str,
+    start_date: date,
+    end_date: date,
+    use_cache_for_future: bool = False,
+    fetcher: Optional[NSEDataFetcher] = None,
+    expiry_calendar: Optional[ExpiryCalendar] = None,
+    since: Optional[date] = None,
+) -> Dict[str, pd.DataFrame]:
+    """
+    Fetch every contract trading between two dates, up to the far month.
 
-    # If current date is past current month expiry, move to next month
-    if current_date > current_month_expiry:
-        current_date = current_date.replace(day=1) + timedelta(days=32)
-        current_month_expiry = get_last_thursday(current_date.year, current_date.month)
+    Args:
+        symbol: Stock symbol (e.g., 'SBIN')
+        start_date: First date of the window
+        end_date: Last date of the window
+        use_cache_for_future: Use cached data even for live contracts
+        fetcher: NSE data fetcher (default: a new one)
+        expiry_calendar: Calendar deciding which contracts trade
+        since: Only fetch contracts still trading on or after this date;
+            each is still requested for the whole window
+
+    Returns:
+        dict: Expiry (DD-Mon-YYYY) -> non-empty DataFrame of daily data
+    """
+    nse = fetcher or NSEDataFetcher()
+    expiry_calendar = expiry_calendar or get_expiry_calendar()
+
+    # Extend end_date by 1 month for fetching near month data
+    extended_end_date = end_date + timedelta(days=31)
+    end_date_str = extended_end_date.strftime("%d-%m-%Y")
+    start_date_str = start_date.strftime("%d-%m-%Y")
+
+    # Every contract trading in the window, up to the far month
+    last_expiry = expiry_calendar.upcoming(end_date, 3)[-1]
+    first_expiry = start_date + timedelta(days=1)
+    if since is not None:
+        first_expiry = max(first_expiry, since)
+    expiry_dates = format_expiries(
+        expiry_calendar.expiries_between(first_expiry, last_expiry)
+    )
+
+    # Format dates for API
+    print(f"Date Range: {start_date_str} to {end_date_str}")
+    print("Expiry dates to fetch:", expiry_dates)
 
-    # Get next three months' expiry dates
-    for _ in range(3):
-        expiry_dates.append(current_month_expiry.strftime("%d-%b-%Y"))
-        next_month = current_month_expiry.replace(day=1) + timedelta(days=32)
-        current_month_expiry = get_last_thursday(next_month.year, next_month.month)
-    return expiry_dates
+    # Fetch data for each expiry
+    futures_data = {}
+    for expiry in expiry_dates:
+        print(f"\nFetching data for expiry: {expiry}")
+        df = nse.get_futures_data(
+            symbol, start_date_str, end_date_str, expiry, use_cache_for_future
+        )
+        if df is not None and not df.empty:
+            futures_data[expiry] = df
+    return futures_data
 
 
 def get_continuous_futures_data(
-    symbol: str, use_cache_for_future: bool = False
+    symbol: str,
+    use_cache_for_future: bool = False,
+    lookback_days: int = LOOKBACK_DAYS,
 ) -> pd.DataFrame:
     """
-    Create a continuous futures table with current and near month data
-    for last 200 days from current date.
+    Create a continuous futures table with current, near and far month data
+    and their spreads for the last ``lookback_days`` days (default 200).
+
+    For multi-year lookbacks use ``calendar_spread.long_history``, which
+    builds the table one expiry segment at a time.
 
     Args:
         symbol: Stock symbol (e.g., 'SBIN')
+        use_cache_for_future: Use cached data even for live contracts
+        lookback_days: Days of history before today
     """
     try:
-        # Initialize NSE data fetcher
-        nse = NSEDataFetcher()
-
         # Calculate date range
         end_date = datetime.now().date()
-        start_date = end_date - timedelta(days=200)
-
-        # Extend end_date by 1 month for fetching near month data
-        extended_end_date = end_date + timedelta(days=31)
-        end_date_str = extended_end_date.strftime("%d-%m-%Y")
-        start_date_str = start_date.strftime("%d-%m-%Y")
-
-        # Get all expiry dates needed (last 8 months to cover 200 days)
-        expiry_dates = []
-        current_date = start_date
-
-        # Get first month expiry
-        current_expiry = get_last_thursday(current_date.year, current_date.month).date()
-
-        # Get 9 months of expiry dates to ensure coverage including the extended month
-        for _ in range(9):
-            expiry_date = current_expiry.strftime("%d-%b-%Y")
-            if current_expiry > start_date:  # Only add if expiry is after start date
-                expiry_dates.append(expiry_date)
-            next_month = current_expiry.replace(day=1) + timedelta(days=32)
-            current_expiry = get_last_thursday(next_month.year, next_month.month).date()
-
-        # Format dates for API
-        print(f"Date Range: {start_date_str} to {end_date_str}")
-        print("Expiry dates to fetch:", expiry_dates)
-
-        # Fetch data for each expiry
-        futures_data = {}
-        all_trading_dates = set()  # Keep track of actual trading dates
-        for expiry in expiry_dates:
-            print(f"\nFetching data for expiry: {expiry}")
-            df = nse.get_futures_data(
-                symbol, start_date_str, end_date_str, expiry, use_cache_for_future
-            )
-            if df is not None and not df.empty:
-                futures_data[expiry] = df
-                # Collect actual trading dates
-                all_trading_dates.update(df["Date"].dt.date)
-
-        # Sort trading dates for ordered processing
-        all_trading_dates = sorted(list(all_trading_dates))
-
-        # Create continuous futures table using only actual trading dates
-        result_data = []
-        for date in all_trading_dates:
-            row = {"Date": date}
-
-            # Find current month contract
-            current_expiry = None
-            for expiry in expiry_dates:
-                expiry_date = datetime.strptime(expiry, "%d-%b-%Y").date()
-                if date <= expiry_date:
-                    current_expiry = expiry
-                    break
-
-            # Find near month contract
-            near_expiry = None
-            if current_expiry:
-                current_expiry_date = datetime.strptime(
-                    current_expiry, "%d-%b-%Y"
-                ).date()
-                for expiry in expiry_dates:
-                    expiry_date = datetime.strptime(expiry, "%d-%b-%Y").date()
-                    if expiry_date > current_expiry_date:
-                        near_expiry = expiry
-                        break
-
-            # Get closing prices (only for actual trading dates)
-            if current_expiry and current_expiry in futures_data:
-                current_data = futures_data[current_expiry]
-                matching_rows = current_data[current_data["Date"].dt.date == date]
-                if not matching_rows.empty:
-                    row["Current Month"] = matching_rows["Close"].iloc[0]
-                else:
-                    row["Current Month"] = None
-
-            if near_expiry and near_expiry in futures_data:
-                near_data = futures_data[near_expiry]
-                matching_rows = near_data[near_data["Date"].dt.date == date]
-                if not matching_rows.empty:
-                    row["Near Month"] = matching_rows["Close"].iloc[0]
-                else:
-                    row["Near Month"] = None
-
-            result_data.append(row)
-
-        # Create DataFrame and handle missing values
-        result_df = pd.DataFrame(result_data)
-
-        # Add expiry information
-        result_df["Current Month Expiry"] = None
-        result_df["Near Month Expiry"] = None
-
-        # Assign expiry information (only for actual trading dates)
-        for idx, row in result_df.iterrows():
-            date = row["Date"]
-            for expiry in expiry_dates:
-                expiry_date = datetime.strptime(expiry, "%d-%b-%Y").date()
-                if date <= expiry_date:
-                    result_df.loc[idx, "Current Month Expiry"] = expiry
-                    # Find next expiry for near month
-                    next_expiry = None
-                    for next_exp in expiry_dates:
-                        next_exp_date = datetime.strptime(next_exp, "%d-%b-%Y").date()
-                        if next_exp_date > expiry_date:
-                            next_expiry = next_exp
-                            break
-                    result_df.loc[idx, "Near Month Expiry"] = next_expiry
-                    break
-
-        # Fill missing values only within each expiry period and only for actual trading dates
-        for expiry in expiry_dates:
-            # Fill Current Month prices
-            mask = result_df["Current Month Expiry"] == expiry
-            if mask.any():
-                expiry_data = result_df.loc[mask].copy()
-                expiry_data["Current Month"] = expiry_data["Current Month"].ffill()
-                result_df.loc[mask, "Current Month"] = expiry_data["Current Month"]
-
-            # Fill Near Month prices
-            mask = result_df["Near Month Expiry"] == expiry
-            if mask.any():
-                expiry_data = result_df.loc[mask].copy()
-                expiry_data["Near Month"] = expiry_data["Near Month"].ffill()
-                result_df.loc[mask, "Near Month"] = expiry_data["Near Month"]
-
-        # Calculate spread (Near Month - Current Month)
-        result_df["Spread"] = result_df["Near Month"] - result_df["Current Month"]
-
-        # Remove rows where both current and near month are None
-        result_df = result_df.dropna(subset=["Current Month", "Near Month"], how="all")
-
-        # Reorder columns to put Spread after Near Month
-        column_order = [
-            "Date",
-            "Current Month",
-            "Near Month",
-            "Spread",
-            "Current Month Expiry",
-            "Near Month Expiry",
-        ]
-        result_df = result_df[column_order]
-
-        return result_df
+        start_date = end_date - timedelta(days=lookback_days)
+
+        expiry_calendar = get_expiry_calendar()
+        futures_data = fetch_futures_contracts(
+            symbol,
+            start_date,
+            end_date,
+            use_cache_for_future,
+            expiry_calendar=expiry_calendar,
+        )
+        return build_continuous_table(futures_data, expiry_calendar)
 
     except Exception as e:
         print(f"Error creating continuous futures data: {str(e)}")
         return pd.DataFrame()
 
 
-def backtest_calendar_spread(df: pd.DataFrame) -> pd.DataFrame:
+def backtest_calendar_spread(
+    df: pd.DataFrame, spread_column: str = "Spread"
+) -> pd.DataFrame:
     """
     Backtest calendar spread strategy on the continuous futures data.
     Uses entire history for mean/std calculation, but backtests only on last 100 days.
+
+    Args:
+        df: Continuous futures table
+        spread_column: Which of ``SPREADS`` to trade
     """
     # Ensure Date column is datetime
     df["Date"] = pd.to_datetime(df["Date"])
 
     # Calculate mean and standard deviation from entire dataset
-    mean_spread = df["Spread"].mean()
-    std_spread = df["Spread"].std()
+    mean_spread = df[spread_column].mean()
+    std_spread = df[spread_column].std()
 
     # Define upper and lower bounds
     upper_bound = mean_spread + std_spread
@@ -251,7 +265,7 @@ def backtest_calendar_spread(df: pd.DataFrame) -> pd.DataFrame:
 
     # Only iterate over the testing period
     for i in range(len(testing_df)):
-        current_spread = testing_df["Spread"].iloc[i]
+        current_spread = testing_df[spread_column].iloc[i]
         current_date = testing_df["Date"].iloc[i]
         idx = testing_df.index[i]  # Get the original index for updating df
 
@@ -288,21 +302,29 @@ def backtest_calendar_spread(df: pd.DataFrame) -> pd.DataFrame:
                 # Exit if spread reverts to mean OR if loss exceeds stop loss
                 if current_spread <= mean_spread or unrealized_pnl < -stop_loss:
                     exit_spread = current_spread
-                    pnl = entry_spread - exit_spread  # Positive if spread decreased
+                    pnl = (
+                        entry_spread - exit_spread
+                    )  # Positive if spread decreased
 
             else:  # Buy trade
                 unrealized_pnl = current_spread - entry_spread
                 # Exit if spread reverts to mean OR if loss exceeds stop loss
                 if current_spread >= mean_spread or unrealized_pnl < -stop_loss:
                     exit_spread = current_spread
-                    pnl = exit_spread - entry_spread  # Positive if spread increased
+                    pnl = (
+                        exit_spread - entry_spread
+                    )  # Positive if spread increased
 
             if (
                 trade_type == "Sell"
-                and (current_spread <= mean_spread or unrealized_pnl < -stop_loss)
+                and (
+                    current_spread <= mean_spread or unrealized_pnl < -stop_loss
+                )
             ) or (
                 trade_type == "Buy"
-                and (current_spread >= mean_spread or unrealized_pnl < -stop_loss)
+                and (
+                    current_spread >= mean_spread or unrealized_pnl < -stop_loss
+                )
             ):
                 # Exit trade
                 df.loc[idx, "Trade_Exit"] = True
@@ -317,7 +339,9 @@ def backtest_calendar_spread(df: pd.DataFrame) -> pd.DataFrame:
                         "Entry_Spread": entry_spread,
                         "Exit_Spread": exit_spread,
                         "PnL": pnl,
-                        "Result": "Win" if pnl > 0 else "Loss",  # Add Result column
+                        "Result": "Win"
+                        if pnl > 0
+                        else "Loss",  # Add Result column
                     }
                 )
 
@@ -338,7 +362,75 @@ def backtest_calendar_spread(df: pd.DataFrame) -> pd.DataFrame:
     return df, trades_df
 
 
-def main(symbol: str):
+def spread_signal(
+    backtest_df: pd.DataFrame,
+    trades_df: pd.DataFrame,
+    spread_column: str = "Spread",
+) -> str:
+    """
+    Current trade signal of a backtested spread.
+
+    A spread beyond one standard deviation of its mean is a SELL (above) or
+    BUY (below) signal, 'Fresh' on the first day after the last trade or
+    when it started at most a day ago, 'Active Nd' otherwise.
+
+    Args:
+        backtest_df: Table returned by ``backtest_calendar_spread``
+        trades_df: Non-empty trades returned by ``backtest_calendar_spread``
+        spread_column: Which of ``SPREADS`` was traded
+
+    Returns:
+        str: e.g. 'SELL (Fresh)', 'BUY (Active 3d)' or 'NEUTRAL'
+    """
+    # Calculate signal thresholds
+    spread_mean = backtest_df[spread_column].mean()
+    spread_std = backtest_df[spread_column].std()
+    upper_threshold = spread_mean + spread_std
+    lower_threshold = spread_mean - spread_std
+
+    # Get current data
+    current_spread = backtest_df[spread_column].iloc[-1]
+    current_date = backtest_df["Date"].iloc[-1]
+
+    # Get last trade info
+    last_trade = trades_df.sort_values("Exit_Date").iloc[-1]
+    last_exit_date = pd.to_datetime(last_trade["Exit_Date"])
+
+    # Filter data after last trade exit
+    post_trade_data = backtest_df[backtest_df["Date"] > last_exit_date]
+
+    if post_trade_data.empty:
+        # New signals on first day after trade
+        if current_spread > upper_threshold:
+            return "SELL (Fresh)"
+        if current_spread < lower_threshold:
+            return "BUY (Fresh)"
+        return "NEUTRAL"
+
+    # Check for SELL signal
+    if current_spread > upper_threshold:
+        signals = post_trade_data[
+            post_trade_data[spread_column] > upper_threshold
+        ]
+        signal_type = "SELL"
+    # Check for BUY signal
+    elif current_spread < lower_threshold:
+        signals = post_trade_data[
+            post_trade_data[spread_column] < lower_threshold
+        ]
+        signal_type = "BUY"
+    else:
+        return "NEUTRAL"
+
+    if signals.empty:
+        return "NEUTRAL"
+    days_active = (current_date - signals.iloc[0]["Date"]).days
+    if days_active <= 1:
+        return f"{signal_type} (Fresh)"
+    return f"{signal_type} (Active {days_active}d)"
+
+
+def main(symbol: str, spread_column: str = "Spread"):
     # Set pandas to display all rows and float precision
     pd.set_option("display.max_rows", None)
     pd.set_option("display.max_columns", None)
@@ -352,14 +444,8 @@ def main(symbol: str):
     if not continuous_df.empty:
         print("\nContinuous Futures Data Statistics:")
 
-        # Calculate spread
-        if (
-            "Current Month" in continuous_df.columns
-            and "Near Month" in continuous_df.columns
-        ):
-            continuous_df["Spread"] = (
-                continuous_df["Near Month"] - continuous_df["Current Month"]
-            )
+        # Spreads are computed by the table builder
+        if spread_column in continuous_df.columns:
             print(continuous_df)
 
             # Run backtesting after showing spread statistics
@@ -367,14 +453,20 @@ def main(symbol: str):
             print("Running Calendar Spread Backtest...")
             print("=" * 50)
 
-            backtest_df, trades_df = backtest_calendar_spread(continuous_df)
+            backtest_df, trades_df = backtest_calendar_spread(
+                continuous_df, spread_column
+            )
 
             print("\nBacktest Results:")
             print("\nTrade Statistics:")
             if not trades_df.empty:
                 print(f"Total Trades: {len(trades_df)}")
-                print(f"Profitable Trades: {len(trades_df[trades_df['PnL'] > 0])}")
-                print(f"Loss Making Trades: {len(trades_df[trades_df['PnL'] <= 0])}")
+                print(
+                    f"Profitable Trades: {len(trades_df[trades_df['PnL'] > 0])}"
+                )
+                print(
+                    f"Loss Making Trades: {len(trades_df[trades_df['PnL'] <= 0])}"
+                )
 
                 total_pnl = trades_df["PnL"].sum()
                 print(f"\nTotal P&L: {total_pnl:.2f}")
@@ -386,7 +478,9 @@ def main(symbol: str):
                 print(f"Max Loss: {trades_df['PnL'].min():.2f}")
 
                 # Calculate win rate and risk metrics
-                win_rate = len(trades_df[trades_df["PnL"] > 0]) / len(trades_df) * 100
+                win_rate = (
+                    len(trades_df[trades_df["PnL"] > 0]) / len(trades_df) * 100
+                )
                 profit_factor = (
                     abs(
                         trades_df[trades_df["PnL"] > 0]["PnL"].sum()
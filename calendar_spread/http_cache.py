@@ -0,0 +1,120 @@
+"""
+SQLite-backed HTTP response cache for slow-changing NSE endpoints.
+
+Responses are keyed by URL and served from the cache while younger than the
+time-to-live of their endpoint. Endpoints without a TTL, such as the
+historical futures data, always go to the network.
+"""
+
+import sqlite3
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+
+CACHE_PATH = Path(__file__).parent / "cache" / "http_cache.sqlite"
+
+DAY = 24 * 60 * 60
+
+# Endpoint path prefix -> seconds a response stays fresh (None: never cache)
+ENDPOINT_TTLS: Dict[str, Optional[float]] = {
+    "/api/underlying-information": 7 * DAY,
+    "/api/historical/foCPV/expireDts": 30 * DAY,
+    "/api/historical/": None,
+}
+
+
+def connect(path: Path = CACHE_PATH) -> "closing[sqlite3.Connection]":
+    """
+    Open the cache database, closing it when the ``with`` block ends.
+
+    A connection per call keeps the cache safe across Streamlit threads.
+    """
+    return closing(sqlite3.connect(path, timeout=30))
+
+
+def endpoint_ttl(url: str) -> Optional[float]:
+    """Time-to-live of the endpoint a URL belongs to, None if uncached."""
+    path = urlsplit(url).path
+    for prefix, ttl in ENDPOINT_TTLS.items():
+        if path.startswith(prefix):
+            return ttl
+    return None
+
+
+class ResponseCache:
+    """Response bodies keyed by URL in a local SQLite file."""
+
+    def __init__(self, path: Path = CACHE_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS responses (
+                    url TEXT PRIMARY KEY,
+                    status INTEGER NOT NULL,
+                    content_type TEXT,
+                    body BLOB NOT NULL,
+                    fetched_at REAL NOT NULL
+                )
+                """
+            )
+
+    def _connect(self) -> "closing[sqlite3.Connection]":
+        return connect(self.path)
+
+    def get(
+        self, url: str, max_age: float, now: Optional[float] = None
+    ) -> Optional[requests.Response]:
+        """
+        Cached response for a URL if it is younger than ``max_age`` seconds.
+
+        Returns:
+            requests.Response rebuilt from the cache, or None on a miss
+        """
+        now = time.time() if now is None else now
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT status, content_type, body, fetched_at "
+                "FROM responses WHERE url = ?",
+                (url,),
+            ).fetchone()
+        if row is None or now - row[3] > max_age:
+            return None
+
+        response = requests.Response()
+        response.url = url
+        response.status_code = row[0]
+        response._content = bytes(row[2])
+        response.encoding = "utf-8"
+        if row[1]:
+            response.headers["Content-Type"] = row[1]
+        response.from_cache = True
+        return response
+
+    def set(
+        self, url: str, response: requests.Response, now: Optional[float] = None
+    ) -> None:
+        """Store a response body for a URL."""
+        now = time.time() if now is None else now
+        with self._connect() as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                (
+                    url,
+                    response.status_code,
+                    response.headers.get("Content-Type"),
+                    response.content,
+                    now,
+                ),
+            )
+
+    def delete(self, url: str) -> None:
+        """Drop the cached response of a URL."""
+        with self._connect() as conn, conn:
+            conn.execute("DELETE FROM responses WHERE url = ?", (url,))
@@ -0,0 +1,240 @@
+"""
+Multi-year continuous futures series assembled one expiry segment at a time.
+
+Every leg of the continuous table rolls on the same day, when the current
+month contract expires, so the dates between two monthly expiries form a
+segment that only needs the three contracts trading in it. Segments are
+built and yielded in date order while at most those three contracts are
+held in memory, whatever the lookback.
+
+Expiries of years before the listed NSE holidays come from NSE's expiry
+list of the symbol.
+
+Usage:
+    python -m calendar_spread.long_history SBIN --years 10 --parquet sbin.parquet
+"""
+
+import argparse
+from datetime import date, timedelta
+from typing import Dict, Iterator, Optional
+
+import pandas as pd
+
+from calendar_spread.expiry_calendar import (
+    ExpiryCalendar,
+    format_expiry,
+    get_expiry_calendar,
+    parse_expiry,
+)
+from calendar_spread.futures_data import LEGS, build_continuous_table
+from calendar_spread.market_calendar import FIRST_HOLIDAY_YEAR
+from calendar_spread.nse_api import NSEDataFetcher
+
+# Days before its expiry that a contract is fetched from (three months out)
+CONTRACT_LIFE_DAYS = 100
+
+
+def listed_expiry_calendar(
+    symbol: str, start_year: int, fetcher: Optional[NSEDataFetcher] = None
+) -> ExpiryCalendar:
+    """
+    Expiry calendar reaching back before the listed NSE holidays.
+
+    Expiries of the years before ``FIRST_HOLIDAY_YEAR`` are taken from NSE's
+    expiry list of the symbol, where they are already moved off holidays.
+
+    Raises:
+        ValueError: If NSE does not list an expiry for every earlier month
+    """
+    nse = fetcher or NSEDataFetcher()
+    listed = [
+        parse_expiry(expiry)
+        for year in range(start_year, FIRST_HOLIDAY_YEAR)
+        for expiry in nse.get_expiry_dates(symbol, year)
+    ]
+    return ExpiryCalendar(start_year, listed_expiries=listed)
+
+
+def iter_continuous_chunks(
+    symbol: str,
+    start_date: date,
+    end_date: date,
+    fetcher: Optional[NSEDataFetcher] = None,
+    expiry_calendar: Optional[ExpiryCalendar] = None,
+    use_cache_for_future: bool = True,
+) -> Iterator[pd.DataFrame]:
+    """
+    Yield the continuous table of a symbol one expiry segment at a time.
+
+    Contracts are read through the fetcher, so expiries already in the cache
+    are not requested again. A contract is dropped once it has been the
+    current month, keeping at most three in memory.
+
+    Args:
+        symbol: Stock symbol (e.g., 'SBIN')
+        start_date: First date of the series
+        end_date: Last date of the series
+        fetcher: NSE data fetcher (default: a new one)
+        expiry_calendar: Calendar deciding the contract of each leg
+            (default: the NSE calendar, with listed expiries for years
+            before its holidays)
+        use_cache_for_future: Use cached data even for live contracts
+
+    Yields:
+        pd.DataFrame: Continuous table rows of one segment, in date order
+
+    Raises:
+        ValueError: If ``start_date`` is before the expiry calendar
+    """
+    nse = fetcher or NSEDataFetcher()
+    if expiry_calendar is None:
+        if start_date.year < FIRST_HOLIDAY_YEAR:
+            expiry_calendar = listed_expiry_calendar(
+                symbol, start_date.year, nse
+            )
+        else:
+            expiry_calendar = get_expiry_calendar()
+    if start_date.year < expiry_calendar.start_year:
+        raise ValueError(
+            f"Expiries are only known from {expiry_calendar.start_year}, "
+            f"cannot start at {start_date}"
+        )
+    expiries = expiry_calendar.expiries
+    first = int(expiry_calendar.positions(start_date))
+    last = int(expiry_calendar.positions(end_date))
+
+    contracts: Dict[str, Optional[pd.DataFrame]] = {}
+    for position in range(first, last + 1):
+        segment_start = start_date
+        if position > 0:
+            previous_expiry = expiries[position - 1].astype(date)
+            segment_start = max(previous_expiry + timedelta(days=1), start_date)
+        segment_end = min(expiries[position].astype(date), end_date)
+
+        needed = [
+            format_expiry(expiries[position + offset])
+            for offset in range(len(LEGS))
+        ]
+        for expiry in list(contracts):
+            if expiry not in needed:
+                del contracts[expiry]
+        for expiry in needed:
+            if expiry not in contracts:
+                expiry_day = parse_expiry(expiry)
+                from_date = expiry_day - timedelta(days=CONTRACT_LIFE_DAYS)
+                contracts[expiry] = nse.get_futures_data(
+                    symbol,
+                    from_date.strftime("%d-%m-%Y"),
+                    expiry_day.strftime("%d-%m-%Y"),
+                    expiry,
+                    use_cache_for_future,
+                )
+
+        in_segment = {}
+        for expiry, df in contracts.items():
+            if df is None or df.empty:
+                continue
+            dates = df["Date"]
+            rows = df[
+                (dates >= pd.Timestamp(segment_start))
+                & (dates <= pd.Timestamp(segment_end))
+            ]
+            if not rows.empty:
+                in_segment[expiry] = rows
+
+        chunk = build_continuous_table(in_segment, expiry_calendar)
+        if not chunk.empty:
+            yield chunk
+
+
+def get_long_history(
+    symbol: str,
+    start_date: date,
+    end_date: Optional[date] = None,
+    **kwargs,
+) -> pd.DataFrame:
+    """Whole continuous table between two dates, built segment by segment."""
+    end_date = end_date or date.today()
+    chunks = list(
+        iter_continuous_chunks(symbol, start_date, end_date, **kwargs)
+    )
+    if not chunks:
+        return build_continuous_table({})
+    return pd.concat(chunks, ignore_index=True)
+
+
+def write_parquet(
+    symbol: str,
+    path: str,
+    start_date: date,
+    end_date: Optional[date] = None,
+    **kwargs,
+) -> int:
+    """
+    Stream the continuous table of a symbol into a Parquet file.
+
+    Each segment is written as its own row group, so the table is never
+    held in memory as a whole. Requires pyarrow (installed with streamlit).
+
+    Returns:
+        int: Number of rows written
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    end_date = end_date or date.today()
+    writer = None
+    rows = 0
+    try:
+        for chunk in iter_continuous_chunks(
+            symbol, start_date, end_date, **kwargs
+        ):
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table.cast(writer.schema))
+            rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Build a multi-year continuous futures series"
+    )
+    parser.add_argument("symbol", help="Stock symbol (e.g. SBIN)")
+    parser.add_argument(
+        "--years", type=float, default=5, help="Lookback in years (default: 5)"
+    )
+    parser.add_argument("--parquet", help="Write the series to this file")
+    parser.add_argument(
+        "--fresh",
+        action="store_true",
+        help="Refetch live contracts instead of using cached data",
+    )
+    args = parser.parse_args()
+
+    end_date = date.today()
+    start_date = end_date - timedelta(days=int(args.years * 365))
+    kwargs = {"use_cache_for_future": not args.fresh}
+
+    if args.parquet:
+        rows = write_parquet(
+            args.symbol, args.parquet, start_date, end_date, **kwargs
+        )
+        print(f"Wrote {rows} rows to {args.parquet}")
+        return
+
+    for chunk in iter_continuous_chunks(
+        args.symbol, start_date, end_date, **kwargs
+    ):
+        print(
+            f"{chunk['Date'].iloc[0]} to {chunk['Date'].iloc[-1]}: "
+            f"{len(chunk)} rows, mean spread {chunk['Spread'].mean():.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
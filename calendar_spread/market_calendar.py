@@ -0,0 +1,175 @@
+"""
+NSE trading calendar: holidays, session hours and end-of-day publication.
+
+Used to decide when cached futures data is final. A trading day's bhavcopy
+is published some time after the 15:30 IST close; once ``EOD_PUBLISH`` has
+passed, data fetched for that day will not change.
+"""
+
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Optional
+
+import numpy as np
+
+IST = timezone(timedelta(hours=5, minutes=30), "IST")
+SESSION_OPEN = time(9, 15)
+SESSION_CLOSE = time(15, 30)
+EOD_PUBLISH = time(18, 30)
+
+# NSE equity and derivatives trading holidays falling on weekdays
+NSE_HOLIDAYS = {
+    2024: [
+        "2024-01-22",
+        "2024-01-26",
+        "2024-03-08",
+        "2024-03-25",
+        "2024-03-29",
+        "2024-04-11",
+        "2024-04-17",
+        "2024-05-01",
+        "2024-05-20",
+        "2024-06-17",
+        "2024-07-17",
+        "2024-08-15",
+        "2024-10-02",
+        "2024-11-01",
+        "2024-11-15",
+        "2024-11-20",
+        "2024-12-25",
+    ],
+    2025: [
+        "2025-02-26",
+        "2025-03-14",
+        "2025-03-31",
+        "2025-04-10",
+        "2025-04-14",
+        "2025-04-18",
+        "2025-05-01",
+        "2025-08-15",
+        "2025-08-27",
+        "2025-10-02",
+        "2025-10-21",
+        "2025-10-22",
+        "2025-11-05",
+        "2025-12-25",
+    ],
+    2026: [
+        "2026-01-15",
+        "2026-01-26",
+        "2026-03-03",
+        "2026-03-26",
+        "2026-03-31",
+        "2026-04-03",
+        "2026-04-14",
+        "2026-05-01",
+        "2026-05-28",
+        "2026-06-26",
+        "2026-09-14",
+        "2026-10-02",
+        "2026-10-20",
+        "2026-11-10",
+        "2026-11-24",
+        "2026-12-25",
+    ],
+    # Fixed-date holidays only, until NSE publishes the 2027 circular
+    2027: [
+        "2027-01-26",
+        "2027-04-14",
+    ],
+}
+
+# Years whose holiday list is known to be incomplete
+PROVISIONAL_HOLIDAY_YEARS = (2027,)
+
+# Holidays outside these years are not listed, so those dates are unreliable
+FIRST_HOLIDAY_YEAR = min(NSE_HOLIDAYS)
+LAST_HOLIDAY_YEAR = max(NSE_HOLIDAYS)
+
+HOLIDAYS = np.array(
+    [day for days in NSE_HOLIDAYS.values() for day in days],
+    dtype="datetime64[D]",
+)
+BUSDAY_CALENDAR = np.busdaycalendar(weekmask="1111100", holidays=HOLIDAYS)
+
+
+def now_ist() -> datetime:
+    """Current time in India."""
+    return datetime.now(IST)
+
+
+def _as_ist(moment: Optional[datetime]) -> datetime:
+    if moment is None:
+        return now_ist()
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=IST)
+    return moment.astimezone(IST)
+
+
+def is_trading_day(day: date) -> bool:
+    """Whether NSE is open on a date."""
+    return bool(
+        np.is_busday(np.datetime64(day, "D"), busdaycal=BUSDAY_CALENDAR)
+    )
+
+
+def previous_trading_day(day: date) -> date:
+    """Latest trading day strictly before a date."""
+    return np.busday_offset(
+        np.datetime64(day, "D"), -1, roll="forward", busdaycal=BUSDAY_CALENDAR
+    ).astype(date)
+
+
+def last_trading_day_on_or_before(day: date) -> date:
+    """The date itself if NSE is open then, else the trading day before."""
+    return np.busday_offset(
+        np.datetime64(day, "D"), 0, roll="backward", busdaycal=BUSDAY_CALENDAR
+    ).astype(date)
+
+
+def trading_days(start: date, end: date) -> np.ndarray:
+    """Trading days from ``start`` to ``end`` inclusive as datetime64[D]."""
+    days = np.arange(
+        np.datetime64(start, "D"),
+        np.datetime64(end, "D") + 1,
+        dtype="datetime64[D]",
+    )
+    return days[np.is_busday(days, busdaycal=BUSDAY_CALENDAR)]
+
+
+def publish_time(day: date) -> datetime:
+    """When end-of-day data for a trading day is considered final."""
+    return datetime.combine(day, EOD_PUBLISH, tzinfo=IST)
+
+
+def is_session_open(moment: Optional[datetime] = None) -> bool:
+    """Whether the market is trading at a moment (default: now)."""
+    moment = _as_ist(moment)
+    return (
+        is_trading_day(moment.date())
+        and SESSION_OPEN <= moment.time() < SESSION_CLOSE
+    )
+
+
+def last_published_session(moment: Optional[datetime] = None) -> date:
+    """Latest trading day whose end-of-day data is published at a moment."""
+    moment = _as_ist(moment)
+    today = moment.date()
+    if is_trading_day(today) and moment.time() >= EOD_PUBLISH:
+        return today
+    return previous_trading_day(today)
+
+
+def is_published(day: date, moment: Optional[datetime] = None) -> bool:
+    """Whether end-of-day data up to and including ``day`` is published."""
+    return last_trading_day_on_or_before(day) <= last_published_session(moment)
+
+
+def is_fresh(fetched_at: datetime, moment: Optional[datetime] = None) -> bool:
+    """
+    Whether data fetched at ``fetched_at`` still includes every published day.
+
+    Data fetched after the latest publication cannot gain new end-of-day rows
+    before the next one, so evening, weekend and holiday scans, and scans
+    during the next session, can all use it.
+    """
+    return _as_ist(fetched_at) >= publish_time(last_published_session(moment))
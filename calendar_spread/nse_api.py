@@ -2,18 +2,23 @@
 Common module for NSE India API fetching logic.
 """
 
-import json
+import os
 import time
 from datetime import datetime, timedelta
-from io import StringIO
 from pathlib import Path
 from typing import Dict, List, Optional
 
+import numpy as np
 import pandas as pd
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+from calendar_spread import fast_json, market_calendar, timing
+from calendar_spread.fetch_log import FetchLog
+from calendar_spread.futures_cache import CacheEntry, FuturesCache
+from calendar_spread.http_cache import ResponseCache, endpoint_ttl
+
 
 class NSESession:
     _instance = None
@@ -21,8 +26,10 @@ class NSESession:
     _cookies = None
     _last_cookie_refresh = None
     COOKIE_MAX_AGE = 60  # 1 minute in seconds
+    COOKIE_WAIT = 2  # Seconds to wait for cookies to be set
 
-    BASE_URL = "https://www.nseindia.com"
+    # Overridable to point at a local stand-in such as nse_replay
+    BASE_URL = os.environ.get("NSE_BASE_URL", "https://www.nseindia.com")
     headers = {
         "user-agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/87.0.4280.88 Safari/537.36",
         "accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.9",
@@ -54,7 +61,7 @@ class NSESession:
             self._session.get(
                 f"{self.BASE_URL}/", headers=self.headers, timeout=30
             )
-            time.sleep(2)  # Wait for cookies to be set
+            time.sleep(self.COOKIE_WAIT)
 
             # Visit market data page to get required cookies
             self._session.get(
@@ -94,10 +101,82 @@ class NSESession:
         self._init_session()
 
 
+# NSE historical futures field -> (column, dtype); other fields are dropped
+FUTURES_SCHEMA = {
+    "FH_TIMESTAMP": ("Date", "datetime64[ns]"),
+    "FH_EXPIRY_DT": ("Expiry", "category"),
+    "FH_OPENING_PRICE": ("Open", "float32"),
+    "FH_TRADE_HIGH_PRICE": ("High", "float32"),
+    "FH_TRADE_LOW_PRICE": ("Low", "float32"),
+    "FH_CLOSING_PRICE": ("Close", "float32"),
+    "FH_SETTLE_PRICE": ("Settlement Price", "float32"),
+    "FH_TOT_TRADED_QTY": ("Volume", "int64"),
+    "FH_OPEN_INT": ("Open Interest", "int64"),
+    "FH_CHANGE_IN_OI": ("Change in OI", "int64"),
+    "FH_MARKET_LOT": ("Lot Size", "int64"),
+}
+NSE_DATE_FORMAT = "%d-%b-%Y"
+
+
+def parse_futures_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Project NSE futures rows onto ``FUTURES_SCHEMA`` with compact dtypes.
+
+    Accepts raw payload rows as well as cached frames, including entries
+    cached before the schema existed. All numeric fields are cleaned of
+    thousands separators and parsed together in one pass; missing integer
+    values become 0.
+
+    Args:
+        df: Rows with NSE field names and/or schema column names
+
+    Returns:
+        pd.DataFrame: Schema columns present in ``df``, sorted by date
+    """
+    df = df.rename(
+        columns={
+            field: column
+            for field, (column, _) in FUTURES_SCHEMA.items()
+            if field in df.columns and column not in df.columns
+        }
+    )
+    dtypes = dict(FUTURES_SCHEMA.values())
+    columns = [column for column in dtypes if column in df.columns]
+    numeric = [c for c in columns if dtypes[c] in ("float32", "int64")]
+
+    result = pd.DataFrame(index=df.index)
+    if "Date" in columns:
+        dates = df["Date"]
+        if not pd.api.types.is_datetime64_any_dtype(dates):
+            # Payloads use DD-Mon-YYYY, cache files ISO 8601
+            iso = len(dates) and str(dates.iloc[0])[4:5] == "-"
+            dates = pd.to_datetime(
+                dates, format="ISO8601" if iso else NSE_DATE_FORMAT
+            )
+        result["Date"] = dates.astype("datetime64[ns]")
+    if "Expiry" in columns:
+        result["Expiry"] = df["Expiry"].astype("category")
+    if numeric:
+        values = fast_json.parse_numbers(
+            df[numeric].to_numpy().ravel().tolist()
+        )
+        values = values.reshape(len(df), len(numeric))
+        for i, column in enumerate(numeric):
+            if dtypes[column] == "int64":
+                result[column] = np.nan_to_num(values[:, i]).astype(np.int64)
+            else:
+                result[column] = values[:, i].astype(np.float32)
+
+    result = result[columns]
+    if "Date" in columns:
+        result = result.sort_values("Date", ignore_index=True)
+    return result
+
+
 class NSEDataFetcher:
     """Class to handle NSE data fetching with session management."""
 
-    BASE_URL = "https://www.nseindia.com"
+    BASE_URL = NSESession.BASE_URL
     # Define cache directory using absolute path and create it if it doesn't exist
     CACHE_DIR = Path(__file__).parent / "cache"
     REQUEST_DELAY = 1.0  # Delay between requests in seconds
@@ -105,15 +184,53 @@ class NSEDataFetcher:
     _last_request_time = None
     _request_timestamps: List[datetime] = []
 
-    def __init__(self):
+    def __init__(
+        self,
+        response_cache: Optional[ResponseCache] = None,
+        fetch_log: Optional[FetchLog] = None,
+    ):
         """Initialize NSE data fetcher."""
-        self.nse_session = NSESession()
-        self.BASE_URL = self.nse_session.BASE_URL
-        self.cookies = self.nse_session.cookies
-        self.headers = self.nse_session.headers
+        self._nse_session: Optional[NSESession] = None
+        self.BASE_URL = NSESession.BASE_URL
+        self.headers = NSESession.headers
         self._last_request_time = datetime.now()
         self._request_timestamps = []
         self.CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        self._futures_cache: Optional[FuturesCache] = None
+        self.response_cache = response_cache or ResponseCache()
+        self.fetch_log = fetch_log or FetchLog()
+
+    @property
+    def nse_session(self) -> NSESession:
+        """NSE session, created on the first request that needs the network."""
+        if self._nse_session is None:
+            self._nse_session = NSESession()
+        return self._nse_session
+
+    @property
+    def cookies(self) -> dict:
+        return self.nse_session.cookies
+
+    def _get(self, url: str, headers: dict) -> requests.Response:
+        """
+        GET a URL, serving cacheable endpoints from the response cache.
+
+        Only successful, non-empty responses of endpoints with a TTL in
+        ``ENDPOINT_TTLS`` are cached; everything else goes to NSE.
+        """
+        ttl = endpoint_ttl(url)
+        if ttl is not None:
+            cached = self.response_cache.get(url, ttl)
+            if cached is not None:
+                return cached
+
+        with timing.stage("fetch"):
+            response = self.nse_session.session.get(
+                url, headers=headers, cookies=self.cookies, timeout=30
+            )
+        if ttl is not None and response.status_code == 200 and response.content:
+            self.response_cache.set(url, response)
+        return response
 
     def _wait_for_rate_limit(self) -> None:
         """
@@ -164,19 +281,14 @@ class NSEDataFetcher:
                 }
             )
 
-            response = self.nse_session.session.get(
-                url,
-                headers=request_headers,
-                cookies=self.cookies,
-                timeout=30,
-            )
+            response = self._get(url, request_headers)
             response.raise_for_status()
 
             if not response.text:
                 print("Empty response received")
                 return {"indices": [], "stocks": []}
 
-            data = response.json()
+            data = fast_json.loads(response.content)
             if isinstance(data, dict) and "data" in data:
                 return {
                     "indices": [],
@@ -189,53 +301,111 @@ class NSEDataFetcher:
             print(f"Error fetching underlying information: {str(e)}")
             return {"indices": [], "stocks": []}
 
-    def _get_cache_path(self, symbol: str) -> Path:
-        """Get the cache file path for a symbol."""
-        return self.CACHE_DIR / f"{symbol}.json"
+    def get_expiry_dates(
+        self, symbol: str, year: int, instrument: str = "FUTSTK"
+    ) -> List[str]:
+        """
+        Expiry dates NSE lists for a symbol's contracts of one year.
+
+        These are the actual expiries, already moved off holidays, so they
+        cover years whose holidays are not in ``market_calendar``.
+
+        Args:
+            symbol: Stock symbol (e.g., 'SBIN')
+            year: Calendar year
+            instrument: NSE instrument type
+
+        Returns:
+            List[str]: Expiries in DD-Mon-YYYY format, empty on failure
+        """
+        try:
+            url = (
+                f"{self.BASE_URL}/api/historical/foCPV/expireDts"
+                f"?instrument={instrument}&symbol={symbol}&year={year}"
+            )
+            request_headers = self.headers.copy()
+            request_headers.update(
+                {
+                    "Accept-Encoding": "gzip, deflate, br",
+                    "Accept": "application/json, text/plain, */*",
+                }
+            )
+
+            response = self._get(url, request_headers)
+            response.raise_for_status()
+            data = fast_json.loads(response.content)
+            if isinstance(data, dict):
+                return list(data.get("expiresDts") or [])
+            return []
+
+        except Exception as e:
+            print(f"Error fetching expiry dates for {symbol} {year}: {str(e)}")
+            return []
+
+    @property
+    def futures_cache(self) -> FuturesCache:
+        """Per-expiry cache files under ``CACHE_DIR``."""
+        if self._futures_cache is None or (
+            self._futures_cache.cache_dir != Path(self.CACHE_DIR)
+        ):
+            self._futures_cache = FuturesCache(self.CACHE_DIR)
+        return self._futures_cache
 
     def _read_cache(
-        self, symbol: str, expiry_date: str
+        self, symbol: str, expiry_date: str, entry: Optional[CacheEntry] = None
     ) -> Optional[pd.DataFrame]:
         """Read cached data for a symbol and expiry date."""
-        cache_path = self._get_cache_path(symbol)
-        if cache_path.exists():
-            try:
-                with open(cache_path, "r") as f:
-                    cache_data = json.load(f)
-                    if expiry_date in cache_data:
-                        return pd.read_json(
-                            StringIO(cache_data[expiry_date]),
-                            orient="records",
-                            convert_dates=["Date"],
-                        )
-            except Exception as e:
-                print(f"Error reading cache: {e}")
-        return None
+        if entry is None:
+            entry = self.futures_cache.read(symbol, expiry_date)
+        if entry is None:
+            return None
+        try:
+            df = entry.data
+            with timing.stage("parse"):
+                return parse_futures_frame(df) if not df.empty else df
+        except Exception as e:
+            print(f"Error reading cache: {e}")
+            return None
+
+    def _is_cache_fresh(
+        self,
+        expiry_date: str,
+        meta: Optional[dict],
+        now: Optional[datetime] = None,
+    ) -> bool:
+        """
+        Whether a cached expiry can be used instead of fetching it again.
+
+        Entries are final once the expiry day's end-of-day data was published
+        before they were fetched. Other entries stay fresh until the next
+        trading day's data is published. Entries written before fetch times
+        were recorded fall back to the past-month rule.
+
+        Args:
+            expiry_date: Expiry date in DD-MMM-YYYY format
+            meta: Fetch metadata of the cached entry, None if unknown
+            now: Override for the current time
+        """
+        if meta is None:
+            return self._is_past_date(expiry_date)
+        if meta.get("final"):
+            return True
+        fetched_at = datetime.fromisoformat(meta["fetched_at"])
+        return market_calendar.is_fresh(fetched_at, now)
 
     def _write_cache(
         self, symbol: str, expiry_date: str, data: pd.DataFrame
     ) -> None:
-        """Write data to cache."""
-        cache_path = self._get_cache_path(symbol)
-
-        # Read existing cache or create new
-        if cache_path.exists():
-            try:
-                with open(cache_path, "r") as f:
-                    cache_data = json.load(f)
-            except json.JSONDecodeError:
-                cache_data = {}
-        else:
-            cache_data = {}
-
-        # Update cache with new data
-        cache_data[expiry_date] = data.to_json(
-            orient="records", date_format="iso"
-        )
-
-        # Write updated cache
-        with open(cache_path, "w") as f:
-            json.dump(cache_data, f)
+        """Atomically write one expiry to the cache."""
+        # Record when it was fetched and whether it can still change
+        fetched_at = market_calendar.now_ist()
+        expiry = datetime.strptime(expiry_date, "%d-%b-%Y").date()
+        meta = {
+            "fetched_at": fetched_at.isoformat(),
+            "final": market_calendar.is_published(expiry, fetched_at),
+        }
+        with timing.stage("cache_write"):
+            self.futures_cache.write(symbol, expiry_date, data, meta)
 
     def _is_past_date(self, expiry_date: str) -> bool:
         """
@@ -264,7 +434,8 @@ class NSEDataFetcher:
     ) -> Optional[pd.DataFrame]:
         """
         Fetch futures data with automatic cache management and rate limiting.
-        Always fetches fresh data for current and future month expiries.
+        Cached expiries are refetched only after newer end-of-day data has
+        been published, and never once the expiry's own data was final.
 
         Args:
             symbol: Stock symbol (e.g., 'SBIN')
@@ -273,19 +444,32 @@ class NSEDataFetcher:
             expiry_date: Expiry date in DD-MMM-YYYY format
             use_cache: Whether to use cached data if available (for past expiries only)
         """
-        # Determine if we should use cache based on expiry date
-        should_use_cache = self._is_past_date(expiry_date)
+        # Use the cache while no newer end-of-day data has been published
+        with timing.stage("cache_read"):
+            entry = self.futures_cache.read(symbol, expiry_date, track=False)
+        should_use_cache = self._is_cache_fresh(
+            expiry_date, entry.meta if entry else None
+        )
 
         if use_cache_for_future:
             should_use_cache = True
 
-        # Check cache first if enabled and expiry is in the past
+        # Check cache first if enabled and still fresh
         if should_use_cache:
-            cached_df = self._read_cache(symbol, expiry_date)
+            cached_df = self._read_cache(symbol, expiry_date, entry)
             if cached_df is not None:
                 print(f"Using cached data for {symbol} expiry {expiry_date}")
+                self.futures_cache.record_lookup(symbol, expiry_date, True)
                 return cached_df
 
+        # Missing or stale entries are misses, even when they exist
+        self.futures_cache.record_lookup(symbol, expiry_date, False)
+
+        # Skip combinations NSE recently answered with no data
+        if self.fetch_log.is_known_empty(symbol, expiry_date):
+            print(f"No data for {symbol} expiry {expiry_date} (negative cache)")
+            return None
+
         # Fetch fresh data if:
         # 1. Cache is disabled
         # 2. Expiry is current/future month
@@ -319,70 +503,38 @@ class NSEDataFetcher:
                 }
             )
 
-            response = self.nse_session.session.get(
-                url, headers=request_headers, cookies=self.cookies, timeout=30
-            )
+            response = self._get(url, request_headers)
 
             print(response.status_code)
 
             response.raise_for_status()
 
             try:
-                data = response.json()
+                with timing.stage("parse"):
+                    data = fast_json.loads(response.content)
             except ValueError as e:
                 print("Failed to parse JSON response")
                 print(f"Error: {str(e)}")
+                self.fetch_log.record_failure(
+                    symbol, from_date, to_date, expiry_date, str(e)
+                )
                 return None
 
             if isinstance(data, dict) and "data" in data:
-                df = pd.DataFrame(data["data"])
+                # Keep only the schema fields as columns, typed in one pass
+                with timing.stage("parse"):
+                    df = pd.DataFrame(
+                        fast_json.record_columns(data["data"], FUTURES_SCHEMA)
+                    )
+                    if not df.empty:
+                        df = parse_futures_frame(df)
 
                 if df.empty:
+                    # Not cached, so the negative-cache TTL decides retries
                     print(f"No data found for {symbol} expiry {expiry_date}")
-                    self._write_cache(symbol, expiry_date, df)
+                    self.fetch_log.mark_empty(symbol, expiry_date)
                     return df
 
-                # Rename columns to standard format
-                column_mapping = {
-                    "FH_TIMESTAMP": "Date",
-                    "FH_OPENING_PRICE": "Open",
-                    "FH_HIGH_PRICE": "High",
-                    "FH_LOW_PRICE": "Low",
-                    "FH_CLOSING_PRICE": "Close",
-                    "FH_TOT_TRADED_QTY": "Volume",
-                    "FH_OPEN_INT": "Open Interest",
-                    "FH_SETTLE_PRICE": "Settlement Price",
-                }
-
-                # Convert numeric columns
-                numeric_columns = [
-                    "FH_OPENING_PRICE",
-                    "FH_HIGH_PRICE",
-                    "FH_LOW_PRICE",
-                    "FH_CLOSING_PRICE",
-                    "FH_TOT_TRADED_QTY",
-                    "FH_OPEN_INT",
-                    "FH_SETTLE_PRICE",
-                ]
-
-                for col in numeric_columns:
-                    if col in df.columns:
-                        df[col] = pd.to_numeric(
-                            df[col].str.replace(",", ""), errors="coerce"
-                        )
-
-                # Rename columns that exist in the DataFrame
-                existing_columns = {
-                    old: new
-                    for old, new in column_mapping.items()
-                    if old in df.columns
-                }
-                df = df.rename(columns=existing_columns)
-                # Convert date column
-                if "Date" in df.columns:
-                    df["Date"] = pd.to_datetime(df["Date"], format="%d-%b-%Y")
-                # Sort by date
-                df = df.sort_values("Date")
                 print(
                     f"Successfully fetched {len(df)} records for {symbol} "
                     f"expiry {expiry_date}"
@@ -390,13 +542,18 @@ class NSEDataFetcher:
 
                 if df is not None and not df.empty:
                     self._write_cache(symbol, expiry_date, df)
+                    self.fetch_log.clear(symbol, expiry_date)
                     return df
 
                 return None
 
             print(f"No data found for {symbol} expiry {expiry_date}")
+            self.fetch_log.mark_empty(symbol, expiry_date)
             return None
 
         except Exception as e:
             print(f"Error fetching futures data for {symbol}: {str(e)}")
+            self.fetch_log.record_failure(
+                symbol, from_date, to_date, expiry_date, str(e)
+            )
             return None
@@ -0,0 +1,578 @@
+"""
+Offline record/replay stand-in for the NSE website, APIs and archives.
+
+``record`` runs a local proxy that forwards every request to NSE and saves
+the response together with the cookies NSE set. ``serve`` answers the same
+requests from the recordings without touching the network. Either one is
+used by pointing the app at it::
+
+    python -m calendar_spread.nse_replay record --port 8765
+    export NSE_BASE_URL=http://127.0.0.1:8765
+    export NSE_ARCHIVES_URL=http://127.0.0.1:8765
+    streamlit run calendar_spread/app.py
+
+    python -m calendar_spread.nse_replay serve --port 8765 --latency 0.3 \\
+        --error-rate 0.05 --forbidden-rate 0.02 --rate-limit 30
+
+Historical futures responses are recorded without their ``from``/``to``
+window and replayed filtered to the requested dates, so a recording stays
+usable for any window within the recorded one as the windows computed from
+today move on. Rows of later recordings of the same contract are merged
+into the earlier ones, so a narrow window never truncates a wider one.
+``seed`` creates recordings from the futures cache, for scans of the cached
+symbols without recording anything.
+
+Replay can misbehave the way NSE does: added latency, 503 errors, 403 bot
+blocks, 401 for API calls made without the homepage cookies, and 429 once
+a client goes over the per-minute request limit.
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Deque, Dict, Iterable, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import pandas as pd
+import requests
+
+from calendar_spread.futures_cache import CACHE_DIR, FuturesCache
+from calendar_spread.nse_api import (
+    FUTURES_SCHEMA,
+    NSE_DATE_FORMAT,
+    parse_futures_frame,
+)
+
+RECORDINGS_DIR = Path(__file__).parent / "recordings"
+
+NSE_URL = "https://www.nseindia.com"
+ARCHIVES_URL = "https://archives.nseindia.com"
+# Path prefixes served by the archives host
+ARCHIVES_PATHS = ("/content/",)
+
+HISTORICAL_PATH = "/api/historical/fo/derivatives"
+# Query parameters left out of recording keys, by path prefix
+WINDOW_PARAMS = {"/api/historical/": ("from", "to")}
+WINDOW_DATE_FORMAT = "%d-%m-%Y"
+
+# Request headers passed on to NSE while recording. Conditional headers are
+# not, so every recording holds a full body.
+FORWARDED_HEADERS = ("user-agent", "accept", "accept-language", "referer")
+# Response headers worth replaying. Bodies are stored decoded, so the
+# encoding and length headers are regenerated.
+REPLAYED_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Cache-Control")
+
+# Cookie the API calls require, set by every page response
+SESSION_COOKIE = "nsit"
+
+
+def request_key(path: str) -> str:
+    """
+    Recording key of a request: its path and sorted query parameters.
+
+    Date window parameters of historical endpoints are left out.
+    """
+    parts = urlsplit(path)
+    ignored = next(
+        (
+            params
+            for prefix, params in WINDOW_PARAMS.items()
+            if parts.path.startswith(prefix)
+        ),
+        (),
+    )
+    query = sorted(
+        (name, value)
+        for name, value in parse_qsl(parts.query)
+        if name not in ignored
+    )
+    return f"{parts.path}?{urlencode(query)}" if query else parts.path
+
+
+def make_record(
+    status: int,
+    headers: Dict[str, str],
+    body: bytes,
+    cookies: Optional[Dict[str, str]] = None,
+) -> dict:
+    """A response as stored in a recording file."""
+    record = {
+        "status": status,
+        "headers": {
+            name: headers[name] for name in REPLAYED_HEADERS if name in headers
+        },
+        "cookies": cookies or {},
+    }
+    try:
+        record["body"] = body.decode("utf-8")
+    except UnicodeDecodeError:
+        record["body_base64"] = base64.b64encode(body).decode("ascii")
+    return record
+
+
+def json_record(payload) -> dict:
+    """A 200 JSON response carrying ``payload``."""
+    return make_record(
+        200,
+        {"Content-Type": "application/json"},
+        json.dumps(payload).encode("utf-8"),
+    )
+
+
+def record_body(record: dict) -> bytes:
+    if "body_base64" in record:
+        return base64.b64decode(record["body_base64"])
+    return record.get("body", "").encode("utf-8")
+
+
+def filter_window(body: bytes, query: str) -> bytes:
+    """Keep the historical rows within the request's from/to dates."""
+    params = dict(parse_qsl(query))
+    try:
+        start = datetime.strptime(params["from"], WINDOW_DATE_FORMAT)
+        end = datetime.strptime(params["to"], WINDOW_DATE_FORMAT)
+        payload = json.loads(body)
+        payload["data"] = [
+            row
+            for row in payload["data"]
+            if start
+            <= datetime.strptime(row["FH_TIMESTAMP"], NSE_DATE_FORMAT)
+            <= end
+        ]
+    except (KeyError, TypeError, ValueError):
+        return body
+    return json.dumps(payload).encode("utf-8")
+
+
+def merge_rows(old: dict, new: dict) -> dict:
+    """
+    Historical rows of two recordings of one request, newer rows winning.
+
+    Returns ``new`` unchanged when either body is not a historical payload.
+    """
+    try:
+        rows = {}
+        for record in (old, new):
+            for row in json.loads(record_body(record))["data"]:
+                rows[row["FH_TIMESTAMP"]] = row
+        payload = json.loads(record_body(new))
+    except (KeyError, TypeError, ValueError):
+        return new
+    payload["data"] = sorted(
+        rows.values(),
+        key=lambda row: datetime.strptime(row["FH_TIMESTAMP"], NSE_DATE_FORMAT),
+    )
+    merged = make_record(
+        new["status"], new["headers"], json.dumps(payload).encode("utf-8")
+    )
+    merged["cookies"] = new.get("cookies") or {}
+    return merged
+
+
+class RecordingStore:
+    """Recorded responses, one JSON file per request key."""
+
+    def __init__(self, directory: Path = RECORDINGS_DIR):
+        self.directory = Path(directory)
+
+    def path(self, key: str) -> Path:
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return self.directory / f"{digest}.json"
+
+    def get(self, key: str) -> Optional[dict]:
+        try:
+            with open(self.path(key), "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"Error reading recording: {e}")
+            return None
+
+    def put(self, key: str, record: dict) -> Path:
+        """Atomically store the response of a request key."""
+        path = self.path(key)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(dict(record, key=key), f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return path
+
+    def keys(self) -> List[str]:
+        keys = []
+        for path in self.directory.glob("*.json"):
+            with open(path, "r") as f:
+                keys.append(json.load(f)["key"])
+        return sorted(keys)
+
+
+class Faults:
+    """
+    Misbehaviour injected into replayed responses.
+
+    Args:
+        latency: Seconds added to every response
+        jitter: Up to this many extra seconds, drawn per response
+        error_rate: Share of requests answered with 503
+        forbidden_rate: Share of requests answered with 403
+        rate_limit: Requests allowed per minute before 429s, None for no
+            limit
+        require_cookies: Answer API calls without the session cookie with
+            401
+        seed: Random seed, for reproducible failure sequences
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        forbidden_rate: float = 0.0,
+        rate_limit: Optional[int] = None,
+        require_cookies: bool = False,
+        seed: Optional[int] = None,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.forbidden_rate = forbidden_rate
+        self.rate_limit = rate_limit
+        self.require_cookies = require_cookies
+        self._random = random.Random(seed)
+        self._requests: Deque[float] = deque()
+        self._lock = threading.Lock()
+
+    def delay(self) -> float:
+        with self._lock:
+            return self.latency + self._random.uniform(0, self.jitter)
+
+    def status(
+        self, path: str, cookies: Dict[str, str], now: Optional[float] = None
+    ) -> Optional[int]:
+        """Error status to answer a request with, None to serve it."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if self.rate_limit is not None:
+                while self._requests and now - self._requests[0] >= 60:
+                    self._requests.popleft()
+                if len(self._requests) >= self.rate_limit:
+                    return 429
+                self._requests.append(now)
+            if (
+                self.require_cookies
+                and path.startswith("/api/")
+                and SESSION_COOKIE not in cookies
+            ):
+                return 401
+            if self._random.random() < self.forbidden_rate:
+                return 403
+            if self._random.random() < self.error_rate:
+                return 503
+        return None
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "ReplayServer"
+
+    def do_GET(self) -> None:
+        server = self.server
+        parts = urlsplit(self.path)
+        if server.upstream is not None:
+            try:
+                record = server.record(self.path, self.headers)
+            except requests.RequestException as e:
+                print(f"Error recording {self.path}: {e}")
+                self._send_status(502)
+                return
+        else:
+            time.sleep(server.faults.delay())
+            status = server.faults.status(parts.path, self._cookies())
+            if status is not None:
+                self._send_status(status)
+                return
+            record = server.store.get(request_key(self.path))
+            if record is None and not parts.path.startswith(
+                ("/api/", *ARCHIVES_PATHS)
+            ):
+                # Pages only matter for the cookies they set
+                record = make_record(200, {"Content-Type": "text/html"}, b"")
+            if record is None:
+                self._send_status(404)
+                return
+
+        body = record_body(record)
+        if parts.path.startswith(tuple(WINDOW_PARAMS)):
+            body = filter_window(body, parts.query)
+        headers = record["headers"]
+        etag = headers.get("ETag")
+        if etag and self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        self.send_response(record["status"])
+        for name, value in headers.items():
+            self.send_header(name, value)
+        cookies = dict(record.get("cookies") or {})
+        if not parts.path.startswith("/api/"):
+            cookies.setdefault(SESSION_COOKIE, "replay")
+        for name, value in cookies.items():
+            self.send_header("Set-Cookie", f"{name}={value}; Path=/")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _cookies(self) -> Dict[str, str]:
+        cookies = {}
+        for pair in self.headers.get("Cookie", "").split(";"):
+            name, _, value = pair.strip().partition("=")
+            if name:
+                cookies[name] = value
+        return cookies
+
+    def _send_status(self, status: int) -> None:
+        body = json.dumps({"error": self.responses[status][0]}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class ReplayServer(ThreadingHTTPServer):
+    """
+    Local NSE stand-in that replays recordings, or records them when an
+    upstream is given.
+
+    Args:
+        store: Recordings to replay or record into
+        faults: Misbehaviour of replayed responses
+        upstream: 'nse' and 'archives' base URLs to record from, None to
+            replay
+        host: Interface to listen on
+        port: Port to listen on, 0 for any free port
+        verbose: Log every request
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        store: RecordingStore,
+        faults: Optional[Faults] = None,
+        upstream: Optional[Dict[str, str]] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        verbose: bool = False,
+    ):
+        super().__init__((host, port), ReplayHandler)
+        self.store = store
+        self.faults = faults or Faults()
+        self.upstream = upstream
+        self.verbose = verbose
+        self.session = requests.Session()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def record(self, path: str, headers) -> dict:
+        """
+        Forward a request upstream and store a successful response.
+
+        Historical rows are merged into an earlier recording of the same
+        request, which may have covered a different window.
+        """
+        base = self.upstream["nse"]
+        if urlsplit(path).path.startswith(ARCHIVES_PATHS):
+            base = self.upstream["archives"]
+        forwarded = {
+            name: value
+            for name, value in headers.items()
+            if name.lower() in FORWARDED_HEADERS
+        }
+        response = self.session.get(
+            f"{base}{path}", headers=forwarded, timeout=30
+        )
+        record = make_record(
+            response.status_code,
+            response.headers,
+            response.content,
+            response.cookies.get_dict(),
+        )
+        if response.status_code == 200:
+            key = request_key(path)
+            stored = record
+            if urlsplit(path).path.startswith(tuple(WINDOW_PARAMS)):
+                previous = self.store.get(key)
+                if previous is not None:
+                    stored = merge_rows(previous, record)
+            self.store.put(key, stored)
+        return record
+
+    def start(self) -> "ReplayServer":
+        """Serve from a background thread."""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+
+def historical_path(symbol: str, expiry: str) -> str:
+    """Recording key of a symbol's historical futures for an expiry."""
+    query = {"expiryDate": expiry, "instrumentType": "FUTSTK", "symbol": symbol}
+    return request_key(f"{HISTORICAL_PATH}?{urlencode(query)}")
+
+
+def payload_rows(df: pd.DataFrame) -> List[dict]:
+    """Schema rows written back as NSE historical payload rows."""
+    rows = {}
+    for field, (column, dtype) in FUTURES_SCHEMA.items():
+        if column not in df.columns:
+            continue
+        values = df[column]
+        if dtype.startswith("datetime"):
+            rows[field] = values.dt.strftime(NSE_DATE_FORMAT)
+        elif dtype.startswith("float"):
+            rows[field] = values.astype("float64").map("{:.2f}".format)
+        else:
+            rows[field] = values.astype(str)
+    return pd.DataFrame(rows).to_dict("records")
+
+
+def seed_from_cache(
+    store: RecordingStore,
+    cache: FuturesCache,
+    symbols: Optional[Iterable[str]] = None,
+) -> int:
+    """
+    Record historical responses and the underlying list from the cache.
+
+    Args:
+        store: Recordings to add to
+        cache: Futures cache to read, ideally without read tracking
+        symbols: Symbols to seed, default all cached symbols
+
+    Returns:
+        int: Number of expiries recorded
+    """
+    symbols = list(symbols or cache.symbols())
+    recorded = 0
+    for symbol in symbols:
+        for expiry in cache.expiries(symbol):
+            entry = cache.read(symbol, expiry)
+            if entry is None or entry.data.empty:
+                continue
+            rows = payload_rows(parse_futures_frame(entry.data))
+            store.put(
+                historical_path(symbol, expiry), json_record({"data": rows})
+            )
+            recorded += 1
+    underlyings = [{"symbol": s, "underlying": s} for s in symbols]
+    store.put(
+        "/api/underlying-information",
+        json_record({"data": {"UnderlyingList": underlyings}}),
+    )
+    return recorded
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Record or replay NSE")
+    parser.add_argument(
+        "--dir", default=str(RECORDINGS_DIR), help="Recordings directory"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record_parser = commands.add_parser("record", help="Record through NSE")
+    serve_parser = commands.add_parser("serve", help="Replay recordings")
+    for sub in (record_parser, serve_parser):
+        sub.add_argument("--host", default="127.0.0.1")
+        sub.add_argument("--port", type=int, default=8765)
+        sub.add_argument("--verbose", action="store_true")
+    record_parser.add_argument("--upstream", default=NSE_URL)
+    record_parser.add_argument("--archives-upstream", default=ARCHIVES_URL)
+    serve_parser.add_argument("--latency", type=float, default=0.0)
+    serve_parser.add_argument("--jitter", type=float, default=0.0)
+    serve_parser.add_argument("--error-rate", type=float, default=0.0)
+    serve_parser.add_argument("--forbidden-rate", type=float, default=0.0)
+    serve_parser.add_argument(
+        "--rate-limit", type=int, help="Requests per minute before 429s"
+    )
+    serve_parser.add_argument(
+        "--require-cookies",
+        action="store_true",
+        help="Answer API calls made without homepage cookies with 401",
+    )
+    serve_parser.add_argument("--seed", type=int)
+
+    seed_parser = commands.add_parser(
+        "seed", help="Create recordings from the futures cache"
+    )
+    seed_parser.add_argument("--cache-dir", default=str(CACHE_DIR))
+    seed_parser.add_argument("symbols", nargs="*", help="Default: all")
+    args = parser.parse_args()
+
+    store = RecordingStore(Path(args.dir))
+    if args.command == "seed":
+        cache = FuturesCache(Path(args.cache_dir), track_reads=False)
+        recorded = seed_from_cache(store, cache, args.symbols)
+        print(f"Recorded {recorded} expiries into {store.directory}")
+        return
+
+    upstream = faults = None
+    if args.command == "record":
+        upstream = {"nse": args.upstream, "archives": args.archives_upstream}
+    else:
+        faults = Faults(
+            latency=args.latency,
+            jitter=args.jitter,
+            error_rate=args.error_rate,
+            forbidden_rate=args.forbidden_rate,
+            rate_limit=args.rate_limit,
+            require_cookies=args.require_cookies,
+            seed=args.seed,
+        )
+    server = ReplayServer(
+        store, faults, upstream, args.host, args.port, args.verbose
+    )
+    mode = "Recording" if upstream else "Replaying"
+    print(f"{mode} NSE at {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Per-stage timing of the futures scan.
+
+Code on the scan path wraps its stages (fetch, parse, cache reads and
+writes, build) in ``stage(name)``. Outside ``record()`` a stage only looks
+up one global, so the app pays nothing for the instrumentation; inside, the
+wall time and call count of every stage are accumulated for the benchmark
+report. Stages are not nested, so their times add up.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+
+class StageTimes:
+    """Accumulated seconds and calls per stage."""
+
+    def __init__(self):
+        self.seconds: Dict[str, float] = {}
+        self.calls: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def add(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self.seconds[name] = self.seconds.get(name, 0.0) + seconds
+            self.calls[name] = self.calls.get(name, 0) + 1
+
+    def as_dict(self) -> Dict[str, Dict[str, float]]:
+        return {
+            name: {"seconds": self.seconds[name], "calls": self.calls[name]}
+            for name in sorted(self.seconds)
+        }
+
+
+_active: Optional[StageTimes] = None
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time a block as ``name`` while a recording is active."""
+    times = _active
+    if times is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        times.add(name, time.perf_counter() - start)
+
+
+@contextmanager
+def record(times: Optional[StageTimes] = None) -> Iterator[StageTimes]:
+    """Accumulate the stages run inside the block."""
+    global _active
+    times = times or StageTimes()
+    previous, _active = _active, times
+    try:
+        yield times
+    finally:
+        _active = previous
@@ -1,7 +1,375 @@
+import warnings
+from collections import namedtuple
+
 import numpy as np
 import pandas as pd
 import yfinance as yf
 
+from price_panel import PricePanel
+
+Pattern = namedtuple("Pattern", ["name", "direction", "bars", "rule"])
+Bar = namedtuple(
+    "Bar",
+    [
+        "open",
+        "high",
+        "low",
+        "close",
+        "body",
+        "upper_shadow",
+        "lower_shadow",
+        "body_size",
+    ],
+)
+
+# Registered patterns in detection order: name -> Pattern
+PATTERNS = {}
+
+# Number of previous bars any registered pattern may look at
+MAX_LOOKBACK = 2
+
+# Bars behind the average body size on long histories, about the three
+# months get_recent_patterns downloads
+AVG_BODY_BARS = 63
+
+
+def register_pattern(name, direction=0, bars=1):
+    """
+    Register a candlestick pattern rule.
+
+    The decorated function receives a ``CandleFeatures`` object and returns a
+    boolean array of the same shape as the OHLC arrays.
+
+    Args:
+        name (str): Display name of the pattern
+        direction (int): 1 for bullish, -1 for bearish, 0 for indecision
+        bars (int): Number of candles the pattern spans
+    """
+
+    def decorator(rule):
+        PATTERNS[name] = Pattern(name, direction, bars, rule)
+        return rule
+
+    return decorator
+
+
+class CandleFeatures:
+    """
+    Shared candle features computed once over NumPy OHLC arrays.
+
+    Arrays may be 1-D (one symbol) or 2-D (symbols x bars). Features are
+    stored in a single buffer padded with ``MAX_LOOKBACK`` NaN bars on the
+    left, so ``bar(1)`` and ``bar(2)`` are zero-copy shifted views and
+    comparisons against the missing history evaluate to False, exactly as
+    with pandas ``shift``.
+    """
+
+    def __init__(self, open, high, low, close, avg_body=None):
+        open = np.asarray(open, dtype=np.float64)
+        high = np.asarray(high, dtype=np.float64)
+        low = np.asarray(low, dtype=np.float64)
+        close = np.asarray(close, dtype=np.float64)
+
+        self.shape = close.shape
+        lag = MAX_LOOKBACK
+        self._features = np.full(
+            (len(Bar._fields),) + self.shape[:-1] + (self.shape[-1] + lag,),
+            np.nan,
+        )
+        body = self._features[4, ..., lag:]
+        np.subtract(close, open, out=body)
+
+        # fmax/fmin skip NaN like DataFrame.max(axis=1)
+        top = np.fmax(open, close)
+        bottom = np.fmin(open, close)
+        self._features[0, ..., lag:] = open
+        self._features[1, ..., lag:] = high
+        self._features[2, ..., lag:] = low
+        self._features[3, ..., lag:] = close
+        np.subtract(high, top, out=self._features[5, ..., lag:])
+        np.subtract(bottom, low, out=self._features[6, ..., lag:])
+        np.abs(body, out=self._features[7, ..., lag:])
+
+        if avg_body is None:
+            # Symbols without any bars have a NaN average, like Series.mean()
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", RuntimeWarning)
+                avg_body = np.nanmean(
+                    self._features[7, ..., lag:], axis=-1, keepdims=True
+                )
+        self.avg_body = avg_body
+
+        self._bars = [self._view(shift) for shift in range(lag + 1)]
+
+    def _view(self, shift):
+        lag = MAX_LOOKBACK
+        stop = self._features.shape[-1] - shift
+        return Bar(*self._features[..., lag - shift : stop])
+
+    def bar(self, shift=0):
+        """Features of the bar ``shift`` positions before each bar."""
+        return self._bars[shift]
+
+
+def recent_avg_body(open, close, bars=AVG_BODY_BARS):
+    """
+    Average body size over each symbol's last ``bars`` bars.
+
+    Body thresholds on a long history (e.g. the 5-year store) then match
+    those of detection over the recent period only.
+
+    Returns:
+        np.ndarray: Averages with a trailing axis of length 1
+    """
+    open = np.asarray(open, dtype=np.float64)[..., -bars:]
+    close = np.asarray(close, dtype=np.float64)[..., -bars:]
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        return np.nanmean(np.abs(close - open), axis=-1, keepdims=True)
+
+
+def trailing_avg_body(open, close, bars=AVG_BODY_BARS):
+    """
+    Average body size over the ``bars`` bars ending at each bar.
+
+    Unlike ``recent_avg_body`` every bar is only compared with bars up to
+    itself, as ``incremental_patterns.PatternState`` does, so statistics over
+    a long history carry no look-ahead. Missing (NaN) bars are skipped.
+
+    Returns:
+        np.ndarray: Averages shaped like the input arrays
+    """
+    body = np.abs(
+        np.asarray(close, dtype=np.float64) - np.asarray(open, dtype=np.float64)
+    )
+    valid = ~np.isnan(body)
+    totals = np.cumsum(np.where(valid, body, 0.0), axis=-1)
+    counts = np.cumsum(valid, axis=-1)
+    totals[..., bars:] -= totals[..., :-bars].copy()
+    counts[..., bars:] -= counts[..., :-bars].copy()
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts > 0, totals / counts, np.nan)
+
+
+@register_pattern("Bullish Marubozu", direction=1)
+def _bullish_marubozu(f):
+    c = f.bar(0)
+    return (
+        (c.body > 0)
+        & (c.upper_shadow < c.body_size * 0.15)
+        & (c.lower_shadow < c.body_size * 0.15)
+        & (c.body_size > f.avg_body * 0.8)
+    )
+
+
+@register_pattern("Bearish Marubozu", direction=-1)
+def _bearish_marubozu(f):
+    c = f.bar(0)
+    return (
+        (c.body < 0)
+        & (c.upper_shadow < c.body_size * 0.15)
+        & (c.lower_shadow < c.body_size * 0.15)
+        & (c.body_size > f.avg_body * 0.8)
+    )
+
+
+@register_pattern("Doji")
+def _doji(f):
+    c = f.bar(0)
+    return (c.body_size < f.avg_body * 0.15) & (
+        (c.upper_shadow > c.body_size) | (c.lower_shadow > c.body_size)
+    )
+
+
+@register_pattern("Spinning Top")
+def _spinning_top(f):
+    c = f.bar(0)
+    return (
+        (c.body_size < f.avg_body * 0.4)
+        & (c.upper_shadow > c.body_size * 0.8)
+        & (c.lower_shadow > c.body_size * 0.8)
+    )
+
+
+@register_pattern("Hammer", direction=1)
+def _hammer(f):
+    c = f.bar(0)
+    return (
+        (c.lower_shadow > c.body_size * 1.8)
+        & (c.upper_shadow < c.body_size * 0.4)
+        & (c.body > 0)
+    )
+
+
+@register_pattern("Hanging Man", direction=-1)
+def _hanging_man(f):
+    c = f.bar(0)
+    return (
+        (c.lower_shadow > c.body_size * 1.8)
+        & (c.upper_shadow < c.body_size * 0.4)
+        & (c.body < 0)
+    )
+
+
+@register_pattern("Shooting Star", direction=-1)
+def _shooting_star(f):
+    c = f.bar(0)
+    return (c.upper_shadow > c.body_size * 1.8) & (
+        c.lower_shadow < c.body_size * 0.4
+    )
+
+
+@register_pattern("Bullish Engulfing", direction=1, bars=2)
+def _bullish_engulfing(f):
+    c, p = f.bar(0), f.bar(1)
+    return (
+        (p.body < 0)
+        & (c.body > 0)
+        & (c.open < p.close)
+        & (c.close > p.open)
+        & (c.body_size > p.body_size * 0.95)
+    )
+
+
+@register_pattern("Bearish Engulfing", direction=-1, bars=2)
+def _bearish_engulfing(f):
+    c, p = f.bar(0), f.bar(1)
+    return (
+        (p.body > 0)
+        & (c.body < 0)
+        & (c.close < p.open)
+        & (c.open > p.close)
+        & (c.body_size > p.body_size * 0.95)
+    )
+
+
+@register_pattern("Piercing Line", direction=1, bars=2)
+def _piercing_line(f):
+    c, p = f.bar(0), f.bar(1)
+    return (
+        (p.body < 0)
+        & (c.body > 0)
+        & (c.open < p.low)
+        & (c.close > (p.open + p.close) / 2)
+        & (c.close < p.open)
+    )
+
+
+@register_pattern("Dark Cloud Cover", direction=-1, bars=2)
+def _dark_cloud_cover(f):
+    c, p = f.bar(0), f.bar(1)
+    return (
+        (p.body > 0)
+        & (c.body < 0)
+        & (c.open > p.high)
+        & (c.close < (p.open + p.close) / 2)
+        & (c.close > p.close)
+    )
+
+
+@register_pattern("Bullish Harami", direction=1, bars=2)
+def _bullish_harami(f):
+    c, p = f.bar(0), f.bar(1)
+    return (
+        (p.body < 0)
+        & (c.body > 0)
+        & (c.high < p.open)
+        & (c.low > p.close)
+        & (c.body_size < p.body_size * 0.6)
+    )
+
+
+@register_pattern("Bearish Harami", direction=-1, bars=2)
+def _bearish_harami(f):
+    c, p = f.bar(0), f.bar(1)
+    return (
+        (p.body > 0)
+        & (c.body < 0)
+        & (c.high < p.close)
+        & (c.low > p.open)
+        & (c.body_size < p.body_size * 0.6)
+    )
+
+
+@register_pattern("Morning Star", direction=1, bars=3)
+def _morning_star(f):
+    c, p1, p2 = f.bar(0), f.bar(1), f.bar(2)
+    return (
+        (p2.body < 0)
+        & (p1.body_size < f.avg_body * 0.3)
+        & (c.body > 0)
+        & (c.close > (p2.open + p2.close) / 2)
+    )
+
+
+@register_pattern("Evening Star", direction=-1, bars=3)
+def _evening_star(f):
+    c, p1, p2 = f.bar(0), f.bar(1), f.bar(2)
+    return (
+        (p2.body > 0)
+        & (p1.body_size < f.avg_body * 0.3)
+        & (c.body < 0)
+        & (c.close < (p2.open + p2.close) / 2)
+    )
+
+
+def evaluate_patterns(features, names=None):
+    """
+    Evaluate registered patterns over precomputed candle features.
+
+    Args:
+        features (CandleFeatures): Features of one symbol or a whole panel
+        names (list): Patterns to evaluate (default: all registered)
+
+    Returns:
+        dict: Pattern name -> boolean array shaped like the OHLC input
+    """
+    names = PATTERNS if names is None else names
+    return {name: PATTERNS[name].rule(features) for name in names}
+
+
+def detect_patterns_in_frame(df):
+    """
+    Detect candlestick patterns in an OHLC DataFrame.
+
+    Args:
+        df (pandas.DataFrame): Bars with Open/High/Low/Close columns
+
+    Returns:
+        dict: Pattern name -> list of Timestamps where it occurred
+    """
+    features = CandleFeatures(df["Open"], df["High"], df["Low"], df["Close"])
+    return {
+        name: df.index[hits].tolist()
+        for name, hits in evaluate_patterns(features).items()
+    }
+
+
+def detect_patterns_panel(panel):
+    """
+    Detect candlestick patterns for every symbol of a panel in one pass.
+
+    Args:
+        panel (PricePanel or dict): Panel, or symbol -> OHLC DataFrame
+
+    Returns:
+        dict: Symbol -> {pattern name -> list of Timestamps}
+    """
+    if not isinstance(panel, PricePanel):
+        panel = PricePanel.from_frames(panel)
+
+    features = CandleFeatures(panel.open, panel.high, panel.low, panel.close)
+    hits = evaluate_patterns(features)
+
+    results = {}
+    for row, symbol in enumerate(panel.symbols):
+        dates = panel.dates[row]
+        results[symbol] = {
+            name: pd.DatetimeIndex(dates[mask[row]]).tolist()
+            for name, mask in hits.items()
+        }
+    return results
+
 
 def detect_patterns(symbol, period="1mo", interval="1d"):
     """
@@ -19,153 +387,7 @@ def detect_patterns(symbol, period="1mo", interval="1d"):
     stock = yf.Ticker(symbol)
     df = stock.history(period=period, interval=interval)
 
-    # Calculate candle body and shadows
-    df["Body"] = df["Close"] - df["Open"]
-    df["Upper_Shadow"] = df["High"] - df[["Open", "Close"]].max(axis=1)
-    df["Lower_Shadow"] = df[["Open", "Close"]].min(axis=1) - df["Low"]
-    df["Body_Size"] = abs(df["Body"])
-
-    # Calculate average body size for relative comparisons
-    avg_body = df["Body_Size"].mean()
-
-    patterns = {}
-
-    # Marubozu detection (small shadows allowed)
-    shadow_threshold = 0.15  # Increased from 0.1 to allow slightly larger shadows
-    marubozu_bullish = (
-        (df["Body"] > 0)
-        & (df["Upper_Shadow"] < df["Body_Size"] * shadow_threshold)
-        & (df["Lower_Shadow"] < df["Body_Size"] * shadow_threshold)
-        & (df["Body_Size"] > avg_body * 0.8)
-    )  # Should be a relatively large candle
-
-    marubozu_bearish = (
-        (df["Body"] < 0)
-        & (df["Upper_Shadow"] < df["Body_Size"] * shadow_threshold)
-        & (df["Lower_Shadow"] < df["Body_Size"] * shadow_threshold)
-        & (df["Body_Size"] > avg_body * 0.8)
-    )  # Should be a relatively large candle
-
-    # Doji and Spinning Top detection
-    body_threshold = 0.15  # Increased from 0.1 for more flexible Doji detection
-    doji = (df["Body_Size"] < avg_body * body_threshold) & (
-        (df["Upper_Shadow"] > df["Body_Size"]) | (df["Lower_Shadow"] > df["Body_Size"])
-    )
-
-    # Increased from 0.3
-    spinning_top = (
-        (df["Body_Size"] < avg_body * 0.4)
-        & (df["Upper_Shadow"] > df["Body_Size"] * 0.8)
-        & (df["Lower_Shadow"] > df["Body_Size"] * 0.8)
-    )
-
-    # Hammer, Hanging Man, and Shooting Star detection
-    body_pos_threshold = 0.4  # Increased from 0.3
-    shadow_length_threshold = 1.8  # Decreased from 2.0 for more flexibility
-
-    hammer = (
-        (df["Lower_Shadow"] > df["Body_Size"] * shadow_length_threshold)
-        & (df["Upper_Shadow"] < df["Body_Size"] * body_pos_threshold)
-        & (df["Body"] > 0)
-    )
-
-    hanging_man = (
-        (df["Lower_Shadow"] > df["Body_Size"] * shadow_length_threshold)
-        & (df["Upper_Shadow"] < df["Body_Size"] * body_pos_threshold)
-        & (df["Body"] < 0)
-    )
-
-    shooting_star = (df["Upper_Shadow"] > df["Body_Size"] * shadow_length_threshold) & (
-        df["Lower_Shadow"] < df["Body_Size"] * body_pos_threshold
-    )
-
-    # Multi-candlestick pattern detection
-    # Engulfing patterns
-    bullish_engulfing = (
-        (df["Body"].shift(1) < 0)
-        & (df["Body"] > 0)
-        & (df["Open"] < df["Close"].shift(1))
-        & (df["Close"] > df["Open"].shift(1))
-        & (df["Body_Size"] > df["Body_Size"].shift(1) * 0.95)
-    )  # 95% to be more flexible
-
-    bearish_engulfing = (
-        (df["Body"].shift(1) > 0)
-        & (df["Body"] < 0)
-        & (df["Close"] < df["Open"].shift(1))
-        & (df["Open"] > df["Close"].shift(1))
-        & (df["Body_Size"] > df["Body_Size"].shift(1) * 0.95)
-    )
-
-    # Piercing and Dark Cloud patterns
-    piercing = (
-        (df["Body"].shift(1) < 0)
-        & (df["Body"] > 0)
-        & (df["Open"] < df["Low"].shift(1))
-        & (df["Close"] > (df["Open"].shift(1) + df["Close"].shift(1)) / 2)
-        & (df["Close"] < df["Open"].shift(1))
-    )
-
-    dark_cloud = (
-        (df["Body"].shift(1) > 0)
-        & (df["Body"] < 0)
-        & (df["Open"] > df["High"].shift(1))
-        & (df["Close"] < (df["Open"].shift(1) + df["Close"].shift(1)) / 2)
-        & (df["Close"] > df["Close"].shift(1))
-    )
-
-    # Harami patterns
-    harami_bullish = (
-        (df["Body"].shift(1) < 0)
-        & (df["Body"] > 0)
-        & (df["High"] < df["Open"].shift(1))
-        & (df["Low"] > df["Close"].shift(1))
-        & (df["Body_Size"] < abs(df["Body"].shift(1)) * 0.6)
-    )  # More flexible size requirement
-
-    harami_bearish = (
-        (df["Body"].shift(1) > 0)
-        & (df["Body"] < 0)
-        & (df["High"] < df["Close"].shift(1))
-        & (df["Low"] > df["Open"].shift(1))
-        & (df["Body_Size"] < df["Body_Size"].shift(1) * 0.6)
-    )
-
-    # Morning Star and Evening Star patterns
-    morning_star = (
-        (df["Body"].shift(2) < 0)
-        & (abs(df["Body"].shift(1)) < avg_body * 0.3)
-        & (df["Body"] > 0)
-        & (df["Close"] > (df["Open"].shift(2) + df["Close"].shift(2)) / 2)
-    )
-
-    evening_star = (
-        (df["Body"].shift(2) > 0)
-        & (abs(df["Body"].shift(1)) < avg_body * 0.3)
-        & (df["Body"] < 0)
-        & (df["Close"] < (df["Open"].shift(2) + df["Close"].shift(2)) / 2)
-    )
-
-    # Store results
-    patterns = {
-        "Bullish Marubozu": df.index[marubozu_bullish].tolist(),
-        "Bearish Marubozu": df.index[marubozu_bearish].tolist(),
-        "Doji": df.index[doji].tolist(),
-        "Spinning Top": df.index[spinning_top].tolist(),
-        "Hammer": df.index[hammer].tolist(),
-        "Hanging Man": df.index[hanging_man].tolist(),
-        "Shooting Star": df.index[shooting_star].tolist(),
-        "Bullish Engulfing": df.index[bullish_engulfing].tolist(),
-        "Bearish Engulfing": df.index[bearish_engulfing].tolist(),
-        "Piercing Line": df.index[piercing].tolist(),
-        "Dark Cloud Cover": df.index[dark_cloud].tolist(),
-        "Bullish Harami": df.index[harami_bullish].tolist(),
-        "Bearish Harami": df.index[harami_bearish].tolist(),
-        "Morning Star": df.index[morning_star].tolist(),
-        "Evening Star": df.index[evening_star].tolist(),
-    }
-
-    return patterns
+    return detect_patterns_in_frame(df)
 
 
 def print_patterns(patterns):
@@ -192,19 +414,25 @@ def get_recent_patterns(symbol, lookback_days=5, period="3mo", interval="1d"):
     Returns:
         dict: Dictionary containing recent patterns
     """
-    patterns = detect_patterns(symbol, period=period, interval=interval)
+    stock = yf.Ticker(symbol)
+    df = stock.history(period=period, interval=interval)
+    if df.empty:
+        return {}
+
+    # Mask of bars inside the lookback window, applied to every pattern
+    current_date = pd.Timestamp.now().normalize()
+    cutoff = current_date - pd.Timedelta(days=lookback_days)
+    recent = df.index.tz_localize(None).normalize() >= cutoff
+    if not recent.any():
+        return {}
 
-    # Get current date
-    current_date = pd.Timestamp.now().date()
+    features = CandleFeatures(df["Open"], df["High"], df["Low"], df["Close"])
 
-    # Filter patterns for recent dates
     recent_patterns = {}
-    for pattern, dates in patterns.items():
-        recent_dates = [
-            date for date in dates if (current_date - date.date()).days <= lookback_days
-        ]
-        if recent_dates:
-            recent_patterns[pattern] = recent_dates
+    for pattern, hits in evaluate_patterns(features).items():
+        hits = hits & recent
+        if hits.any():
+            recent_patterns[pattern] = df.index[hits].tolist()
 
     return recent_patterns
 
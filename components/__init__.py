@@ -2,5 +2,7 @@
 Components for the Stock Analysis Streamlit App.
 """
 
+from .pattern_screener import run_pattern_screener
+from .pattern_statistics import run_pattern_statistics
 from .risk_calculator import run_risk_reward_calculator
 from .volume_analyzer import create_volume_chart, run_volume_surge_detector
@@ -0,0 +1,128 @@
+import time
+
+import numpy as np
+import plotly.graph_objects as go
+import streamlit as st
+
+from candle_stick_patterns import PATTERNS
+from pattern_index import PatternIndex
+from symbol_master import get_symbol_master
+from timeframes import TIMEFRAME_LABELS, load_timeframe_panel
+
+DIRECTION_LABELS = {1: "🟢 Bullish", -1: "🔴 Bearish", 0: "⚪ Neutral"}
+
+
+def create_pattern_chart(symbol, bars, hits):
+    """Candlestick chart of recent bars with detected patterns marked."""
+    fig = go.Figure()
+
+    fig.add_trace(
+        go.Candlestick(
+            x=bars.index,
+            open=bars["Open"],
+            high=bars["High"],
+            low=bars["Low"],
+            close=bars["Close"],
+            name=symbol,
+        )
+    )
+
+    # Mark each pattern above the high of its bar
+    highs = bars["High"].reindex(hits["Date"])
+    fig.add_trace(
+        go.Scatter(
+            x=hits["Date"],
+            y=highs.to_numpy() * 1.01,
+            mode="markers+text",
+            text=hits["Pattern"],
+            textposition="top center",
+            marker=dict(symbol="triangle-down", size=10),
+            name="Patterns",
+        )
+    )
+
+    fig.update_layout(
+        title=f"Recent Patterns for {symbol}",
+        xaxis_title="Date",
+        yaxis_title="Price",
+        template="plotly_white",
+        xaxis_rangeslider_visible=False,
+        showlegend=False,
+    )
+
+    return fig
+
+
+def run_pattern_screener():
+    """Screen every constituent of an index for candlestick patterns."""
+    st.header("Candlestick Pattern Screener")
+
+    master = get_symbol_master()
+    index_options = master.index_options()
+
+    col1, col2, col3 = st.columns([2, 1, 1])
+    with col1:
+        selected_display = st.selectbox("Index", list(index_options.keys()))
+    with col2:
+        timeframe = st.selectbox(
+            "Timeframe",
+            list(TIMEFRAME_LABELS),
+            format_func=TIMEFRAME_LABELS.get,
+        )
+    with col3:
+        last_bars = st.number_input(
+            "Bars to scan", min_value=1, max_value=20, value=1, step=1
+        )
+
+    selected_patterns = st.multiselect(
+        "Patterns", list(PATTERNS), default=list(PATTERNS)
+    )
+
+    if not st.button("Scan Patterns", type="primary"):
+        return
+    if not selected_patterns:
+        st.warning("Select at least one pattern to scan for.")
+        return
+
+    symbols = master.index_symbols(index_options[selected_display], ".NS")
+
+    start_time = time.time()
+    with st.spinner(f"Scanning {len(symbols)} stocks..."):
+        panel = load_timeframe_panel(symbols, timeframe)
+        index = PatternIndex.from_panel(panel)
+        hits = index.to_frame(selected_patterns, last_bars=int(last_bars))
+
+    st.success(
+        f"Found {len(hits)} patterns in {hits['Symbol'].nunique()} of "
+        f"{len(panel)} stocks in {time.time() - start_time:.1f} seconds"
+    )
+    if hits.empty:
+        return
+
+    # Add price context from the bar of each hit
+    rows = np.array([panel.rows[symbol] for symbol in hits["Symbol"]])
+    bars = panel.n_bars - 1 - hits["Bars Ago"].to_numpy()
+    close = panel.close[rows, bars]
+    previous = panel.close[rows, np.maximum(bars - 1, 0)]
+    hits["Close"] = close
+    hits["Change %"] = (close / previous - 1) * 100
+    hits["Symbol"] = hits["Symbol"].str.replace(".NS", "", regex=False)
+    hits["Direction"] = hits["Direction"].map(DIRECTION_LABELS)
+
+    st.dataframe(
+        hits.sort_values(["Bars Ago", "Symbol"]),
+        hide_index=True,
+        use_container_width=True,
+        column_config={
+            "Date": st.column_config.DateColumn(format="DD MMM YYYY"),
+            "Close": st.column_config.NumberColumn(format="₹%.2f"),
+            "Change %": st.column_config.NumberColumn(format="%.2f%%"),
+        },
+    )
+
+    for symbol, symbol_hits in hits.groupby("Symbol", sort=True):
+        title = f"📊 {symbol} - {', '.join(symbol_hits['Pattern'].unique())}"
+        with st.expander(title):
+            bars = panel.frame(symbol + ".NS").iloc[-60:]
+            fig = create_pattern_chart(symbol, bars, symbol_hits)
+            st.plotly_chart(fig, use_container_width=True)
@@ -0,0 +1,59 @@
+import streamlit as st
+
+from pattern_stats import HORIZONS, load_or_compute_statistics
+from symbol_master import get_symbol_master
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def get_pattern_statistics(index_name):
+    """Cached pattern statistics for an index."""
+    return load_or_compute_statistics(index_name)
+
+
+def run_pattern_statistics():
+    """Display forward-return statistics of candlestick patterns."""
+    st.header("Candlestick Pattern Statistics")
+    st.markdown(
+        """
+    Forward returns of every candlestick pattern occurrence across the
+    stored daily history of an index. Returns and excursions are signed in
+    the pattern's direction, so a positive value means the pattern worked.
+    Neutral (indecision) patterns show the size of the move instead, with
+    no hit rate.
+    """
+    )
+
+    index_options = get_symbol_master().index_options()
+
+    col1, col2 = st.columns([2, 1])
+    with col1:
+        selected_display = st.selectbox(
+            "Index", list(index_options.keys()), key="pattern_stats_index"
+        )
+    with col2:
+        horizon = st.selectbox(
+            "Holding Period (days)", HORIZONS, index=2, key="pattern_horizon"
+        )
+
+    if not st.button("Compute Statistics", key="pattern_stats_button"):
+        return
+
+    with st.spinner("Computing pattern statistics..."):
+        stats = get_pattern_statistics(index_options[selected_display])
+
+    if stats.empty:
+        st.warning("No stored price history for this index.")
+        return
+
+    st.caption(f"Data as of {stats.attrs['as_of']:%d %b %Y}")
+    view = stats[stats["Horizon"] == horizon].drop(columns="Horizon")
+    st.dataframe(
+        view.sort_values("Hit Rate %", ascending=False),
+        hide_index=True,
+        use_container_width=True,
+        column_config={
+            col: st.column_config.NumberColumn(format="%.2f")
+            for col in view.columns
+            if col.endswith("%")
+        },
+    )
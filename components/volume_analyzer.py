@@ -1,11 +1,12 @@
-import json
-
 import pandas as pd
 import plotly.graph_objects as go
 import streamlit as st
 
-from candle_stick_patterns import get_recent_patterns
-from volume_checker import check_volume_surge
+from pattern_index import PatternIndex, get_recent_patterns_batch
+from symbol_master import get_symbol_master
+from timeframes import TIMEFRAME_LABELS, load_timeframe_panel
+from volume_checker import check_volume_surge, volume_surges_panel
+from volume_watch import VolumeWatcher
 
 
 def create_volume_chart(ticker, current_volume, avg_volume, previous_volumes):
@@ -61,18 +62,10 @@ def get_stocks_from_json(index_name):
     Returns:
         list: List of stock symbols
     """
-    try:
-        with open("data/nifty_indices.json", "r") as f:
-            indices_data = json.load(f)
-
-        if index_name.lower() in indices_data:
-            return indices_data[index_name.lower()]
-        else:
-            st.error(f"Index {index_name} not found in nifty_indices.json")
-            return []
-    except Exception as e:
-        st.error(f"Error loading nifty_indices.json: {str(e)}")
-        return []
+    symbols = get_symbol_master().index_symbols(index_name)
+    if not symbols:
+        st.error(f"Index {index_name} not found in nifty_indices.json")
+    return symbols
 
 
 def run_volume_surge_detector():
@@ -80,15 +73,10 @@ def run_volume_surge_detector():
     # Sidebar for index selection
     st.sidebar.title("Settings")
 
-    # Load available indices from JSON file
-    try:
-        with open("data/nifty_indices.json", "r") as f:
-            indices_data = json.load(f)
-
-        # Create a more user-friendly display of index names
-        index_options = {k.upper().replace("_", " "): k for k in indices_data.keys()}
-    except Exception as e:
-        st.sidebar.error(f"Error loading indices: {str(e)}")
+    # Available indices with a more user-friendly display name
+    index_options = get_symbol_master().index_options()
+    if not index_options:
+        st.sidebar.error("Error loading indices from nifty_indices.json")
         index_options = {
             "NIFTY 50": "nifty50",
             "NIFTY 100": "nifty100",
@@ -110,6 +98,32 @@ def run_volume_surge_detector():
         help=help_text,
     )
 
+    timeframe = st.sidebar.selectbox(
+        "Timeframe",
+        list(TIMEFRAME_LABELS),
+        format_func=TIMEFRAME_LABELS.get,
+        help="Weekly and monthly bars are built from the stored daily bars",
+    )
+
+    watch_mode = st.sidebar.toggle(
+        "Watch Mode",
+        value=False,
+        help="Keep polling for new bars and update surges incrementally",
+    )
+    if watch_mode:
+        run_volume_watch(selected_index, selected_index_display, surge_threshold)
+        return
+
+    if timeframe != "1d":
+        if st.sidebar.button("Scan Stocks", type="primary"):
+            run_timeframe_scan(
+                selected_index,
+                selected_index_display,
+                surge_threshold,
+                timeframe,
+            )
+        return
+
     if st.sidebar.button("Scan Stocks", type="primary"):
         with st.spinner("Scanning stocks for volume surges..."):
             tickers = get_stocks_from_json(selected_index)
@@ -154,29 +168,103 @@ def run_volume_surge_detector():
             display_volume_surge_results(surge_results)
 
 
-def display_volume_surge_results(surge_results):
+def run_timeframe_scan(index_name, index_display, surge_threshold, timeframe):
+    """Scan an index for volume surges on weekly or monthly bars."""
+    tickers = [ticker + ".NS" for ticker in get_stocks_from_json(index_name)]
+    if not tickers:
+        st.error(f"No stocks found for {index_display}")
+        return
+
+    with st.spinner(f"Scanning {TIMEFRAME_LABELS[timeframe].lower()} bars..."):
+        panel = load_timeframe_panel(tickers, timeframe)
+        surges = volume_surges_panel(panel)
+        surges = surges[
+            surges["is_surge"] & (surges["percent_increase"] > surge_threshold)
+        ].sort_values("percent_increase", ascending=False)
+
+        index = PatternIndex.from_panel(panel)
+        surge_results = []
+        recent_patterns = {}
+        for ticker, row in surges.iterrows():
+            surge_results.append(
+                {
+                    "ticker": ticker,
+                    "percent_increase": row["percent_increase"],
+                    "current_volume": row["current_volume"],
+                    "avg_volume": row["avg_volume"],
+                    "previous_volumes": panel.frame(ticker)["Volume"].iloc[-11:-1],
+                }
+            )
+            recent_patterns[ticker] = index.decode(ticker, last_bars=2)
+
+    display_volume_surge_results(surge_results, recent_patterns)
+
+
+def run_volume_watch(index_name, index_display, surge_threshold, interval=60):
+    """Poll the selected index for volume surges on a schedule."""
+    key = f"volume_watch_{index_name}"
+    watcher = st.session_state.get(key)
+
+    if watcher is None or watcher.surge_threshold != surge_threshold:
+        tickers = [ticker + ".NS" for ticker in get_stocks_from_json(index_name)]
+        if not tickers:
+            st.error(f"No stocks found for {index_display}")
+            return
+        watcher = VolumeWatcher(tickers, surge_threshold=surge_threshold)
+        st.session_state[key] = watcher
+        st.session_state[f"{key}_log"] = []
+        st.session_state[f"{key}_patterns"] = {}
+
+    @st.fragment(run_every=interval)
+    def watch():
+        changes = watcher.poll()
+        log = st.session_state[f"{key}_log"]
+        stamp = pd.Timestamp.now().strftime("%H:%M:%S")
+        for result in changes:
+            status = "Surge" if result["is_surge"] else "Cleared"
+            log.insert(0, f"{stamp} {result['ticker']}: {status}")
+        del log[50:]
+
+        # Patterns are only downloaded for tickers that started surging
+        patterns = st.session_state[f"{key}_patterns"]
+        surges = watcher.surges()
+        refresh = {r["ticker"] for r in changes if r["is_surge"]}
+        refresh |= {r["ticker"] for r in surges if r["ticker"] not in patterns}
+        for result in changes:
+            patterns.pop(result["ticker"], None)
+        if refresh:
+            found = get_recent_patterns_batch(sorted(refresh))
+            patterns.update({t: found.get(t, {}) for t in refresh})
+
+        st.caption(f"Watching {len(watcher.tickers)} stocks, last poll {stamp}")
+        if log:
+            with st.expander(f"Status changes ({len(log)})"):
+                for line in log:
+                    st.markdown(f"• {line}")
+        display_volume_surge_results(surges, patterns)
+
+    watch()
+
+
+def display_volume_surge_results(surge_results, recent_patterns=None):
     """Display the volume surge results in a nice format."""
     if surge_results:
         msg = f"Found {len(surge_results)} stocks with significant volume surge!"
         st.success(msg)
 
+        # Detect patterns for all surging stocks from one batched download
+        if recent_patterns is None:
+            recent_patterns = get_recent_patterns_batch(
+                [result["ticker"] for result in surge_results]
+            )
+
         for result in surge_results:
-            # Get patterns first so we can include them in the title
-            patterns = get_recent_patterns(result["ticker"])
+            patterns = recent_patterns.get(result["ticker"], {})
 
-            # Create pattern summary for the title
+            # Add pattern names to the title
             pattern_summary = ""
             if patterns:
-                # Extract all pattern types (including duplicates)
-                pattern_types = []
-                for pattern in patterns:
-                    pattern_type = pattern.split(":")[0].strip()
-                    pattern_types.append(pattern_type)
-
-                # Add pattern names to title (preserving duplicates)
-                if pattern_types:
-                    pattern_list = ", ".join(pattern_types)
-                    pattern_summary = f" | {pattern_list}"
+                pattern_summary = f" | {', '.join(patterns)}"
 
             # Create the title with volume surge info and pattern summary
             title = (
@@ -217,7 +305,8 @@ def display_volume_surge_results(surge_results):
                     # Display candlestick patterns
                     if patterns:
                         st.subheader("Recent Patterns")
-                        for pattern in patterns:
-                            st.markdown(f"• {pattern}")
+                        for pattern, dates in patterns.items():
+                            days = ", ".join(d.strftime("%d %b") for d in dates)
+                            st.markdown(f"• {pattern}: {days}")
     else:
         st.warning("No volume surges detected based on current criteria.")
@@ -0,0 +1,267 @@
+"""
+Incremental candlestick detection that only evaluates newly appended bars.
+
+Per-symbol feature state (a rolling window of body sizes and the last two
+bars) is persisted between runs, so a daily refresh of the whole universe
+evaluates one bar per symbol and appends any hits to a pattern log.
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from candle_stick_patterns import (
+    MAX_LOOKBACK,
+    CandleFeatures,
+    evaluate_patterns,
+)
+from price_panel import PricePanel, download_panel
+from symbol_master import get_symbol_master
+
+STATE_FILE = "data/pattern_state.npz"
+LOG_FILE = "data/pattern_log.csv"
+LOG_COLUMNS = ["Date", "Symbol", "Pattern"]
+
+
+class PatternState:
+    """Rolling candle features for many symbols, updated one bar at a time."""
+
+    def __init__(self, symbols=(), window=63):
+        """
+        Args:
+            symbols (list): Symbols tracked by the state
+            window (int): Bars in the rolling average body size (~3 months)
+        """
+        self.window = window
+        self.symbols = []
+        self.rows = {}
+        n = 0
+        self.last_date = np.empty(n, dtype="datetime64[D]")
+        # Last MAX_LOOKBACK bars per symbol, oldest first: (n, lag, OHLC)
+        self.last_bars = np.empty((n, MAX_LOOKBACK, 4))
+        self.bodies = np.empty((n, window))
+        self.position = np.empty(n, dtype=np.intp)
+        self.count = np.empty(n, dtype=np.intp)
+        self.total = np.empty(n)
+        self.add_symbols(symbols)
+
+    def add_symbols(self, symbols):
+        """Start tracking new symbols with empty state."""
+        new = [s for s in dict.fromkeys(symbols) if s not in self.rows]
+        if not new:
+            return
+        n = len(new)
+        for symbol in new:
+            self.rows[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+
+        self.last_date = np.concatenate(
+            [self.last_date, np.full(n, np.datetime64("NaT"), "datetime64[D]")]
+        )
+        self.last_bars = np.concatenate(
+            [self.last_bars, np.full((n, MAX_LOOKBACK, 4), np.nan)]
+        )
+        self.bodies = np.concatenate([self.bodies, np.zeros((n, self.window))])
+        self.position = np.concatenate([self.position, np.zeros(n, np.intp)])
+        self.count = np.concatenate([self.count, np.zeros(n, np.intp)])
+        self.total = np.concatenate([self.total, np.zeros(n)])
+
+    def apply(self, rows, dates, ohlc):
+        """
+        Evaluate patterns on one new bar for each of the given rows.
+
+        Args:
+            rows (np.ndarray): State rows receiving a bar
+            dates (np.ndarray): datetime64[D] date of each bar
+            ohlc (np.ndarray): (len(rows), 4) Open/High/Low/Close values
+
+        Returns:
+            dict: Pattern name -> boolean array aligned with ``rows``
+        """
+        body_size = np.abs(ohlc[:, 3] - ohlc[:, 0])
+
+        # Push the new body size into the rolling window first, so the
+        # average includes the bar being evaluated like the batch engine.
+        slots = self.position[rows]
+        evicted = np.where(
+            self.count[rows] == self.window, self.bodies[rows, slots], 0.0
+        )
+        self.bodies[rows, slots] = body_size
+        self.total[rows] += body_size - evicted
+        self.position[rows] = (slots + 1) % self.window
+        self.count[rows] = np.minimum(self.count[rows] + 1, self.window)
+        avg_body = (self.total[rows] / self.count[rows])[:, None]
+
+        # Previous bars followed by the new bar: (len(rows), lag + 1, OHLC)
+        bars = np.concatenate([self.last_bars[rows], ohlc[:, None, :]], axis=1)
+        features = CandleFeatures(
+            bars[..., 0], bars[..., 1], bars[..., 2], bars[..., 3], avg_body
+        )
+        hits = {
+            name: mask[:, -1]
+            for name, mask in evaluate_patterns(features).items()
+        }
+
+        self.last_bars[rows] = bars[:, 1:]
+        self.last_date[rows] = dates
+        return hits
+
+    def update(self, panel):
+        """
+        Apply every bar of a panel that is newer than the stored state.
+
+        Args:
+            panel (PricePanel): Recent bars; older bars are skipped
+
+        Returns:
+            pandas.DataFrame: Detected patterns with Date/Symbol/Pattern
+        """
+        self.add_symbols(panel.symbols)
+        panel_rows = np.array(
+            [self.rows[symbol] for symbol in panel.symbols], dtype=np.intp
+        )
+        dates = panel.dates.astype("datetime64[D]")
+        ohlc = np.stack([panel.open, panel.high, panel.low, panel.close], -1)
+
+        found = []
+        for bar in range(panel.n_bars):
+            bar_dates = dates[:, bar]
+            last = self.last_date[panel_rows]
+            new = ~np.isnat(bar_dates) & (np.isnat(last) | (bar_dates > last))
+            if not new.any():
+                continue
+
+            rows = panel_rows[new]
+            hits = self.apply(rows, bar_dates[new], ohlc[new, bar])
+            for name, mask in hits.items():
+                for row, date in zip(rows[mask], bar_dates[new][mask]):
+                    found.append((pd.Timestamp(date), self.symbols[row], name))
+
+        return pd.DataFrame(found, columns=LOG_COLUMNS)
+
+    def save(self, path=STATE_FILE):
+        """Persist the state to a compressed NumPy archive."""
+        tmp_path = f"{path}.tmp.npz"
+        np.savez_compressed(
+            tmp_path,
+            symbols=np.array(self.symbols, dtype=str),
+            window=self.window,
+            last_date=self.last_date,
+            last_bars=self.last_bars,
+            bodies=self.bodies,
+            position=self.position,
+            count=self.count,
+            total=self.total,
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=STATE_FILE, window=63):
+        """Load a saved state, or return an empty one if none exists."""
+        if not os.path.exists(path):
+            return cls(window=window)
+
+        with np.load(path) as data:
+            state = cls(window=int(data["window"]))
+            state.symbols = data["symbols"].tolist()
+            state.rows = {s: i for i, s in enumerate(state.symbols)}
+            state.last_date = data["last_date"]
+            state.last_bars = data["last_bars"]
+            state.bodies = data["bodies"]
+            state.position = data["position"]
+            state.count = data["count"]
+            state.total = data["total"]
+        return state
+
+
+def append_to_log(patterns, path=LOG_FILE):
+    """Append detected patterns to the persisted pattern log."""
+    if patterns.empty:
+        return
+    header = not os.path.exists(path)
+    patterns.to_csv(
+        path, mode="a", header=header, index=False, date_format="%Y-%m-%d"
+    )
+
+
+def read_log(path=LOG_FILE):
+    """Read the pattern log as a DataFrame."""
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=LOG_COLUMNS)
+    return pd.read_csv(path, parse_dates=["Date"])
+
+
+def recent_patterns_from_log(symbols, lookback_days=5, path=LOG_FILE):
+    """
+    Recent patterns per symbol read from the log, without any detection.
+
+    Returns:
+        dict: Symbol -> {pattern name -> list of recent Timestamps}
+    """
+    log = read_log(path)
+    since = pd.Timestamp.now().normalize() - pd.Timedelta(days=lookback_days)
+    log = log[(log["Date"] >= since) & log["Symbol"].isin(symbols)]
+
+    recent = {}
+    for (symbol, pattern), dates in log.groupby(["Symbol", "Pattern"])["Date"]:
+        recent.setdefault(symbol, {})[pattern] = sorted(dates.tolist())
+    return recent
+
+
+def refresh_patterns(
+    symbols, state_path=STATE_FILE, log_path=LOG_FILE, period="5d"
+):
+    """
+    Evaluate patterns on bars added since the last refresh.
+
+    Symbols without state are seeded from three months of history, which
+    is replayed bar by bar so their log is filled consistently. Each bar is
+    evaluated once, so run this after the close rather than intraday.
+
+    Args:
+        symbols (list): Stock ticker symbols
+        state_path (str): Path of the persisted feature state
+        log_path (str): Path of the pattern log
+        period (str): History downloaded for known symbols (default: '5d')
+
+    Returns:
+        pandas.DataFrame: Newly detected patterns
+    """
+    state = PatternState.load(state_path)
+    known = [s for s in symbols if s in state.rows]
+    unknown = [s for s in symbols if s not in state.rows]
+
+    found = []
+    if unknown:
+        found.append(state.update(download_panel(unknown, period="3mo")))
+    if known:
+        found.append(state.update(download_panel(known, period=period)))
+
+    patterns = pd.concat(found, ignore_index=True) if found else None
+    if patterns is None:
+        patterns = pd.DataFrame(columns=LOG_COLUMNS)
+
+    append_to_log(patterns, log_path)
+    state.save(state_path)
+    return patterns
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Detect candlestick patterns on newly added bars only."
+    )
+    parser.add_argument("--index", default="nifty500", help="Index to refresh")
+    args = parser.parse_args()
+
+    symbols = get_symbol_master().index_symbols(args.index, ".NS")
+
+    patterns = refresh_patterns(symbols)
+    print(f"Detected {len(patterns)} new pattern occurrences")
+    for row in patterns.itertuples(index=False):
+        print(f"  {row.Date:%Y-%m-%d} {row.Symbol}: {row.Pattern}")
+
+
+if __name__ == "__main__":
+    main()
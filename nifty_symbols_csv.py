@@ -1,146 +1,227 @@
 """
-Script to download Nifty 50, 100, and 200 stock symbols from NSE India website.
-This approach downloads the data directly from the NSE India website.
+Script to download Nifty index constituents from the NSE India archives.
+
+All index CSVs are requested concurrently with the ETag/Last-Modified
+validators of the previous run, so files the server reports as unchanged
+(304 Not Modified) cost one round trip and keep their stored symbols.
 """
 
 import io
 import json
 import os
-import random
-import time
+from concurrent.futures import ThreadPoolExecutor
 
 import pandas as pd
 import requests
 
-# Create data directory if it doesn't exist
-if not os.path.exists("data"):
-    os.makedirs("data")
+INDICES_FILE = "data/nifty_indices.json"
+VALIDATORS_FILE = "data/nifty_indices_validators.json"
+
+# Headers to mimic a browser request
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/99.0.4844.84 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9",
+    "Accept-Language": "en-US,en;q=0.9",
+    "Accept-Encoding": "gzip, deflate, br",
+    "Connection": "keep-alive",
+}
+
+SYMBOL_COLUMNS = ["Symbol", "SYMBOL", "symbol", "Ticker", "TICKER"]
+
+# Archives host, overridable to point at a local stand-in such as nse_replay
+ARCHIVES_URL = os.environ.get("NSE_ARCHIVES_URL", "https://archives.nseindia.com")
+INDICES_URL = f"{ARCHIVES_URL}/content/indices"
 
 # URLs for the Nifty indices CSV files
 NIFTY_CSV_URLS = {
-    "nifty50": ("https://archives.nseindia.com/content/indices/ind_nifty50list.csv"),
-    "nifty100": ("https://archives.nseindia.com/content/indices/ind_nifty100list.csv"),
-    "nifty200": ("https://archives.nseindia.com/content/indices/ind_nifty200list.csv"),
-    "nifty500": ("https://archives.nseindia.com/content/indices/ind_nifty500list.csv"),
-    "nifty_next_50": (
-        "https://archives.nseindia.com/content/indices/ind_niftynext50list.csv"
-    ),
-    "nifty_midcap_50": (
-        "https://archives.nseindia.com/content/indices/ind_niftymidcap50list.csv"
-    ),
-    "nifty_smallcap_50": (
-        "https://archives.nseindia.com/content/indices/ind_niftysmallcap50list.csv"
-    ),
-    "nifty_it": ("https://archives.nseindia.com/content/indices/ind_niftyitlist.csv"),
-    "nifty_bank": (
-        "https://archives.nseindia.com/content/indices/ind_niftybanklist.csv"
-    ),
+    "nifty50": f"{INDICES_URL}/ind_nifty50list.csv",
+    "nifty100": f"{INDICES_URL}/ind_nifty100list.csv",
+    "nifty200": f"{INDICES_URL}/ind_nifty200list.csv",
+    "nifty500": f"{INDICES_URL}/ind_nifty500list.csv",
+    "nifty_next_50": f"{INDICES_URL}/ind_niftynext50list.csv",
+    "nifty_midcap_50": f"{INDICES_URL}/ind_niftymidcap50list.csv",
+    "nifty_smallcap_50": f"{INDICES_URL}/ind_niftysmallcap50list.csv",
+    "nifty_it": f"{INDICES_URL}/ind_niftyitlist.csv",
+    "nifty_bank": f"{INDICES_URL}/ind_niftybanklist.csv",
 }
 
 
-def download_nifty_csv():
+def _load_json(path):
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_json(path, data):
+    """Write JSON through a temporary file so readers never see a partial file."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=4)
+    os.replace(tmp_path, path)
+
+
+def parse_symbols(content):
+    """Extract the symbol column of an index constituents CSV."""
+    df = pd.read_csv(io.StringIO(content.decode("utf-8")))
+    for col in SYMBOL_COLUMNS:
+        if col in df.columns:
+            return df[col].tolist()
+    return None
+
+
+def fetch_index_csv(index_name, url, validators=None, timeout=30):
     """
-    Download Nifty 50, 100, and 200 CSV files from NSE India archives
+    Conditionally download one index CSV.
+
+    Args:
+        index_name (str): Index name, used for logging
+        url (str): CSV URL
+        validators (dict): 'etag' and 'last_modified' of the stored copy
+        timeout (int): Request timeout in seconds
 
     Returns:
-        dict: Dictionary containing Nifty 50, 100, and 200 symbols
+        tuple: (status, symbols, validators) where status is 'updated',
+            'unchanged' or 'failed' and symbols is None unless updated
     """
-    print("Downloading Nifty indices CSV files from NSE India archives...")
-
-    # Headers to mimic a browser request
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-        "AppleWebKit/537.36 (KHTML, like Gecko) "
-        "Chrome/99.0.4844.84 Safari/537.36",
-        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9",
-        "Accept-Language": "en-US,en;q=0.9",
-        "Accept-Encoding": "gzip, deflate, br",
-        "Connection": "keep-alive",
-    }
-
-    result = {"nifty50": [], "nifty100": [], "nifty200": []}
-
-    # Download each CSV file
-    for index_name, url in NIFTY_CSV_URLS.items():
-        try:
-            print(f"Downloading {index_name} CSV from {url}...")
-
-            # Download the CSV
-            response = requests.get(url, headers=headers, timeout=30)
-
-            if response.status_code == 200:
-                # Parse CSV content
-                csv_content = response.content.decode("utf-8")
-                df = pd.read_csv(io.StringIO(csv_content))
-
-                # Extract symbols without adding .NS suffix
-                if "Symbol" in df.columns:
-                    symbols = df["Symbol"].tolist()
-                    result[index_name] = symbols
-                    print(f"Found {len(symbols)} symbols for {index_name}")
-                else:
-                    print(f"No Symbol column found in {index_name} CSV")
-                    # Try alternative column names
-                    possible_columns = [
-                        "Symbol",
-                        "SYMBOL",
-                        "symbol",
-                        "Ticker",
-                        "TICKER",
-                    ]
-                    for col in possible_columns:
-                        if col in df.columns:
-                            symbols = df[col].tolist()
-                            result[index_name] = symbols
-                            print(
-                                f"Found {len(symbols)} symbols for {index_name} in column {col}"
-                            )
-                            break
-            else:
-                print(f"Failed to download {index_name} CSV: {response.status_code}")
-
-        except Exception as e:
-            print(f"Error downloading {index_name} CSV: {e}")
-
-        # Add a delay to avoid hitting rate limits
-        time.sleep(random.uniform(1, 2))
-
-    return result
-
-
-def save_symbols_to_json(symbols_data):
-    """Save the symbols data to a JSON file"""
-    if not symbols_data:
-        print("No data to save")
-        return
+    validators = validators or {}
+    headers = dict(HEADERS)
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+
+    try:
+        response = requests.get(url, headers=headers, timeout=timeout)
+        if response.status_code == 304:
+            return "unchanged", None, validators
+        if response.status_code != 200:
+            print(f"Failed to download {index_name} CSV: {response.status_code}")
+            return "failed", None, validators
+
+        symbols = parse_symbols(response.content)
+        if not symbols:
+            print(f"No Symbol column found in {index_name} CSV")
+            return "failed", None, validators
+
+        return (
+            "updated",
+            symbols,
+            {
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+            },
+        )
+    except Exception as e:
+        print(f"Error downloading {index_name} CSV: {e}")
+        return "failed", None, validators
+
+
+def diff_membership(old, new):
+    """
+    Compare index memberships.
+
+    Returns:
+        dict: Index name -> {'added': [...], 'removed': [...]} for every
+            index whose constituents changed
+    """
+    changes = {}
+    for index_name in sorted(set(old) | set(new)):
+        before = set(old.get(index_name, []))
+        after = set(new.get(index_name, []))
+        if before != after:
+            changes[index_name] = {
+                "added": sorted(after - before),
+                "removed": sorted(before - after),
+            }
+    return changes
+
+
+def refresh_indices(
+    urls=NIFTY_CSV_URLS,
+    indices_file=INDICES_FILE,
+    validators_file=VALIDATORS_FILE,
+    max_workers=8,
+):
+    """
+    Refresh stored index constituents from the NSE archives.
+
+    Indices that are unchanged on the server or fail to download keep their
+    stored symbols, and indices not in ``urls`` are left untouched. The
+    indices file is only rewritten, atomically, when membership changed.
 
-    filename = "data/nifty_indices.json"
-    with open(filename, "w") as f:
-        json.dump(symbols_data, f, indent=4)
+    Args:
+        urls (dict): Index name -> CSV URL
+        indices_file (str): JSON file of index -> symbols
+        validators_file (str): JSON file of HTTP validators per index
+        max_workers (int): Concurrent downloads
 
-    print(f"\nSaved symbols to {filename}")
+    Returns:
+        tuple: (dict of index -> symbols, membership diff, dict of status
+            per index)
+    """
+    stored = _load_json(indices_file)
+    validators = _load_json(validators_file)
+
+    def fetch(item):
+        index_name, url = item
+        # Without stored symbols a 304 would leave nothing to keep
+        known = validators.get(index_name) if index_name in stored else None
+        return fetch_index_csv(index_name, url, known)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        results = dict(zip(urls, pool.map(fetch, urls.items())))
+
+    indices = dict(stored)
+    statuses = {}
+    for index_name, (status, symbols, index_validators) in results.items():
+        statuses[index_name] = status
+        if status == "updated":
+            indices[index_name] = symbols
+            validators[index_name] = index_validators
+
+    changes = diff_membership(stored, indices)
+    if changes or not os.path.exists(indices_file):
+        _write_json(indices_file, indices)
+    if any(status == "updated" for status in statuses.values()):
+        _write_json(validators_file, validators)
+
+    return indices, changes, statuses
+
+
+def print_changes(changes):
+    """Print a membership diff from ``refresh_indices``."""
+    if not changes:
+        print("No membership changes.")
+        return
 
-    # Print summary
-    for index, symbols in symbols_data.items():
-        if symbols:
-            print(f"  {index}: {len(symbols)} symbols")
-            # Print first 5 symbols as example
-            print(f"  First 5 symbols: {', '.join(symbols[:5])}")
+    for index_name, change in changes.items():
+        print(f"  {index_name}:")
+        if change["added"]:
+            print(f"    Added: {', '.join(change['added'])}")
+        if change["removed"]:
+            print(f"    Removed: {', '.join(change['removed'])}")
 
 
 def main():
-    print("Fetching Nifty 50, 100, and 200 stock symbols from NSE India website")
+    print("Refreshing Nifty index constituents from NSE India archives...")
 
-    # Try downloading CSV files directly from archives
-    symbols = download_nifty_csv()
+    indices, changes, statuses = refresh_indices()
 
-    # Save to JSON file
-    if symbols and any(len(symbols[index]) > 0 for index in symbols):
-        save_symbols_to_json(symbols)
-        print("\nSuccess! The symbols have been saved without any suffix.")
-    else:
+    for index_name, status in statuses.items():
+        print(f"  {index_name}: {status} ({len(indices.get(index_name, []))} symbols)")
+
+    if all(status == "failed" for status in statuses.values()):
         print("\nFailed to fetch symbols from NSE India.")
         print("You may need to try again later or use a different approach.")
+        return
+
+    print(f"\nMembership changes in {INDICES_FILE}:")
+    print_changes(changes)
 
 
 if __name__ == "__main__":
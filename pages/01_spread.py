@@ -7,15 +7,20 @@ import time
 import pandas as pd
 import streamlit as st
 
+from calendar_spread.continuous_store import ContinuousStore
 from calendar_spread.futures_data import (
+    SPREADS,
     backtest_calendar_spread,
-    get_continuous_futures_data,
+    spread_signal,
 )
 from calendar_spread.nse_api import NSEDataFetcher
+from symbol_master import get_symbol_master, refresh_futures_metadata
 
 
 def display_backtest_results(
-    trades_df: pd.DataFrame, backtest_df: pd.DataFrame = None
+    trades_df: pd.DataFrame,
+    backtest_df: pd.DataFrame = None,
+    spread_column: str = "Spread",
 ) -> None:
     """Display backtest results in a formatted way."""
     if not trades_df.empty:
@@ -60,8 +65,8 @@ def display_backtest_results(
             spread_col1, spread_col2 = st.columns(2)
 
             with spread_col1:
-                spread_mean = backtest_df["Spread"].mean()
-                spread_std = backtest_df["Spread"].std()
+                spread_mean = backtest_df[spread_column].mean()
+                spread_std = backtest_df[spread_column].std()
                 st.metric("Mean Spread", f"₹{spread_mean:.2f}")
                 st.metric("Spread Std Dev", f"₹{spread_std:.2f}")
 
@@ -105,12 +110,10 @@ def display_stocks(stocks_subset: pd.DataFrame) -> None:
 
         # Get spread statistics
         if row["Symbol"] in st.session_state.backtest_results:
-            spread_mean = st.session_state.backtest_results[row["Symbol"]][
-                "backtest_df"
-            ]["Spread"].mean()
-            spread_std = st.session_state.backtest_results[row["Symbol"]][
-                "backtest_df"
-            ]["Spread"].std()
+            results = st.session_state.backtest_results[row["Symbol"]]
+            spread = results["backtest_df"][results["spread_column"]]
+            spread_mean = spread.mean()
+            spread_std = spread.std()
             spread_high = spread_mean + spread_std
             spread_low = spread_mean - spread_std
         else:
@@ -127,8 +130,12 @@ def display_stocks(stocks_subset: pd.DataFrame) -> None:
                 losses = len(trades_df[trades_df["PnL"] <= 0])
                 wins_losses = f"&nbsp;&nbsp;&nbsp; W/L: 🟢{wins}/🔴{losses}"
 
+        lot_size = row["Lot Size"]
+        lot_text = f"{lot_size:.0f}" if pd.notna(lot_size) else "N/A"
+
         label_content = (
             f"### {row['Symbol']} - {row['Underlying']}"
+            f"&nbsp;&nbsp;&nbsp; Lot: {lot_text} "
             f"&nbsp;&nbsp;&nbsp; Trades: {row['Total Trades']} {trades_emoji} "
             f"&nbsp;&nbsp;&nbsp; Holding: {row['Avg Holding Period']:.1f} days {holding_emoji} "
             f"&nbsp;&nbsp;&nbsp; High: ₹{spread_high:.1f} Low: ₹{spread_low:.1f} "
@@ -143,7 +150,9 @@ def display_stocks(stocks_subset: pd.DataFrame) -> None:
 
                 st.subheader(f"Backtest Results for {row['Symbol']}")
                 display_backtest_results(
-                    results["trades_df"], results["backtest_df"]
+                    results["trades_df"],
+                    results["backtest_df"],
+                    results["spread_column"],
                 )
 
                 # Initialize session state for toggles if not present
@@ -217,6 +226,14 @@ def main():
             help="If checked, fetches fresh data from NSE instead of using cached data. "
             "Warning: This may take longer and is subject to rate limits.",
         )
+        spread_column = st.selectbox(
+            "Spread to Trade",
+            list(SPREADS),
+            help="Each spread is the later contract minus the earlier one: "
+            + ", ".join(
+                f"{name} ({b} - {a})" for name, (a, b) in SPREADS.items()
+            ),
+        )
 
     with col2:
         if st.button(
@@ -245,10 +262,16 @@ def main():
         futures_entities = nse.get_underlying_info()
         print(futures_entities)
 
+    # Lot sizes come from the stored F&O metadata, saved on the first run
+    master = get_symbol_master()
+    if not master.futures_symbols():
+        refresh_futures_metadata(underlying_info=futures_entities)
+
     # Initialize session state for storing backtest results if not exists
     if "backtest_results" not in st.session_state:
         start_time = time.time()
         st.session_state.backtest_results = {}
+        store = ContinuousStore(fetcher=nse)
 
         # Create containers for progress and results
         progress_container = st.container()
@@ -268,7 +291,8 @@ def main():
                 time_text.text(f"Time elapsed: {elapsed_time:.1f} seconds")
 
             # Fetch and backtest
-            continuous_df = get_continuous_futures_data(
+            # Only days after the stored table are fetched and appended
+            continuous_df = store.update(
                 symbol,
                 use_cache_for_future=(
                     not use_fresh_data
@@ -277,61 +301,13 @@ def main():
             if continuous_df.empty:
                 continue
 
-            backtest_df, trades_df = backtest_calendar_spread(continuous_df)
+            backtest_df, trades_df = backtest_calendar_spread(
+                continuous_df, spread_column
+            )
             if trades_df.empty:
                 continue
 
-            # Calculate signal thresholds
-            spread_mean = backtest_df["Spread"].mean()
-            spread_std = backtest_df["Spread"].std()
-            upper_threshold = spread_mean + spread_std
-            lower_threshold = spread_mean - spread_std
-
-            # Get current data
-            current_spread = backtest_df["Spread"].iloc[-1]
-            current_date = backtest_df["Date"].iloc[-1]
-
-            # Default signal
-            signal = "NEUTRAL"
-
-            # Get last trade info
-            last_trade = trades_df.sort_values("Exit_Date").iloc[-1]
-            last_exit_date = pd.to_datetime(last_trade["Exit_Date"])
-
-            # Filter data after last trade exit
-            post_trade_data = backtest_df[backtest_df["Date"] > last_exit_date]
-
-            if post_trade_data.empty:
-                # New signals on first day after trade
-                if current_spread > upper_threshold:
-                    signal = "SELL (Fresh)"
-                elif current_spread < lower_threshold:
-                    signal = "BUY (Fresh)"
-            else:
-                signal_start_date = None
-                signal_type = None
-
-                # Check for SELL signal
-                if current_spread > upper_threshold:
-                    sell_signals = post_trade_data[
-                        post_trade_data["Spread"] > upper_threshold
-                    ]
-                    if not sell_signals.empty:
-                        signal_start_date = sell_signals.iloc[0]["Date"]
-                        signal_type = "SELL"
-
-                # Check for BUY signal
-                elif current_spread < lower_threshold:
-                    buy_signals = post_trade_data[
-                        post_trade_data["Spread"] < lower_threshold
-                    ]
-                    if not buy_signals.empty:
-                        signal_start_date = buy_signals.iloc[0]["Date"]
-                        signal_type = "BUY"
-
-                if signal_start_date is not None:
-                    days_active = (current_date - signal_start_date).days
-                    signal = f"{signal_type} ({'Fresh' if days_active <= 1 else f'Active {days_active}d'})"
+            signal = spread_signal(backtest_df, trades_df, spread_column)
 
             print(f"signal for {symbol}: {signal}")
             st.session_state.backtest_results[symbol] = {
@@ -340,6 +316,7 @@ def main():
                 "signal": signal,
                 "trades_df": trades_df,
                 "backtest_df": continuous_df,
+                "spread_column": spread_column,
                 "underlying": stock["underlying"],
             }
 
@@ -347,6 +324,9 @@ def main():
             progress = (i + 1) / len(stocks)
             progress_bar.progress(progress)
 
+        # Write the scan's cache lookups in one go
+        nse.futures_cache.flush_stats()
+
         # Display final time taken
         final_time = time.time() - start_time
         with progress_container:
@@ -370,6 +350,10 @@ def main():
         ]
     )
 
+    stocks_df["Lot Size"] = stocks_df["Symbol"].apply(
+        lambda x: (master.futures_info(x) or {}).get("lot_size")
+    )
+
     # Initialize columns with values from session state or defaults
     stocks_df["Total Trades"] = stocks_df["Symbol"].apply(
         lambda x: st.session_state.backtest_results.get(x, {}).get(
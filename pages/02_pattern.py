@@ -1,6 +1,10 @@
 import streamlit as st
 
-from components import run_risk_reward_calculator, run_volume_surge_detector
+from components import (
+    run_pattern_statistics,
+    run_risk_reward_calculator,
+    run_volume_surge_detector,
+)
 
 
 def main():
@@ -23,7 +27,13 @@ def main():
     )
 
     # Create tabs for different functionalities
-    tab1, tab2 = st.tabs(["Volume Surge Detector", "Risk Reward Calculator"])
+    tab1, tab2, tab3 = st.tabs(
+        [
+            "Volume Surge Detector",
+            "Risk Reward Calculator",
+            "Pattern Statistics",
+        ]
+    )
 
     with tab1:
         run_volume_surge_detector()
@@ -31,6 +41,9 @@ def main():
     with tab2:
         run_risk_reward_calculator()
 
+    with tab3:
+        run_pattern_statistics()
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,16 @@
+import streamlit as st
+
+from components import run_pattern_screener
+
+
+def main():
+    """Pattern screener entry point."""
+    st.set_page_config(
+        page_title="Pattern Screener", page_icon="🕯️", layout="wide"
+    )
+
+    run_pattern_screener()
+
+
+if __name__ == "__main__":
+    main()
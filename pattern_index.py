@@ -0,0 +1,225 @@
+"""
+Compact bitmask storage and query index for detected candlestick patterns.
+
+Every (symbol, bar) cell of a panel holds one unsigned integer whose bits
+mark the registered patterns found on that bar, so universe-wide queries
+are bit operations over a single array instead of re-running detection.
+"""
+
+import numpy as np
+import pandas as pd
+
+from candle_stick_patterns import (
+    AVG_BODY_BARS,
+    PATTERNS,
+    CandleFeatures,
+    evaluate_patterns,
+    recent_avg_body,
+    trailing_avg_body,
+)
+from price_panel import PricePanel, download_panel
+
+# Columns of ``PatternIndex.to_frame``
+HIT_COLUMNS = ["Symbol", "Pattern", "Direction", "Date", "Bars Ago"]
+
+
+def mask_dtype(n_patterns):
+    """Smallest unsigned dtype with one bit per pattern."""
+    if n_patterns <= 16:
+        return np.uint16
+    if n_patterns <= 32:
+        return np.uint32
+    return np.uint64
+
+
+def encode_patterns(hits, names):
+    """
+    Pack boolean pattern hits into one bitmask array.
+
+    Args:
+        hits (dict): Pattern name -> boolean array, all of the same shape
+        names (list): Pattern names in bit order
+
+    Returns:
+        np.ndarray: Bitmask array shaped like the hit arrays
+    """
+    dtype = mask_dtype(len(names))
+    shape = next(iter(hits.values())).shape if hits else (0,)
+    masks = np.zeros(shape, dtype=dtype)
+    for bit, name in enumerate(names):
+        masks |= hits[name].astype(dtype) << dtype(bit)
+    return masks
+
+
+class PatternIndex:
+    """Bitmask patterns per (symbol, bar) with a lazy inverted index."""
+
+    def __init__(self, symbols, dates, masks, names=None):
+        """
+        Args:
+            symbols (list): Symbols in row order
+            dates (np.ndarray): datetime64 dates of shape (symbols, bars),
+                NaT where a symbol has no bar
+            masks (np.ndarray): Pattern bitmasks shaped like ``dates``
+            names (list): Pattern names in bit order (default: registry order)
+        """
+        self.symbols = list(symbols)
+        self.dates = dates
+        self.masks = masks
+        self.names = list(PATTERNS if names is None else names)
+        self.bits = {name: i for i, name in enumerate(self.names)}
+        self.rows = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self._postings = {}
+
+    @classmethod
+    def from_panel(cls, panel, avg_body_bars=AVG_BODY_BARS, trailing=False):
+        """
+        Detect every registered pattern over a panel and index the hits.
+
+        Body thresholds use the average body of each symbol's last
+        ``avg_body_bars`` bars, as detection over the recent period does.
+        With ``trailing`` each bar is instead compared with the average of
+        the ``avg_body_bars`` bars ending at it, which keeps statistics over
+        a long history free of look-ahead.
+        """
+        if not isinstance(panel, PricePanel):
+            panel = PricePanel.from_frames(panel)
+        names = list(PATTERNS)
+        average = trailing_avg_body if trailing else recent_avg_body
+        avg_body = average(panel.open, panel.close, avg_body_bars)
+        features = CandleFeatures(
+            panel.open, panel.high, panel.low, panel.close, avg_body
+        )
+        masks = encode_patterns(evaluate_patterns(features, names), names)
+        return cls(panel.symbols, panel.dates, masks, names)
+
+    def bitmask(self, patterns):
+        """Combined bitmask for one pattern name or a list of names."""
+        if isinstance(patterns, str):
+            patterns = [patterns]
+        value = 0
+        for name in patterns:
+            value |= 1 << self.bits[name]
+        return self.masks.dtype.type(value)
+
+    def window(self, since=None, last_bars=None):
+        """Boolean (symbols, bars) mask of the bars inside a query window."""
+        window = ~np.isnat(self.dates)
+        if since is not None:
+            window &= self.dates >= np.datetime64(pd.Timestamp(since), "ns")
+        if last_bars is not None:
+            window[:, : max(self.dates.shape[1] - last_bars, 0)] = False
+        return window
+
+    def hits(self, patterns, since=None, last_bars=None):
+        """Boolean (symbols, bars) mask of bars matching any given pattern."""
+        matches = (self.masks & self.bitmask(patterns)) != 0
+        return matches & self.window(since, last_bars)
+
+    def symbols_with(self, patterns, since=None, last_bars=None):
+        """
+        Symbols with any of the given patterns inside the window.
+
+        Args:
+            patterns (str or list): Pattern name(s)
+            since (date-like): Only bars on or after this date
+            last_bars (int): Only each symbol's last ``last_bars`` bars
+
+        Returns:
+            list: Matching symbols in index order
+        """
+        rows = np.flatnonzero(self.hits(patterns, since, last_bars).any(axis=1))
+        return [self.symbols[row] for row in rows]
+
+    def postings(self, pattern):
+        """Inverted index entry: (row, bar) positions of one pattern."""
+        if pattern not in self._postings:
+            bit = self.masks.dtype.type(1 << self.bits[pattern])
+            self._postings[pattern] = np.nonzero(self.masks & bit)
+        return self._postings[pattern]
+
+    def occurrences(self, pattern):
+        """All (symbol, date) occurrences of one pattern as a DataFrame."""
+        rows, bars = self.postings(pattern)
+        return pd.DataFrame(
+            {
+                "Symbol": np.asarray(self.symbols, dtype=object)[rows],
+                "Date": self.dates[rows, bars],
+            }
+        )
+
+    def to_frame(self, patterns=None, since=None, last_bars=None):
+        """
+        Pattern hits inside the window, one row per (symbol, pattern, bar).
+
+        Args:
+            patterns (list): Pattern names to include (default: all, an
+                empty list includes none)
+            since (date-like): Only bars on or after this date
+            last_bars (int): Only each symbol's last ``last_bars`` bars
+
+        Returns:
+            pandas.DataFrame: Symbol, Pattern, Direction, Date and Bars Ago
+        """
+        symbols = np.asarray(self.symbols, dtype=object)
+        n_bars = self.dates.shape[1]
+
+        frames = []
+        for name in self.names if patterns is None else patterns:
+            rows, bars = np.nonzero(self.hits(name, since, last_bars))
+            frames.append(
+                pd.DataFrame(
+                    {
+                        "Symbol": symbols[rows],
+                        "Pattern": name,
+                        "Direction": PATTERNS[name].direction,
+                        "Date": self.dates[rows, bars],
+                        "Bars Ago": n_bars - 1 - bars,
+                    }
+                )
+            )
+        if not frames:
+            return pd.DataFrame(columns=HIT_COLUMNS)
+        return pd.concat(frames, ignore_index=True)
+
+    def decode(self, symbol, since=None, last_bars=None):
+        """
+        Patterns of one symbol in the same shape as ``detect_patterns``.
+
+        Only patterns with at least one date in the window are included.
+
+        Returns:
+            dict: Pattern name -> list of Timestamps
+        """
+        row = self.rows[symbol]
+        window = self.window(since, last_bars)[row]
+        masks = self.masks[row]
+        dates = self.dates[row]
+
+        patterns = {}
+        for name, bit in self.bits.items():
+            found = window & ((masks >> masks.dtype.type(bit)) & 1).astype(bool)
+            if found.any():
+                patterns[name] = pd.DatetimeIndex(dates[found]).tolist()
+        return patterns
+
+
+def get_recent_patterns_batch(symbols, lookback_days=5, period="3mo"):
+    """
+    Recent patterns for many symbols from one batched download.
+
+    Args:
+        symbols (list): Stock ticker symbols
+        lookback_days (int): Number of recent days to check
+        period (str): Time period to analyze (default: '3mo')
+
+    Returns:
+        dict: Symbol -> {pattern name -> list of recent Timestamps}
+    """
+    if not symbols:
+        return {}
+    index = PatternIndex.from_panel(download_panel(symbols, period=period))
+    since = pd.Timestamp.now().normalize() - pd.Timedelta(days=lookback_days)
+    return {
+        symbol: index.decode(symbol, since=since) for symbol in index.symbols
+    }
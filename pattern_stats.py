@@ -0,0 +1,170 @@
+"""
+Forward-return statistics for every candlestick pattern across a universe.
+
+Pattern occurrences come from the bitmask ``PatternIndex`` and their
+forward returns and excursions are gathered from precomputed (symbols, bars)
+arrays, so evaluating every occurrence is a handful of fancy-indexing
+operations rather than a loop per occurrence.
+"""
+
+import os
+import warnings
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from candle_stick_patterns import PATTERNS
+from pattern_index import PatternIndex
+from price_store import load_panel
+from symbol_master import get_symbol_master
+
+HORIZONS = (1, 3, 5, 10)
+STATS_DIR = os.path.join("stocks_cache", "pattern_stats")
+
+
+def forward_returns(close, horizon):
+    """(symbols, bars) return from each close to the one ``horizon`` bars on."""
+    returns = np.full(close.shape, np.nan)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        returns[:, :-horizon] = close[:, horizon:] / close[:, :-horizon] - 1
+    return returns
+
+
+def _forward_windows(values, horizon):
+    """(symbols, bars, horizon) view of the ``horizon`` bars after each bar."""
+    padded = np.full((values.shape[0], values.shape[1] + horizon), np.nan)
+    padded[:, : values.shape[1]] = values
+    return sliding_window_view(padded[:, 1:], horizon, axis=1)
+
+
+def pattern_statistics(panel, horizons=HORIZONS, index=None):
+    """
+    Compute forward-return statistics of every pattern over a panel.
+
+    Returns are measured from the close of the pattern bar. Excursions are
+    the best and worst move of the high/low over the holding period,
+    signed in the pattern's direction (bearish patterns profit from falls).
+    Neutral patterns report the absolute return, with no hit rate or
+    excursions. Occurrences without a full holding period are left out.
+    Patterns are detected against a trailing average body, so no bar is
+    classified with information from later bars.
+
+    Args:
+        panel (PricePanel): Daily bars of the universe
+        horizons (tuple): Holding periods in bars
+        index (PatternIndex): Precomputed trailing pattern index for the
+            panel (see ``PatternIndex.from_panel``)
+
+    Returns:
+        pandas.DataFrame: One row per (pattern, horizon)
+    """
+    index = index or PatternIndex.from_panel(panel, trailing=True)
+    close = panel.close
+
+    rows = []
+    for horizon in horizons:
+        returns = forward_returns(close, horizon)
+        highs = _forward_windows(panel.high, horizon)
+        lows = _forward_windows(panel.low, horizon)
+
+        for name in index.names:
+            direction = PATTERNS[name].direction
+
+            symbol_rows, bars = index.postings(name)
+            gathered = returns[symbol_rows, bars]
+            valid = ~np.isnan(gathered)
+            symbol_rows, bars = symbol_rows[valid], bars[valid]
+            gathered = gathered[valid]
+
+            entry = close[symbol_rows, bars]
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", RuntimeWarning)
+                up = np.nanmax(highs[symbol_rows, bars], axis=1) / entry - 1
+                down = np.nanmin(lows[symbol_rows, bars], axis=1) / entry - 1
+
+            count = len(gathered)
+            if direction > 0:
+                favorable, adverse = up, -down
+                hit_rate = _mean(gathered > 0) * 100
+            elif direction < 0:
+                gathered = -gathered
+                favorable, adverse = -down, up
+                hit_rate = _mean(gathered > 0) * 100
+            else:
+                # Indecision patterns have no side to win on: report the
+                # size of the move and leave the directional columns blank
+                gathered = np.abs(gathered)
+                favorable = adverse = np.empty(0)
+                hit_rate = np.nan
+            rows.append(
+                {
+                    "Pattern": name,
+                    "Direction": direction,
+                    "Horizon": horizon,
+                    "Occurrences": count,
+                    "Symbols": len(np.unique(symbol_rows)),
+                    "Avg Return %": _mean(gathered) * 100,
+                    "Median Return %": _median(gathered) * 100,
+                    "Hit Rate %": hit_rate,
+                    "Avg Favorable Excursion %": _mean(favorable) * 100,
+                    "Avg Adverse Excursion %": _mean(adverse) * 100,
+                }
+            )
+
+    return pd.DataFrame(rows)
+
+
+def _mean(values):
+    return float(np.mean(values)) if len(values) else np.nan
+
+
+def _median(values):
+    return float(np.median(values)) if len(values) else np.nan
+
+
+def _stats_path(index_name, stats_dir=STATS_DIR):
+    return os.path.join(stats_dir, f"{index_name}.pkl")
+
+
+def load_or_compute_statistics(
+    index_name, horizons=HORIZONS, update=True, stats_dir=STATS_DIR
+):
+    """
+    Pattern statistics for an index from nifty_indices.json, cached on disk.
+
+    The cache is keyed by the latest stored bar date, so statistics are only
+    recomputed after new bars reach the price store.
+
+    Args:
+        index_name (str): Index name (e.g. 'nifty500')
+        horizons (tuple): Holding periods in bars
+        update (bool): Refresh the price store before computing
+        stats_dir (str): Directory of cached statistics
+
+    Returns:
+        pandas.DataFrame: One row per (pattern, horizon)
+    """
+    symbols = get_symbol_master().index_symbols(index_name, ".NS")
+
+    panel = load_panel(symbols, update=update)
+    if not len(panel):
+        return pd.DataFrame()
+
+    as_of = pd.Timestamp(panel.dates[:, -1].max())
+    path = _stats_path(index_name, stats_dir)
+    if os.path.exists(path):
+        cached = pd.read_pickle(path)
+        if cached.attrs.get("as_of") == as_of and tuple(
+            cached.attrs.get("horizons", ())
+        ) == tuple(horizons):
+            return cached
+
+    stats = pattern_statistics(panel, horizons)
+    stats.attrs["as_of"] = as_of
+    stats.attrs["horizons"] = tuple(horizons)
+
+    os.makedirs(stats_dir, exist_ok=True)
+    stats.to_pickle(f"{path}.tmp")
+    os.replace(f"{path}.tmp", path)
+    return stats
@@ -0,0 +1,147 @@
+"""
+Right-aligned OHLCV panels for evaluating many symbols in one NumPy pass.
+
+Every symbol keeps its own bar sequence: rows are symbols, columns are bars,
+and shorter histories are padded with NaN (NaT for dates) at the start, so
+the last column is always each symbol's latest bar.
+"""
+
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+FIELDS = ("Open", "High", "Low", "Close", "Volume")
+
+
+class PricePanel:
+    """OHLCV arrays of shape (symbols, bars) with per-symbol dates."""
+
+    def __init__(self, symbols, dates, open, high, low, close, volume):
+        self.symbols = list(symbols)
+        self.dates = dates
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+        self.rows = {symbol: i for i, symbol in enumerate(self.symbols)}
+
+    def __len__(self):
+        return len(self.symbols)
+
+    @property
+    def n_bars(self):
+        return self.dates.shape[1]
+
+    @classmethod
+    def from_frames(cls, frames):
+        """
+        Build a panel from per-symbol OHLCV DataFrames.
+
+        Args:
+            frames (dict): Symbol -> DataFrame with Open/High/Low/Close/Volume
+                columns indexed by date
+
+        Returns:
+            PricePanel: Right-aligned panel of all symbols
+        """
+        symbols = list(frames)
+        n_bars = max((len(df) for df in frames.values()), default=0)
+        shape = (len(symbols), n_bars)
+
+        dates = np.full(shape, np.datetime64("NaT"), dtype="datetime64[ns]")
+        arrays = {field: np.full(shape, np.nan) for field in FIELDS}
+
+        for i, symbol in enumerate(symbols):
+            df = frames[symbol]
+            if df is None or df.empty:
+                continue
+            start = n_bars - len(df)
+            index = pd.DatetimeIndex(df.index)
+            if index.tz is not None:
+                index = index.tz_localize(None)
+            dates[i, start:] = index.values
+            for field in FIELDS:
+                if field in df.columns:
+                    arrays[field][i, start:] = df[field].to_numpy(
+                        dtype=np.float64, na_value=np.nan
+                    )
+
+        return cls(
+            symbols,
+            dates,
+            arrays["Open"],
+            arrays["High"],
+            arrays["Low"],
+            arrays["Close"],
+            arrays["Volume"],
+        )
+
+    def take(self, rows):
+        """Return a panel of the given rows, in the given order."""
+        rows = np.asarray(rows, dtype=np.intp)
+        return PricePanel(
+            [self.symbols[row] for row in rows],
+            self.dates[rows],
+            self.open[rows],
+            self.high[rows],
+            self.low[rows],
+            self.close[rows],
+            self.volume[rows],
+        )
+
+    def frame(self, symbol):
+        """Return one symbol's bars as a DataFrame without padding."""
+        row = self.rows[symbol]
+        valid = ~np.isnat(self.dates[row])
+        return pd.DataFrame(
+            {
+                "Open": self.open[row, valid],
+                "High": self.high[row, valid],
+                "Low": self.low[row, valid],
+                "Close": self.close[row, valid],
+                "Volume": self.volume[row, valid],
+            },
+            index=pd.DatetimeIndex(self.dates[row, valid], name="Date"),
+        )
+
+
+def split_download(data, symbols):
+    """Split a multi-ticker yfinance download into per-symbol DataFrames."""
+    frames = {}
+    if data is None or data.empty:
+        return frames
+
+    if not isinstance(data.columns, pd.MultiIndex):
+        frames[symbols[0]] = data.dropna(how="all")
+        return frames
+
+    available = set(data.columns.get_level_values(0))
+    for symbol in symbols:
+        if symbol in available:
+            frames[symbol] = data[symbol].dropna(how="all")
+    return frames
+
+
+def download_panel(symbols, period="3mo", interval="1d"):
+    """
+    Download OHLCV history for many symbols in one batched request.
+
+    Args:
+        symbols (list): Ticker symbols (e.g. 'INFY.NS')
+        period (str): Time period to download (default: '3mo')
+        interval (str): Data interval (default: '1d')
+
+    Returns:
+        PricePanel: Panel of every symbol that returned data
+    """
+    data = yf.download(
+        list(symbols),
+        period=period,
+        interval=interval,
+        group_by="ticker",
+        auto_adjust=True,
+        progress=False,
+        threads=True,
+    )
+    return PricePanel.from_frames(split_download(data, list(symbols)))
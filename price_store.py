@@ -0,0 +1,187 @@
+"""
+Local store of daily OHLCV bars per symbol.
+
+Bars are kept in one pickle per symbol under ``stocks_cache/daily`` and
+brought up to date with batched yfinance downloads that only request the
+days after each symbol's last stored bar.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+from price_panel import PricePanel, split_download
+
+STORE_DIR = os.path.join("stocks_cache", "daily")
+COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+
+def _store_path(symbol, store_dir=STORE_DIR):
+    return os.path.join(store_dir, f'{symbol.replace(".", "_")}.pkl')
+
+
+def load_history(symbol, store_dir=STORE_DIR):
+    """
+    Load the stored daily bars of one symbol.
+
+    Returns:
+        pandas.DataFrame: Bars indexed by date, or None if nothing is stored
+    """
+    path = _store_path(symbol, store_dir)
+    if not os.path.exists(path):
+        return None
+    return pd.read_pickle(path)
+
+
+def save_history(symbol, df, store_dir=STORE_DIR):
+    """Atomically replace the stored daily bars of one symbol."""
+    os.makedirs(store_dir, exist_ok=True)
+    path = _store_path(symbol, store_dir)
+    tmp_path = f"{path}.tmp"
+    df.to_pickle(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def last_checked(symbol, store_dir=STORE_DIR):
+    """Date the stored bars were last refreshed, or None if not stored."""
+    path = _store_path(symbol, store_dir)
+    if not os.path.exists(path):
+        return None
+    return datetime.fromtimestamp(os.path.getmtime(path)).date()
+
+
+def _normalize(df):
+    """Keep OHLCV columns on a tz-naive, sorted, de-duplicated date index."""
+    df = df[[c for c in COLUMNS if c in df.columns]].dropna(how="all")
+    index = pd.DatetimeIndex(df.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    df.index = index.normalize().rename("Date")
+    df = df[~df.index.duplicated(keep="last")]
+    return df.sort_index()
+
+
+def _download(symbols, **kwargs):
+    data = yf.download(
+        symbols,
+        group_by="ticker",
+        auto_adjust=True,
+        progress=False,
+        threads=True,
+        **kwargs,
+    )
+    return split_download(data, symbols)
+
+
+def _adjustment_changed(old, new, rtol=1e-4):
+    """
+    Whether an incremental download was adjusted on a different basis.
+
+    Downloads are split- and dividend-adjusted as of the download day, so a
+    corporate action since the last update rescales the bars both frames
+    share. Only closes on overlapping dates are compared.
+    """
+    new = _normalize(new)
+    dates = old.index.intersection(new.index)
+    if dates.empty:
+        return False
+    stored = old.loc[dates, "Close"].to_numpy(dtype=float)
+    fresh = new.loc[dates, "Close"].to_numpy(dtype=float)
+    return not np.allclose(stored, fresh, rtol=rtol, equal_nan=True)
+
+
+def update_history(symbols, period="5y", store_dir=STORE_DIR, today=None):
+    """
+    Bring the stored bars of many symbols up to date.
+
+    Symbols already refreshed today are skipped. Symbols without stored bars
+    get ``period`` of history; the rest share one batched download starting
+    at the oldest last-stored date among them. When that download disagrees
+    with the stored bars it overlaps (a split or dividend changed the
+    adjustment), the symbol's full ``period`` is downloaded again and
+    replaces the stored bars.
+
+    Args:
+        symbols (list): Ticker symbols (e.g. 'INFY.NS')
+        period (str): History downloaded for new symbols (default: '5y')
+        store_dir (str): Store directory
+        today (date): Override for the current date
+
+    Returns:
+        list: Symbols whose stored bars were refreshed
+    """
+    today = today or date.today()
+    stale = [s for s in symbols if last_checked(s, store_dir) != today]
+    if not stale:
+        return []
+
+    stored = {s: load_history(s, store_dir) for s in stale}
+    missing = [s for s, df in stored.items() if df is None or df.empty]
+    existing = [s for s in stale if s not in missing]
+
+    downloads = {}
+    if missing:
+        downloads.update(_download(missing, period=period))
+    if existing:
+        start = min(stored[s].index[-1] for s in existing).date()
+        downloads.update(
+            _download(existing, start=start, end=today + timedelta(days=1))
+        )
+        readjusted = [
+            s
+            for s in existing
+            if s in downloads and _adjustment_changed(stored[s], downloads[s])
+        ]
+        if readjusted:
+            print(f"Adjustments changed, reloading {len(readjusted)} symbols")
+            for symbol, df in _download(readjusted, period=period).items():
+                downloads[symbol] = df
+                stored[symbol] = None
+
+    for symbol in stale:
+        new = downloads.get(symbol)
+        old = stored[symbol]
+        if new is None or new.empty:
+            if old is None:
+                continue
+            merged = old
+        elif old is None or old.empty:
+            merged = _normalize(new)
+        else:
+            merged = _normalize(pd.concat([old, new]))
+        save_history(symbol, merged, store_dir)
+
+    return stale
+
+
+def load_frames(symbols, store_dir=STORE_DIR, max_workers=8):
+    """Load stored bars of many symbols on a thread pool."""
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        frames = pool.map(lambda s: load_history(s, store_dir), symbols)
+        return {
+            symbol: df
+            for symbol, df in zip(symbols, frames)
+            if df is not None and not df.empty
+        }
+
+
+def load_panel(symbols, update=True, period="5y", store_dir=STORE_DIR):
+    """
+    Load stored daily bars of many symbols as one right-aligned panel.
+
+    Args:
+        symbols (list): Ticker symbols (e.g. 'INFY.NS')
+        update (bool): Refresh stale symbols from yfinance first
+        period (str): History downloaded for symbols not yet stored
+        store_dir (str): Store directory
+
+    Returns:
+        PricePanel: Panel of every symbol with stored bars
+    """
+    if update:
+        update_history(symbols, period=period, store_dir=store_dir)
+    return PricePanel.from_frames(load_frames(symbols, store_dir))
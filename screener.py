@@ -0,0 +1,229 @@
+"""
+Composable stock screener over one shared in-memory price panel.
+
+Filters are stages that each see only the symbols that survived the stages
+before them. Stages run cheapest first, so a query such as "volume surge
+above 50% AND hammer on the last bar AND no daily move above 5%" loads its
+bars once and only runs pattern detection on the few surge candidates.
+
+Usage:
+    python screener.py --index nifty500 --volume-surge 50 \\
+        --pattern Hammer --max-move 5
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from candle_stick_patterns import (
+    AVG_BODY_BARS,
+    PATTERNS,
+    CandleFeatures,
+    evaluate_patterns,
+    recent_avg_body,
+)
+from stable_price import stability_statistics
+from symbol_master import get_symbol_master
+from timeframes import TIMEFRAMES, load_timeframe_panel
+from volume_checker import volume_surges_panel
+
+
+class Stage:
+    """
+    One screener filter.
+
+    ``evaluate`` receives a PricePanel of the surviving symbols and returns a
+    boolean mask over its rows plus a dict of per-row columns to report.
+    Stages with a lower ``cost`` run first.
+    """
+
+    def __init__(self, name, evaluate, cost=1):
+        self.name = name
+        self.evaluate = evaluate
+        self.cost = cost
+
+    def __repr__(self):
+        return f"Stage({self.name!r}, cost={self.cost})"
+
+
+def volume_surge(min_percent=50, window=10):
+    """Latest volume at least ``min_percent`` above its ``window`` average."""
+
+    def evaluate(panel):
+        surges = volume_surges_panel(panel, window)
+        increase = surges["percent_increase"].to_numpy()
+        mask = surges["is_surge"].to_numpy() & (increase > min_percent)
+        return mask, {"Volume Surge %": increase}
+
+    return Stage(f"volume surge > {min_percent}%", evaluate, cost=1)
+
+
+def max_daily_move(max_move=5, window=35):
+    """No single-bar close move above ``max_move`` percent in ``window`` bars."""
+
+    def evaluate(panel):
+        stats = stability_statistics(panel, window, max_move)
+        return stats["is_stable"].to_numpy(), {
+            "Max Move %": stats["max_change"].to_numpy(),
+            "Avg Move %": stats["avg_daily_change"].to_numpy(),
+        }
+
+    return Stage(f"max daily move < {max_move}%", evaluate, cost=2)
+
+
+def candle_pattern(names, last_bars=1, avg_body_bars=AVG_BODY_BARS):
+    """
+    Any of the given candlestick patterns within the last ``last_bars``.
+
+    Body thresholds use the average body of the last ``avg_body_bars`` bars,
+    so hits match the pattern page however long the panel's history is.
+    """
+    names = [names] if isinstance(names, str) else list(names)
+    unknown = [name for name in names if name not in PATTERNS]
+    if unknown:
+        raise ValueError(f"Unknown patterns: {', '.join(unknown)}")
+
+    def evaluate(panel):
+        avg_body = recent_avg_body(panel.open, panel.close, avg_body_bars)
+        features = CandleFeatures(
+            panel.open, panel.high, panel.low, panel.close, avg_body
+        )
+        hits = evaluate_patterns(features, names)
+        found = [[] for _ in range(len(panel))]
+        for name, mask in hits.items():
+            for row in np.flatnonzero(mask[:, -last_bars:].any(axis=1)):
+                found[row].append(name)
+        mask = np.array([bool(f) for f in found], dtype=bool)
+        return mask, {"Patterns": [", ".join(f) for f in found]}
+
+    return Stage(
+        f"{' or '.join(names)} in last {last_bars} bars", evaluate, cost=3
+    )
+
+
+class Screener:
+    """Run stages cheapest first over the survivors of a shared panel."""
+
+    def __init__(self, stages):
+        self.stages = sorted(stages, key=lambda stage: stage.cost)
+        self.counts = []
+
+    def run(self, panel):
+        """
+        Screen every symbol of a panel.
+
+        Args:
+            panel (PricePanel): Bars of the universe
+
+        Returns:
+            pandas.DataFrame: Columns reported by each stage for the symbols
+                that passed all of them, indexed by symbol
+        """
+        rows = np.arange(len(panel))
+        columns = {}
+        self.counts = [("universe", len(rows))]
+
+        for stage in self.stages:
+            if not len(rows):
+                break
+            mask, values = stage.evaluate(panel.take(rows))
+            mask = np.asarray(mask, dtype=bool)
+            rows = rows[mask]
+            for name, column in columns.items():
+                columns[name] = column[mask]
+            for name, column in values.items():
+                columns[name] = np.asarray(column)[mask]
+            self.counts.append((stage.name, len(rows)))
+
+        return pd.DataFrame(
+            columns,
+            index=pd.Index([panel.symbols[row] for row in rows], name="Symbol"),
+        )
+
+
+def screen(symbols, stages, timeframe="1d", update=True):
+    """
+    Load the bars of many symbols once and run a screener over them.
+
+    Args:
+        symbols (list): Ticker symbols (e.g. 'INFY.NS')
+        stages (list): Stage filters to apply
+        timeframe (str): '1d', '1wk' or '1mo'
+        update (bool): Refresh stale daily bars from yfinance first
+
+    Returns:
+        tuple: (pandas.DataFrame of matches, Screener with stage counts)
+    """
+    panel = load_timeframe_panel(symbols, timeframe, update=update)
+    screener = Screener(stages)
+    return screener.run(panel), screener
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Screen an index with combined volume, stability "
+        "and candlestick pattern filters"
+    )
+    parser.add_argument("--index", default="nifty500", help="Index to screen")
+    parser.add_argument(
+        "--timeframe", default="1d", choices=list(TIMEFRAMES), help="Bar size"
+    )
+    parser.add_argument(
+        "--volume-surge",
+        type=float,
+        help="Minimum volume increase over the 10-bar average in %%",
+    )
+    parser.add_argument(
+        "--pattern",
+        action="append",
+        choices=list(PATTERNS),
+        help="Candlestick pattern to require (repeat for any of several)",
+    )
+    parser.add_argument(
+        "--last-bars",
+        type=int,
+        default=1,
+        help="Bars in which the pattern must appear (default: 1)",
+    )
+    parser.add_argument(
+        "--max-move", type=float, help="Largest allowed single-bar move in %%"
+    )
+    parser.add_argument(
+        "--window", type=int, default=35, help="Bars checked by --max-move"
+    )
+    parser.add_argument(
+        "--no-update",
+        action="store_true",
+        help="Use stored bars without refreshing them",
+    )
+    args = parser.parse_args()
+
+    stages = []
+    if args.volume_surge is not None:
+        stages.append(volume_surge(args.volume_surge))
+    if args.max_move is not None:
+        stages.append(max_daily_move(args.max_move, args.window))
+    if args.pattern:
+        stages.append(candle_pattern(args.pattern, args.last_bars))
+    if not stages:
+        parser.error(
+            "Give at least one of --volume-surge, --pattern, --max-move"
+        )
+
+    symbols = get_symbol_master().index_symbols(args.index, ".NS")
+
+    results, screener = screen(
+        symbols, stages, args.timeframe, update=not args.no_update
+    )
+    for name, count in screener.counts:
+        print(f"{name}: {count} stocks")
+    print("-" * 80)
+    if results.empty:
+        print("No stocks matched.")
+    else:
+        print(results.to_string(float_format="{:.2f}".format))
+
+
+if __name__ == "__main__":
+    main()
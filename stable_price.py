@@ -0,0 +1,345 @@
+"""
+Screen for stocks whose price has not moved sharply on any recent day.
+
+Daily bars come from the local price store, which refreshes each symbol at
+most once per day, and the move statistics of the whole universe are computed
+on one (symbols, bars) close panel.
+
+Usage:
+    python stable_price.py --index nifty100 --window 35 --max-move 5
+"""
+
+import argparse
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from price_store import load_panel
+from symbol_master import get_symbol_master
+
+# Default universe when no index is given
+NSE_STOCKS = [
+    "ABB.NS",
+    "ACC.NS",
+    "APLAPOLLO.NS",
+    "AUBANK.NS",
+    "ADANIENSOL.NS",
+    "ADANIENT.NS",
+    "ADANIGREEN.NS",
+    "ADANIPORTS.NS",
+    "ADANIPOWER.NS",
+    "ATGL.NS",
+    "ABCAPITAL.NS",
+    "ABFRL.NS",
+    "ALKEM.NS",
+    "AMBUJACEM.NS",
+    "APOLLOHOSP.NS",
+    "APOLLOTYRE.NS",
+    "ASHOKLEY.NS",
+    "ASIANPAINT.NS",
+    "ASTRAL.NS",
+    "AUROPHARMA.NS",
+    "DMART.NS",
+    "AXISBANK.NS",
+    "BSE.NS",
+    "BAJAJ-AUTO.NS",
+    "BAJFINANCE.NS",
+    "BAJAJFINSV.NS",
+    "BAJAJHLDNG.NS",
+    "BALKRISIND.NS",
+    "BANDHANBNK.NS",
+    "BANKBARODA.NS",
+    "BANKINDIA.NS",
+    "MAHABANK.NS",
+    "BDL.NS",
+    "BEL.NS",
+    "BHARATFORG.NS",
+    "BHEL.NS",
+    "BPCL.NS",
+    "BHARTIARTL.NS",
+    "BHARTIHEXA.NS",
+    "BIOCON.NS",
+    "BOSCHLTD.NS",
+    "BRITANNIA.NS",
+    "CGPOWER.NS",
+    "CANBK.NS",
+    "CHOLAFIN.NS",
+    "CIPLA.NS",
+    "COALINDIA.NS",
+    "COCHINSHIP.NS",
+    "COFORGE.NS",
+    "COLPAL.NS",
+    "CONCOR.NS",
+    "CUMMINSIND.NS",
+    "DLF.NS",
+    "DABUR.NS",
+    "DELHIVERY.NS",
+    "DIVISLAB.NS",
+    "DIXON.NS",
+    "DRREDDY.NS",
+    "EICHERMOT.NS",
+    "ESCORTS.NS",
+    "EXIDEIND.NS",
+    "NYKAA.NS",
+    "FEDERALBNK.NS",
+    "FACT.NS",
+    "GAIL.NS",
+    "GMRAIRPORT.NS",
+    "GODREJCP.NS",
+    "GODREJPROP.NS",
+    "GRASIM.NS",
+    "HCLTECH.NS",
+    "HDFCAMC.NS",
+    "HDFCBANK.NS",
+    "HDFCLIFE.NS",
+    "HAVELLS.NS",
+    "HEROMOTOCO.NS",
+    "HINDALCO.NS",
+    "HAL.NS",
+    "HINDPETRO.NS",
+    "HINDUNILVR.NS",
+    "HINDZINC.NS",
+    "HUDCO.NS",
+    "ICICIBANK.NS",
+    "ICICIGI.NS",
+    "ICICIPRULI.NS",
+    "IDBI.NS",
+    "IDFCFIRSTB.NS",
+    "IRB.NS",
+    "ITC.NS",
+    "INDIANB.NS",
+    "INDHOTEL.NS",
+    "IOC.NS",
+    "IOB.NS",
+    "IRCTC.NS",
+    "IRFC.NS",
+    "IREDA.NS",
+    "IGL.NS",
+    "INDUSTOWER.NS",
+    "INDUSINDBK.NS",
+    "NAUKRI.NS",
+    "INFY.NS",
+    "INDIGO.NS",
+    "JSWENERGY.NS",
+    "JSWINFRA.NS",
+    "JSWSTEEL.NS",
+    "JINDALSTEL.NS",
+    "JIOFIN.NS",
+    "JUBLFOOD.NS",
+    "KPITTECH.NS",
+    "KALYANKJIL.NS",
+    "KOTAKBANK.NS",
+    "LTF.NS",
+    "LICHSGFIN.NS",
+    "LTIM.NS",
+    "LT.NS",
+    "LICI.NS",
+    "LUPIN.NS",
+    "MRF.NS",
+    "LODHA.NS",
+    "M&MFIN.NS",
+    "M&M.NS",
+    "MRPL.NS",
+    "MANKIND.NS",
+    "MARICO.NS",
+    "MARUTI.NS",
+    "MFSL.NS",
+    "MAXHEALTH.NS",
+    "MAZDOCK.NS",
+    "MPHASIS.NS",
+    "MUTHOOTFIN.NS",
+    "NHPC.NS",
+    "NLCINDIA.NS",
+    "NMDC.NS",
+    "NTPC.NS",
+    "NESTLEIND.NS",
+    "OBEROIRLTY.NS",
+    "ONGC.NS",
+    "OIL.NS",
+    "PAYTM.NS",
+    "OFSS.NS",
+    "POLICYBZR.NS",
+    "PIIND.NS",
+    "PAGEIND.NS",
+    "PATANJALI.NS",
+    "PERSISTENT.NS",
+    "PETRONET.NS",
+    "PHOENIXLTD.NS",
+    "PIDILITIND.NS",
+    "POLYCAB.NS",
+    "POONAWALLA.NS",
+    "PFC.NS",
+    "POWERGRID.NS",
+    "PRESTIGE.NS",
+    "PNB.NS",
+    "RECLTD.NS",
+    "RVNL.NS",
+    "RELIANCE.NS",
+    "SBICARD.NS",
+    "SBILIFE.NS",
+    "SJVN.NS",
+    "SRF.NS",
+    "MOTHERSON.NS",
+    "SHREECEM.NS",
+    "SHRIRAMFIN.NS",
+    "SIEMENS.NS",
+    "SOLARINDS.NS",
+    "SONACOMS.NS",
+    "SBIN.NS",
+    "SAIL.NS",
+    "SUNPHARMA.NS",
+    "SUNDARMFIN.NS",
+    "SUPREMEIND.NS",
+    "SUZLON.NS",
+    "TVSMOTOR.NS",
+    "TATACHEM.NS",
+    "TATACOMM.NS",
+    "TCS.NS",
+    "TATACONSUM.NS",
+    "TATAELXSI.NS",
+    "TATAMOTORS.NS",
+    "TATAPOWER.NS",
+    "TATASTEEL.NS",
+    "TATATECH.NS",
+    "TECHM.NS",
+    "TITAN.NS",
+    "TORNTPHARM.NS",
+    "TORNTPOWER.NS",
+    "TRENT.NS",
+    "TIINDIA.NS",
+    "UPL.NS",
+    "ULTRACEMCO.NS",
+    "UNIONBANK.NS",
+    "UNITDSPR.NS",
+    "VBL.NS",
+    "VEDL.NS",
+    "IDEA.NS",
+    "VOLTAS.NS",
+    "WIPRO.NS",
+    "YESBANK.NS",
+    "ZOMATO.NS",
+    "ZYDUSLIFE.NS",
+]
+
+
+def daily_moves(close):
+    """(symbols, bars) absolute close-to-close change in percent."""
+    moves = np.full(close.shape, np.nan)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        moves[:, 1:] = np.abs(close[:, 1:] / close[:, :-1] - 1) * 100
+    return moves
+
+
+def stability_statistics(panel, window=35, max_move=5, max_avg_move=None):
+    """
+    Largest and average daily move of every symbol over its last bars.
+
+    Symbols with fewer than ``window`` moves are reported but never marked
+    stable, so recent listings do not pass on too little history.
+
+    Args:
+        panel (PricePanel): Daily bars of the universe
+        window (int): Number of latest daily moves considered
+        max_move (float): Largest allowed single-day move in percent
+        max_avg_move (float): Optional cap on the average daily move
+
+    Returns:
+        pandas.DataFrame: max_change, avg_daily_change, moves and is_stable
+            per symbol, indexed by symbol
+    """
+    moves = daily_moves(panel.close)[:, -window:]
+    count = np.count_nonzero(~np.isnan(moves), axis=1)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        max_change = np.nanmax(moves, axis=1)
+        avg_change = np.nanmean(moves, axis=1)
+
+    is_stable = (count >= window) & (max_change <= max_move)
+    if max_avg_move is not None:
+        is_stable &= avg_change <= max_avg_move
+
+    return pd.DataFrame(
+        {
+            "max_change": max_change,
+            "avg_daily_change": avg_change,
+            "moves": count,
+            "is_stable": is_stable,
+        },
+        index=pd.Index(panel.symbols, name="symbol"),
+    )
+
+
+def find_stable_stocks(
+    symbols, window=35, max_move=5, max_avg_move=None, update=True
+):
+    """
+    Stability statistics of many symbols loaded from the price store.
+
+    Args:
+        symbols (list): Ticker symbols (e.g. 'INFY.NS')
+        window (int): Number of latest daily moves considered
+        max_move (float): Largest allowed single-day move in percent
+        max_avg_move (float): Optional cap on the average daily move
+        update (bool): Refresh stale symbols from yfinance first
+
+    Returns:
+        pandas.DataFrame: Statistics of the stable symbols, calmest first
+    """
+    panel = load_panel(symbols, update=update)
+    stats = stability_statistics(panel, window, max_move, max_avg_move)
+    return stats[stats["is_stable"]].sort_values("max_change")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Find stocks that have not moved sharply on any day"
+    )
+    parser.add_argument(
+        "--index", help="Index from nifty_indices.json (default: built-in list)"
+    )
+    parser.add_argument(
+        "--window", type=int, default=35, help="Trading days to check"
+    )
+    parser.add_argument(
+        "--max-move",
+        type=float,
+        default=5,
+        help="Largest allowed daily move in %% (default: 5)",
+    )
+    parser.add_argument(
+        "--max-avg-move",
+        type=float,
+        help="Largest allowed average daily move in %%",
+    )
+    parser.add_argument(
+        "--no-update",
+        action="store_true",
+        help="Use stored bars without refreshing them",
+    )
+    args = parser.parse_args()
+
+    symbols = NSE_STOCKS
+    if args.index:
+        symbols = get_symbol_master().index_symbols(args.index, ".NS")
+
+    stable = find_stable_stocks(
+        symbols,
+        window=args.window,
+        max_move=args.max_move,
+        max_avg_move=args.max_avg_move,
+        update=not args.no_update,
+    )
+    print(
+        f"Stocks that haven't moved more than {args.max_move}% in any single "
+        f"day over the last {args.window} days:"
+    )
+    for symbol, row in stable.iterrows():
+        print(
+            f"{symbol}: max {row['max_change']:.2f}%, "
+            f"avg {row['avg_daily_change']:.2f}%"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+"""
+In-memory symbol master shared by every page and command line tool.
+
+Index membership (``data/nifty_indices.json``) and F&O underlying metadata
+(``data/fno_underlyings.json``) are parsed once per process into lookup
+tables. Underlyings come from NSE's underlying-information API and their
+lot sizes from the market lots file in the NSE archives. Each access checks
+the files' modification times and reloads only when one has changed, so a
+refreshed file is picked up without restarting.
+
+Usage:
+    python symbol_master.py --refresh-futures
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import threading
+
+import requests
+
+from nifty_symbols_csv import ARCHIVES_URL, HEADERS
+
+INDICES_FILE = "data/nifty_indices.json"
+FUTURES_FILE = "data/fno_underlyings.json"
+
+# Market lot of every F&O underlying for the current and next expiries
+LOT_SIZES_URL = f"{ARCHIVES_URL}/content/fo/fo_mktlots.csv"
+
+# Keys NSE has used for the contract size of an underlying
+LOT_SIZE_KEYS = ("lotSize", "marketLot", "lot_size")
+
+
+def base_symbol(symbol):
+    """Strip the exchange suffix from a ticker (e.g. 'INFY.NS' -> 'INFY')."""
+    symbol = symbol.upper()
+    return symbol[:-3] if symbol.endswith(".NS") else symbol
+
+
+def _mtime(path):
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+
+def _load_json(path, default):
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except Exception as e:
+        if os.path.exists(path):
+            print(f"Error loading {path}: {str(e)}")
+        return default
+
+
+class SymbolMaster:
+    """Index membership and futures metadata with O(1) lookups."""
+
+    def __init__(self, indices_file=INDICES_FILE, futures_file=FUTURES_FILE):
+        self.indices_file = indices_file
+        self.futures_file = futures_file
+        self._lock = threading.Lock()
+        self._mtimes = None
+        self._index_symbols = {}
+        self._index_sets = {}
+        self._symbol_indices = {}
+        self._futures = {}
+
+    def _refresh(self):
+        mtimes = (_mtime(self.indices_file), _mtime(self.futures_file))
+        if mtimes == self._mtimes:
+            return
+
+        with self._lock:
+            if mtimes == self._mtimes:
+                return
+
+            indices = _load_json(self.indices_file, {})
+            symbol_indices = {}
+            for index_name, symbols in indices.items():
+                for symbol in symbols:
+                    symbol_indices.setdefault(symbol, []).append(index_name)
+
+            futures = {}
+            for entry in _load_json(self.futures_file, []):
+                lot_size = next(
+                    (entry[k] for k in LOT_SIZE_KEYS if entry.get(k)), None
+                )
+                futures[entry["symbol"]] = {
+                    "underlying": entry.get("underlying"),
+                    "lot_size": int(lot_size) if lot_size else None,
+                }
+
+            self._index_symbols = indices
+            self._index_sets = {k: set(v) for k, v in indices.items()}
+            self._symbol_indices = symbol_indices
+            self._futures = futures
+            self._mtimes = mtimes
+
+    @property
+    def index_names(self):
+        """Names of all stored indices (e.g. 'nifty50')."""
+        self._refresh()
+        return list(self._index_symbols)
+
+    def index_options(self):
+        """Display name -> index name, e.g. {'NIFTY 50': 'nifty50'}."""
+        return {k.upper().replace("_", " "): k for k in self.index_names}
+
+    def index_symbols(self, index_name, suffix=""):
+        """
+        Constituents of an index.
+
+        Args:
+            index_name (str): Index name (e.g. 'nifty100')
+            suffix (str): Suffix added to every symbol (e.g. '.NS')
+
+        Returns:
+            list: Symbols in index order, empty if the index is unknown
+        """
+        self._refresh()
+        symbols = self._index_symbols.get(index_name.lower(), [])
+        return [symbol + suffix for symbol in symbols]
+
+    def indices_of(self, symbol):
+        """Indices containing a symbol, with or without the '.NS' suffix."""
+        self._refresh()
+        return list(self._symbol_indices.get(base_symbol(symbol), []))
+
+    def is_member(self, symbol, index_name):
+        """Whether a symbol belongs to an index."""
+        self._refresh()
+        members = self._index_sets.get(index_name.lower(), ())
+        return base_symbol(symbol) in members
+
+    def futures_info(self, symbol):
+        """
+        F&O metadata of a symbol.
+
+        Returns:
+            dict: 'underlying' name and 'lot_size' (None when NSE did not
+                report one), or None if the symbol has no futures
+        """
+        self._refresh()
+        return self._futures.get(base_symbol(symbol))
+
+    def futures_symbols(self):
+        """All symbols with stock futures."""
+        self._refresh()
+        return list(self._futures)
+
+
+_master = None
+
+
+def get_symbol_master():
+    """Process-wide symbol master over the default data files."""
+    global _master
+    if _master is None:
+        _master = SymbolMaster()
+    return _master
+
+
+def parse_lot_sizes(content):
+    """
+    Current-month lot sizes from the NSE market lots CSV.
+
+    Rows are 'UNDERLYING, SYMBOL, <month>, <month>, ...' with padded cells
+    and repeated header rows between sections.
+
+    Returns:
+        dict: Symbol -> lot size of the nearest listed month
+    """
+    lot_sizes = {}
+    for row in csv.reader(io.StringIO(content.decode("utf-8"))):
+        cells = [cell.strip() for cell in row]
+        if len(cells) < 3 or not cells[1]:
+            continue
+        lot = next((cell for cell in cells[2:] if cell), "")
+        if lot.isdigit():
+            lot_sizes[cells[1].upper()] = int(lot)
+    return lot_sizes
+
+
+def fetch_lot_sizes(url=LOT_SIZES_URL, timeout=30):
+    """
+    Download the current lot size of every F&O underlying.
+
+    Returns:
+        dict: Symbol -> lot size, empty if the download failed
+    """
+    try:
+        response = requests.get(url, headers=HEADERS, timeout=timeout)
+        if response.status_code != 200:
+            print(f"Failed to download lot sizes: {response.status_code}")
+            return {}
+        return parse_lot_sizes(response.content)
+    except Exception as e:
+        print(f"Error downloading lot sizes: {e}")
+        return {}
+
+
+def save_futures_metadata(
+    underlying_info, futures_file=FUTURES_FILE, lot_sizes=None
+):
+    """
+    Store the stock list returned by ``NSEDataFetcher.get_underlying_info``.
+
+    Args:
+        underlying_info (dict): {'indices': [...], 'stocks': [...]}
+        futures_file (str): Destination JSON file
+        lot_sizes (dict): Symbol -> lot size, e.g. from ``fetch_lot_sizes``
+
+    Returns:
+        int: Number of stored underlyings
+    """
+    stocks = underlying_info.get("stocks", [])
+    if not stocks:
+        return 0
+    if lot_sizes:
+        stocks = [
+            dict(stock, lotSize=lot_sizes[stock["symbol"]])
+            if stock["symbol"] in lot_sizes
+            else stock
+            for stock in stocks
+        ]
+
+    os.makedirs(os.path.dirname(futures_file) or ".", exist_ok=True)
+    tmp_path = f"{futures_file}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(stocks, f, indent=4)
+    os.replace(tmp_path, futures_file)
+    return len(stocks)
+
+
+def refresh_futures_metadata(futures_file=FUTURES_FILE, underlying_info=None):
+    """
+    Download the F&O underlying list and lot sizes from NSE and store them.
+
+    Args:
+        futures_file (str): Destination JSON file
+        underlying_info (dict): Already fetched underlying list, fetched
+            from NSE when None
+
+    Returns:
+        int: Number of stored underlyings
+    """
+    if underlying_info is None:
+        from calendar_spread.nse_api import NSEDataFetcher
+
+        underlying_info = NSEDataFetcher().get_underlying_info()
+    return save_futures_metadata(
+        underlying_info, futures_file, fetch_lot_sizes()
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Inspect index membership and futures metadata"
+    )
+    parser.add_argument(
+        "--refresh-futures",
+        action="store_true",
+        help="Download the F&O underlying list from NSE first",
+    )
+    parser.add_argument("symbols", nargs="*", help="Symbols to look up")
+    args = parser.parse_args()
+
+    if args.refresh_futures:
+        count = refresh_futures_metadata()
+        print(f"Saved {count} F&O underlyings to {FUTURES_FILE}")
+
+    master = get_symbol_master()
+    if not args.symbols:
+        for index_name in master.index_names:
+            print(
+                f"{index_name}: {len(master.index_symbols(index_name))} symbols"
+            )
+        print(f"F&O underlyings: {len(master.futures_symbols())}")
+        return
+
+    for symbol in args.symbols:
+        info = master.futures_info(symbol) or {}
+        print(
+            f"{base_symbol(symbol)}: indices={', '.join(master.indices_of(symbol))}"
+            f" underlying={info.get('underlying')} lot_size={info.get('lot_size')}"
+        )
+
+
+if __name__ == "__main__":
+    main()
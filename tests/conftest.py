@@ -11,3 +11,11 @@ root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 # Add the root directory to Python path
 sys.path.insert(0, root_dir)
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--run-benchmarks",
+        action="store_true",
+        help="Run the 100- and 1000-symbol kernel benchmark tiers",
+    )
@@ -0,0 +1,184 @@
+"""
+Synthetic market data for tests and benchmarks.
+
+``futures_chain`` generates the monthly futures contracts of one symbol the
+way NSE reports them: every contract trades for three months up to its
+expiry on an exchange calendar with holidays, priced off a random-walk spot
+with cost of carry and occasional overnight gaps, and the illiquid far
+month misses some prints. ``ohlcv_frames`` generates daily bars with
+volume spikes and staggered listing dates. Everything is drawn from a
+seeded generator, so the same seed always gives the same data.
+"""
+
+from typing import Dict, NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from calendar_spread.expiry_calendar import ExpiryCalendar, format_expiry
+from calendar_spread.nse_api import FUTURES_SCHEMA
+
+HOLIDAYS_PER_YEAR = 15
+# A contract is listed three months before its expiry
+CONTRACT_MONTHS = 3
+# Annual cost of carry of futures over spot
+CARRY_RATE = 0.07
+# Share of far month days without a print
+FAR_MONTH_MISSING = 0.1
+
+
+class SyntheticCalendar(NamedTuple):
+    busdaycal: np.busdaycalendar
+    # Trading days, datetime64[D]
+    days: np.ndarray
+    expiry_calendar: ExpiryCalendar
+
+
+def exchange_calendar(
+    start_year: int = 2015, years: int = 5, seed: int = 0
+) -> SyntheticCalendar:
+    """
+    Weekday calendar with random holidays and its monthly expiries.
+
+    Expiries fall on the NSE weekday schedule and move to the previous
+    trading day when they hit a holiday, as they do on the exchange.
+    """
+    rng = np.random.default_rng(seed)
+    end_year = start_year + years - 1
+    weekdays = np.arange(
+        np.datetime64(f"{start_year}-01-01"),
+        np.datetime64(f"{end_year + 2}-01-01"),
+    )
+    weekdays = weekdays[np.is_busday(weekdays)]
+    holidays = rng.choice(
+        weekdays, size=HOLIDAYS_PER_YEAR * (years + 1), replace=False
+    )
+    busdaycal = np.busdaycalendar(weekmask="1111100", holidays=holidays)
+    days = weekdays[np.is_busday(weekdays, busdaycal=busdaycal)]
+    days = days[days < np.datetime64(f"{end_year + 1}-01-01")]
+    expiry_calendar = ExpiryCalendar(
+        start_year, end_year + 1, busdaycal=busdaycal
+    )
+    return SyntheticCalendar(busdaycal, days, expiry_calendar)
+
+
+def random_walk(
+    rng: np.random.Generator,
+    n: int,
+    start: float = 500.0,
+    volatility: float = 0.018,
+    gap_probability: float = 0.01,
+    gap_size: float = 0.06,
+) -> np.ndarray:
+    """Daily closes of a log random walk with occasional overnight gaps."""
+    returns = rng.normal(0.0003, volatility, n)
+    gaps = rng.random(n) < gap_probability
+    returns[gaps] += rng.choice([-gap_size, gap_size], gaps.sum())
+    returns[0] = 0.0
+    return start * np.exp(np.cumsum(returns))
+
+
+def futures_chain(
+    calendar: SyntheticCalendar, seed: int = 0
+) -> Dict[str, pd.DataFrame]:
+    """
+    Daily data of every contract of one symbol over the calendar's days.
+
+    Returns:
+        dict: Expiry (DD-Mon-YYYY) -> DataFrame with the columns and dtypes
+            of ``FUTURES_SCHEMA``, like a parsed NSE response
+    """
+    rng = np.random.default_rng(seed)
+    days = calendar.days
+    spot = random_walk(rng, len(days), start=rng.uniform(100, 3000))
+    lot_size = int(rng.choice([250, 500, 750, 1200, 3000]))
+
+    expiries = calendar.expiry_calendar.expiries
+    current = calendar.expiry_calendar.positions(days)
+    chain = {}
+    last = int(current[-1]) + CONTRACT_MONTHS - 1
+    for position in range(int(current[0]), last + 1):
+        expiry = expiries[position]
+        # Months to expiry: 0 current, 1 near, 2 far
+        months_out = position - current
+        traded = (months_out >= 0) & (months_out < CONTRACT_MONTHS)
+        far = months_out == CONTRACT_MONTHS - 1
+        traded &= ~(far & (rng.random(len(days)) < FAR_MONTH_MISSING))
+        if not traded.any():
+            continue
+
+        dates = days[traded]
+        to_expiry = (expiry - dates).astype(float) / 365
+        basis = rng.normal(0, 0.0005, len(dates))
+        close = spot[traded] * np.exp(CARRY_RATE * to_expiry + basis)
+        swing = np.abs(rng.normal(0, 0.008, len(dates))) * close
+        open_ = close * np.exp(rng.normal(0, 0.005, len(dates)))
+        liquidity = 0.3 ** months_out[traded]
+        volume = (
+            rng.lognormal(12, 0.5, len(dates)) * liquidity // lot_size
+        ) * lot_size
+        open_interest = (np.cumsum(volume) * 0.3 // lot_size) * lot_size
+
+        df = pd.DataFrame(
+            {
+                "Date": dates.astype("datetime64[ns]"),
+                "Expiry": format_expiry(expiry),
+                "Open": open_,
+                "High": np.maximum(open_, close) + swing,
+                "Low": np.minimum(open_, close) - swing,
+                "Close": close,
+                "Settlement Price": close,
+                "Volume": volume,
+                "Open Interest": open_interest,
+                "Change in OI": np.diff(open_interest, prepend=0),
+                "Lot Size": lot_size,
+            }
+        )
+        chain[format_expiry(expiry)] = df.astype(dict(FUTURES_SCHEMA.values()))
+    return chain
+
+
+def ohlcv_frame(
+    days: pd.DatetimeIndex,
+    seed: int = 0,
+    spike_probability: float = 0.03,
+) -> pd.DataFrame:
+    """Daily OHLCV bars indexed by date, with occasional volume spikes."""
+    rng = np.random.default_rng(seed)
+    n = len(days)
+    close = random_walk(rng, n, start=rng.uniform(50, 5000))
+    previous = np.concatenate([[close[0]], close[:-1]])
+    open_ = previous * np.exp(rng.normal(0, 0.006, n))
+    swing = np.abs(rng.normal(0, 0.01, n)) * close
+    volume = rng.lognormal(13, 0.4, n)
+    spikes = rng.random(n) < spike_probability
+    volume[spikes] *= rng.uniform(2, 6, spikes.sum())
+    return pd.DataFrame(
+        {
+            "Open": open_,
+            "High": np.maximum(open_, close) + swing,
+            "Low": np.minimum(open_, close) - swing,
+            "Close": close,
+            "Volume": volume.round(),
+        },
+        index=pd.DatetimeIndex(days, name="Date"),
+    )
+
+
+def ohlcv_frames(
+    n_symbols: int, years: int = 10, seed: int = 0
+) -> Dict[str, pd.DataFrame]:
+    """
+    Daily bars of many symbols over the same exchange calendar.
+
+    Every tenth symbol was listed partway through, so histories have
+    different lengths, as in a real index.
+    """
+    start_year = 2025 - years
+    days = pd.DatetimeIndex(exchange_calendar(start_year, years, seed).days)
+    rng = np.random.default_rng(seed)
+    frames = {}
+    for i in range(n_symbols):
+        listed = int(rng.integers(0, len(days) // 2)) if i % 10 == 9 else 0
+        frames[f"SYM{i:04d}"] = ohlcv_frame(days[listed:], seed + i)
+    return frames
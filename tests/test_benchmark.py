@@ -0,0 +1,56 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from calendar_spread import benchmark
+from calendar_spread.futures_cache import CACHE_DIR, FuturesCache
+from calendar_spread.nse_replay import RecordingStore, seed_from_cache
+
+
+def result(seconds, parse, peak):
+    return {
+        "seconds": seconds,
+        "peak_memory_bytes": peak,
+        "stages": {"parse": {"seconds": parse, "calls": 10}},
+    }
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_cold_and_warm_scan(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            recordings = RecordingStore(Path(tmp) / "recordings")
+            cache = FuturesCache(CACHE_DIR, track_reads=False)
+            seed_from_cache(recordings, cache, ["SBIN"])
+
+            report = benchmark.run_benchmark(
+                recordings,
+                modes=("cold", "warm"),
+                workdir=Path(tmp) / "work",
+            )
+
+        cold, warm = report["modes"]["cold"], report["modes"]["warm"]
+        self.assertEqual((cold["symbols"], cold["tables"]), (1, 1))
+        self.assertEqual(warm["rows"], cold["rows"])
+        for stage in ("fetch", "parse", "cache_write", "build", "backtest"):
+            self.assertGreater(cold["stages"][stage]["calls"], 0, stage)
+        # The warm scan serves everything from the caches
+        self.assertNotIn("fetch", warm["stages"])
+        self.assertNotIn("build", warm["stages"])
+        self.assertGreater(cold["peak_memory_bytes"], 0)
+        self.assertEqual(benchmark.workload_mismatch(report, report), [])
+
+    def test_compare_flags_regressions_above_noise(self):
+        baseline = {"modes": {"cold": result(10.0, 0.01, 50 * 1024**2)}}
+        report = {"modes": {"cold": result(13.0, 0.03, 51 * 1024**2)}}
+
+        rows = benchmark.compare(report, baseline, tolerance=0.25)
+
+        regressed = {row["metric"]: row["regressed"] for row in rows}
+        # parse tripled but by less than the noise floor
+        self.assertEqual(
+            regressed, {"total": True, "parse": False, "peak_memory": False}
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
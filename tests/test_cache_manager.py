@@ -0,0 +1,84 @@
+import json
+import tempfile
+import unittest
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+
+from calendar_spread import cache_manager
+from calendar_spread.futures_cache import FuturesCache
+from calendar_spread.nse_api import parse_futures_frame
+from tests.test_nse_api import PAYLOAD_ROW
+
+META = {"fetched_at": "2024-08-26T19:00:00+05:30", "final": True}
+
+
+class TestCacheManager(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = FuturesCache(Path(self.tmp.name))
+        self.df = parse_futures_frame(pd.DataFrame([PAYLOAD_ROW]))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_prune_by_retention_then_lru(self):
+        expiries = ["28-Mar-2024", "25-Apr-2024", "30-May-2024", "27-Jun-2024"]
+        for expiry in expiries:
+            self.cache.write("SBIN", expiry, self.df, META)
+        # Read the newest contracts in reverse order: May is read last
+        self.cache.stats.record_read("SBIN", "27-Jun-2024", True, now=1)
+        self.cache.stats.record_read("SBIN", "25-Apr-2024", True, now=2)
+        self.cache.stats.record_read("SBIN", "30-May-2024", True, now=3)
+        self.assertIsNone(self.cache.read("SBIN", "31-Jul-2024"))
+        size = self.cache.path("SBIN", "30-May-2024").stat().st_size
+
+        evicted = cache_manager.prune(
+            self.cache,
+            budget=size,
+            retention_months=3,
+            today=date(2024, 7, 15),
+        )
+
+        self.assertEqual(
+            [f.expiry for f in evicted],
+            ["28-Mar-2024", "27-Jun-2024", "25-Apr-2024"],
+        )
+        self.assertEqual(self.cache.expiries("SBIN"), ["30-May-2024"])
+        stats = cache_manager.report(self.cache)
+        self.assertEqual(stats["evictions"], 3)
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["bytes"], size)
+
+    def test_compact_legacy_file(self):
+        legacy = {
+            "29-Aug-2024": json.dumps([PAYLOAD_ROW]),
+            "26-Sep-2024": json.dumps([PAYLOAD_ROW]),
+            "_meta": {"29-Aug-2024": META},
+        }
+        self.cache.legacy_path("INFY").write_text(json.dumps(legacy))
+        # An expiry file written after the legacy one takes precedence
+        newer = dict(META, final=False)
+        self.cache.write("INFY", "26-Sep-2024", self.df, newer)
+
+        totals = cache_manager.compact(self.cache)
+
+        self.assertLess(totals["after"], totals["before"])
+        self.assertFalse(self.cache.legacy_path("INFY").exists())
+        entry = self.cache.read("INFY", "29-Aug-2024")
+        self.assertEqual(entry.meta, META)
+        self.assertEqual(list(entry.data.columns), list(self.df.columns))
+        self.assertEqual(self.cache.read("INFY", "26-Sep-2024").meta, newer)
+        self.assertEqual(cache_manager.report(self.cache)["legacy_files"], 0)
+
+    def test_parse_size(self):
+        self.assertEqual(cache_manager.parse_size("200MB"), 200 * 1024**2)
+        self.assertEqual(cache_manager.parse_size("1.5gb"), 1536 * 1024**2)
+        self.assertEqual(cache_manager.parse_size("4096"), 4096)
+        with self.assertRaises(ValueError):
+            cache_manager.parse_size("lots")
+
+
+if __name__ == "__main__":
+    unittest.main()
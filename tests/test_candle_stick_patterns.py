@@ -0,0 +1,62 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from candle_stick_patterns import (
+    PATTERNS,
+    CandleFeatures,
+    detect_patterns_in_frame,
+    detect_patterns_panel,
+)
+
+
+def make_frame(rows, start="2024-01-01"):
+    index = pd.date_range(start, periods=len(rows), freq="B")
+    return pd.DataFrame(
+        rows, columns=["Open", "High", "Low", "Close"], index=index
+    )
+
+
+def random_frame(n_bars, seed):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1.5, n_bars))
+    open = close + rng.normal(0, 1.2, n_bars)
+    high = np.maximum(open, close) + np.abs(rng.normal(0, 1, n_bars))
+    low = np.minimum(open, close) - np.abs(rng.normal(0, 1, n_bars))
+    return make_frame(np.column_stack([open, high, low, close]))
+
+
+class TestCandleStickPatterns(unittest.TestCase):
+    def test_registry_contains_all_patterns(self):
+        self.assertEqual(len(PATTERNS), 15)
+        self.assertEqual(PATTERNS["Bullish Engulfing"].direction, 1)
+        self.assertEqual(PATTERNS["Evening Star"].bars, 3)
+
+    def test_shifted_views_pad_missing_history(self):
+        features = CandleFeatures([1, 2, 3], [2, 3, 4], [0, 1, 2], [2, 3, 4])
+        self.assertTrue(np.isnan(features.bar(1).close[0]))
+        self.assertEqual(features.bar(1).close[1:].tolist(), [2, 3])
+        self.assertEqual(features.bar(2).close[2], 2)
+
+    def test_hammer_and_bullish_engulfing(self):
+        df = make_frame(
+            [
+                [100, 101, 94, 99],  # small bearish candle
+                [98.5, 102, 98, 101.5],  # engulfs the previous body
+                [100, 100.5, 95, 100.4],  # long lower shadow, small body
+            ]
+        )
+        patterns = detect_patterns_in_frame(df)
+
+        self.assertEqual(patterns["Bullish Engulfing"], [df.index[1]])
+        self.assertEqual(patterns["Hammer"], [df.index[2]])
+
+    def test_panel_matches_single_symbol_detection(self):
+        frames = {f"S{i}.NS": random_frame(30 + 11 * i, i) for i in range(5)}
+        panel_results = detect_patterns_panel(frames)
+
+        for symbol, df in frames.items():
+            self.assertEqual(
+                panel_results[symbol], detect_patterns_in_frame(df)
+            )
@@ -0,0 +1,112 @@
+import tempfile
+import unittest
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+from calendar_spread.continuous_store import ContinuousStore
+from calendar_spread.expiry_calendar import ExpiryCalendar, format_expiry
+from calendar_spread.futures_data import build_continuous_table
+from calendar_spread.market_calendar import IST, trading_days
+
+
+class FakeFetcher:
+    """Serves synthetic contracts up to ``today`` and counts requests."""
+
+    def __init__(self, calendar):
+        days = trading_days(date(2024, 1, 1), date(2024, 6, 28))
+        self.contracts = {}
+        for month, expiry in enumerate(calendar.expiries[:8]):
+            traded = days[days <= expiry]
+            self.contracts[format_expiry(expiry)] = pd.DataFrame(
+                {
+                    "Date": pd.to_datetime(traded),
+                    "Close": 100.0 + month + np.arange(len(traded)) / 10,
+                }
+            )
+        self.today = None
+        self.requested = []
+
+    @property
+    def requests(self):
+        return len(self.requested)
+
+    def get_futures_data(self, symbol, from_date, to_date, expiry, use_cache):
+        self.requested.append(expiry)
+        df = self.contracts.get(expiry)
+        if df is None:
+            return None
+        return df[df["Date"] <= pd.Timestamp(self.today)]
+
+
+class TestContinuousStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.calendar = ExpiryCalendar(2024, 2025)
+        self.fetcher = FakeFetcher(self.calendar)
+        self.store = ContinuousStore(
+            self.tmp.name, self.fetcher, self.calendar, lookback_days=200
+        )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def scan(self, day):
+        self.fetcher.today = day
+        now = datetime(day.year, day.month, day.day, 19, 0, tzinfo=IST)
+        return self.store.update("SBIN", now=now)
+
+    def test_update_appends_new_days(self):
+        first = self.scan(date(2024, 3, 20))
+        # Drop the far month's print on the stored day: the fill must carry
+        # over from the stored row into the appended ones
+        apr = self.fetcher.contracts["25-Apr-2024"]
+        self.fetcher.contracts["25-Apr-2024"] = apr[
+            ~apr["Date"].isin(pd.to_datetime(["2024-03-21", "2024-03-22"]))
+        ]
+        self.fetcher.requested = []
+        updated = self.scan(date(2024, 4, 5))
+
+        # Only the contracts trading since 20-Mar, not the whole window
+        self.assertEqual(
+            self.fetcher.requested,
+            ["28-Mar-2024", "25-Apr-2024", "30-May-2024", "27-Jun-2024"],
+        )
+        pd.testing.assert_frame_equal(updated.iloc[: len(first)], first)
+        full = build_continuous_table(
+            {
+                expiry: df[df["Date"] <= "2024-04-05"]
+                for expiry, df in self.fetcher.contracts.items()
+            },
+            self.calendar,
+        )
+        pd.testing.assert_frame_equal(updated, full)
+        self.assertEqual(
+            self.store.load("SBIN")["Date"].iloc[-1], date(2024, 4, 5)
+        )
+
+    def test_update_keeps_lookback_window(self):
+        store = ContinuousStore(
+            f"{self.tmp.name}/short", self.fetcher, self.calendar, 40
+        )
+        for day in (date(2024, 3, 20), date(2024, 4, 5), date(2024, 4, 19)):
+            self.fetcher.today = day
+            now = datetime(day.year, day.month, day.day, 19, 0, tzinfo=IST)
+            updated = store.update("SBIN", now=now)
+
+        self.assertEqual(updated["Date"].iloc[0], date(2024, 3, 11))
+        rebuilt = ContinuousStore(
+            f"{self.tmp.name}/rebuilt", self.fetcher, self.calendar, 40
+        ).build("SBIN", now=now)
+        pd.testing.assert_frame_equal(updated, rebuilt)
+
+    def test_up_to_date_table_skips_fetch(self):
+        self.scan(date(2024, 3, 20))
+        requests = self.fetcher.requests
+        self.scan(date(2024, 3, 20))
+        self.assertEqual(self.fetcher.requests, requests)
+
+
+if __name__ == "__main__":
+    unittest.main()
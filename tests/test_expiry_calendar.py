@@ -0,0 +1,82 @@
+import unittest
+import warnings
+from datetime import date
+
+import numpy as np
+
+from calendar_spread.expiry_calendar import (
+    THURSDAY,
+    ExpiryCalendar,
+    format_expiries,
+    monthly_expiries,
+)
+from calendar_spread.market_calendar import LAST_HOLIDAY_YEAR
+
+
+class TestExpiryCalendar(unittest.TestCase):
+    def setUp(self):
+        self.calendar = ExpiryCalendar(2024, 2026)
+
+    def test_weekday_schedule_and_holidays(self):
+        expiries = format_expiries(
+            self.calendar.expiries_between(date(2025, 7, 1), date(2025, 10, 31))
+        )
+        # Last Thursday until August 2025, last Tuesday afterwards
+        self.assertEqual(
+            expiries,
+            ["31-Jul-2025", "28-Aug-2025", "30-Sep-2025", "28-Oct-2025"],
+        )
+        # 24-Nov-2026 is a holiday, so the contract expires a day early
+        self.assertEqual(
+            self.calendar.current_expiry(date(2026, 11, 2)), date(2026, 11, 23)
+        )
+
+    def test_nse_calendar_starts_with_listed_holidays(self):
+        # Expiries of 2023 would miss holidays such as 30-Mar-2023
+        with self.assertRaises(ValueError):
+            ExpiryCalendar(2023, 2024)
+        holidays = np.busdaycalendar(holidays=["2023-03-30"])
+        expiries = ExpiryCalendar(2023, 2023, busdaycal=holidays).expiries
+        self.assertEqual(expiries[2], np.datetime64("2023-03-29"))
+
+    def test_warns_about_incompletely_listed_years(self):
+        with self.assertWarns(UserWarning):
+            calendar = ExpiryCalendar(2026, 2028)
+        # Republic Day falls on the last Tuesday of January 2027
+        self.assertEqual(
+            calendar.current_expiry(date(2027, 1, 4)), date(2027, 1, 25)
+        )
+        with warnings.catch_warnings(record=True):
+            warnings.simplefilter("always")
+            last = ExpiryCalendar().expiries[-1].astype(date)
+        self.assertEqual(
+            last.year, max(LAST_HOLIDAY_YEAR, date.today().year + 1)
+        )
+
+    def test_configurable_weekday(self):
+        holidays = np.busdaycalendar(holidays=["2025-10-30"])
+        expiries = monthly_expiries(2025, 2025, THURSDAY, holidays)
+        self.assertEqual(expiries[9], np.datetime64("2025-10-29"))
+
+    def test_lookups_match_scalar_and_vectorized(self):
+        self.assertEqual(
+            self.calendar.current_expiry(date(2025, 1, 30)), date(2025, 1, 30)
+        )
+        self.assertEqual(
+            self.calendar.current_expiry(date(2025, 1, 31)), date(2025, 2, 27)
+        )
+        self.assertEqual(
+            self.calendar.next_expiry(date(2025, 1, 30)), date(2025, 2, 27)
+        )
+
+        days = np.arange("2024-01-01", "2026-06-01", dtype="datetime64[D]")
+        far = self.calendar.expiries_for(days, 2)
+        for day, expiry in zip(days[::37], far[::37]):
+            self.assertEqual(
+                self.calendar.upcoming(day, 3)[-1], expiry.astype(date)
+            )
+        self.assertTrue((far >= days).all())
+
+
+if __name__ == "__main__":
+    unittest.main()
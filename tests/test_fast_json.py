@@ -0,0 +1,31 @@
+import json
+import unittest
+
+import numpy as np
+
+from calendar_spread import fast_json
+
+
+class TestFastJson(unittest.TestCase):
+    def test_record_columns(self):
+        body = json.dumps(
+            {"data": [{"A": "1", "B": "x"}, {"A": "2,000", "B": "y"}]}
+        ).encode()
+        rows = fast_json.loads(body)["data"]
+        columns = fast_json.record_columns(rows, ["A", "C"])
+        self.assertEqual(columns, {"A": ["1", "2,000"]})
+        self.assertEqual(fast_json.record_columns([], ["A"]), {})
+
+    def test_parse_numbers(self):
+        np.testing.assert_array_equal(
+            fast_json.parse_numbers(["30,543,750", "-18513000.00", 816.5]),
+            [30543750.0, -18513000.0, 816.5],
+        )
+        parsed = fast_json.parse_numbers(["1,000", "-", None, ""])
+        self.assertEqual(parsed[0], 1000.0)
+        self.assertTrue(np.isnan(parsed[1:]).all())
+        self.assertEqual(len(fast_json.parse_numbers([])), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
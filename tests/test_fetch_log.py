@@ -0,0 +1,146 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from calendar_spread.fetch_log import FetchLog, retry_failed_fetches
+from calendar_spread.http_cache import ResponseCache
+from calendar_spread.nse_api import NSEDataFetcher
+from tests.test_http_cache import json_response
+
+ROW = {
+    "FH_TIMESTAMP": "02-Jan-2025",
+    "FH_OPENING_PRICE": "100",
+    "FH_TRADE_HIGH_PRICE": "105",
+    "FH_TRADE_LOW_PRICE": "99",
+    "FH_CLOSING_PRICE": "104",
+    "FH_TOT_TRADED_QTY": "1,000",
+    "FH_OPEN_INT": "5,000",
+    "FH_SETTLE_PRICE": "104",
+}
+
+
+class StubFetcher(NSEDataFetcher):
+    """Fetcher answering requests from a list of canned responses."""
+
+    def __init__(self, tmp, responses):
+        cache_path = Path(tmp) / "http.sqlite"
+        super().__init__(ResponseCache(cache_path), FetchLog(cache_path))
+        self.CACHE_DIR = Path(tmp)
+        self.responses = responses
+        self.requests = 0
+
+    def _get(self, url, headers):
+        self.requests += 1
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+class TestFetchLog(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.log = FetchLog(Path(self.tmp.name) / "log.sqlite")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_negative_entries_expire(self):
+        self.log.mark_empty("NEWCO", "30-Jan-2025", now=1000)
+        self.assertTrue(
+            self.log.is_known_empty("NEWCO", "30-Jan-2025", now=1500)
+        )
+        self.assertFalse(
+            self.log.is_known_empty("NEWCO", "30-Jan-2025", ttl=100, now=1500)
+        )
+
+    def test_failures_back_off_until_due(self):
+        args = ("SBIN", "01-01-2025", "31-01-2025", "30-Jan-2025", "timeout")
+        self.assertEqual(self.log.record_failure(*args, now=0), 1)
+        self.assertEqual(self.log.record_failure(*args, now=0), 2)
+
+        self.assertEqual(self.log.pending(now=0), [])
+        due = self.log.pending(now=24 * 60 * 60)
+        self.assertEqual(due[0]["attempts"], 2)
+        self.assertEqual(due[0]["error"], "timeout")
+
+    def test_fetcher_skips_empty_and_retries_only_failures(self):
+        fetcher = StubFetcher(
+            self.tmp.name,
+            [
+                json_response({"error": "no data"}),
+                ConnectionError("reset"),
+                json_response({"data": [ROW]}),
+            ],
+        )
+        args = ("01-01-2025", "31-01-2025", "30-Jan-2025")
+
+        self.assertIsNone(fetcher.get_futures_data("NEWCO", *args))
+        self.assertIsNone(fetcher.get_futures_data("NEWCO", *args))
+        self.assertIsNone(fetcher.get_futures_data("SBIN", *args))
+        self.assertEqual(fetcher.requests, 2)
+
+        pending = fetcher.fetch_log.pending(now=float("inf"))
+        self.assertEqual([item["symbol"] for item in pending], ["SBIN"])
+
+        counts = retry_failed_fetches(fetcher, now=float("inf"))
+
+        self.assertEqual(
+            counts, {"fetched": 1, "empty": 0, "failed": 0, "cached": 0}
+        )
+        self.assertEqual(fetcher.requests, 3)
+        self.assertEqual(fetcher.fetch_log.pending(now=float("inf")), [])
+
+    def test_empty_payload_is_not_cached(self):
+        fetcher = StubFetcher(
+            self.tmp.name,
+            [json_response({"data": []}), json_response({"data": [ROW]})],
+        )
+        args = ("01-01-2025", "31-01-2025", "30-Jan-2025")
+
+        self.assertTrue(fetcher.get_futures_data("NEWCO", *args).empty)
+        self.assertIsNone(fetcher.futures_cache.read("NEWCO", "30-Jan-2025"))
+        self.assertIsNone(fetcher.get_futures_data("NEWCO", *args))
+        self.assertEqual(fetcher.requests, 1)
+
+        # Once the negative entry expires the expiry is requested again
+        fetcher.fetch_log.mark_empty("NEWCO", "30-Jan-2025", now=0)
+        self.assertEqual(len(fetcher.get_futures_data("NEWCO", *args)), 1)
+        self.assertEqual(fetcher.requests, 2)
+
+    def test_retry_refetches_stale_cache_of_live_contract(self):
+        fetcher = StubFetcher(
+            self.tmp.name,
+            [
+                json_response({"data": [ROW]}),
+                ConnectionError("503"),
+                ConnectionError("503"),
+                json_response({"data": [ROW]}),
+            ],
+        )
+        expiry = "30-Dec-2099"
+        args = ("01-01-2025", "31-01-2025", expiry)
+        fetcher.get_futures_data("SBIN", *args)
+        # Fetched long ago and not final, so the live contract is stale
+        entry = fetcher.futures_cache.read("SBIN", expiry)
+        meta = {"fetched_at": "2025-01-02T16:00:00+05:30", "final": False}
+        fetcher.futures_cache.write("SBIN", expiry, entry.data, meta)
+        fetcher.fetch_log.record_failure("SBIN", *args, "503", now=0)
+
+        for requests, attempts in ((2, 2), (3, 3)):
+            counts = retry_failed_fetches(fetcher, now=float("inf"))
+            self.assertEqual(counts["fetched"], 0)
+            self.assertEqual(counts["failed"], 1)
+            self.assertEqual(fetcher.requests, requests)
+            self.assertEqual(
+                fetcher.fetch_log.attempts("SBIN", expiry), attempts
+            )
+
+        counts = retry_failed_fetches(fetcher, now=float("inf"))
+        self.assertEqual(counts["fetched"], 1)
+        self.assertEqual(fetcher.requests, 4)
+        self.assertIsNone(fetcher.fetch_log.attempts("SBIN", expiry))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import json
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from calendar_spread.futures_cache import STATS_FILE, CacheStats, FuturesCache
+from calendar_spread.nse_api import parse_futures_frame
+from tests.test_fetch_log import StubFetcher
+from tests.test_nse_api import PAYLOAD_ROW
+
+META = {"fetched_at": "2024-08-26T19:00:00+05:30", "final": False}
+
+
+class TestFuturesCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = FuturesCache(Path(self.tmp.name))
+        self.df = parse_futures_frame(pd.DataFrame([PAYLOAD_ROW]))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_new_expiry_leaves_others_untouched(self):
+        first = self.cache.write("SBIN", "29-Aug-2024", self.df, META)
+        before = first.stat()
+        self.cache.write("SBIN", "26-Sep-2024", self.df, META)
+
+        self.assertEqual(first.stat().st_mtime_ns, before.st_mtime_ns)
+        self.assertEqual(first.stat().st_ino, before.st_ino)
+        entry = self.cache.read("SBIN", "29-Aug-2024")
+        self.assertEqual(entry.meta, META)
+        pd.testing.assert_frame_equal(parse_futures_frame(entry.data), self.df)
+        self.assertEqual(
+            self.cache.expiries("SBIN"), ["29-Aug-2024", "26-Sep-2024"]
+        )
+        self.assertIsNone(self.cache.read("SBIN", "31-Oct-2024"))
+
+    def test_legacy_file_fallback(self):
+        legacy = {
+            "29-Aug-2024": json.dumps([PAYLOAD_ROW]),
+            "_meta": {"29-Aug-2024": META},
+        }
+        self.cache.legacy_path("INFY").write_text(json.dumps(legacy))
+
+        entry = self.cache.read("INFY", "29-Aug-2024")
+        self.assertEqual(entry.meta, META)
+        pd.testing.assert_frame_equal(parse_futures_frame(entry.data), self.df)
+
+        final = dict(META, final=True)
+        self.cache.write("INFY", "29-Aug-2024", self.df, final)
+        self.assertEqual(self.cache.read("INFY", "29-Aug-2024").meta, final)
+        self.assertEqual(self.cache.expiries("INFY"), ["29-Aug-2024"])
+        self.assertEqual(self.cache.symbols(), ["INFY"])
+
+    def test_concurrent_writes(self):
+        expiries = [f"{day:02d}-Aug-2024" for day in range(1, 25)]
+
+        def write(i):
+            expiry = expiries[i % len(expiries)]
+            return self.cache.write("SBIN", expiry, self.df, META)
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(write, range(96)))
+
+        self.assertEqual(self.cache.expiries("SBIN"), expiries)
+        for expiry in expiries:
+            self.assertEqual(len(self.cache.read("SBIN", expiry).data), 1)
+        leftovers = list(self.cache.symbol_dir("SBIN").glob("*.tmp"))
+        self.assertEqual(leftovers, [])
+
+    def test_lookups_are_buffered_until_flush(self):
+        self.cache.write("SBIN", "29-Aug-2024", self.df, META)
+        self.cache.read("SBIN", "29-Aug-2024")
+        self.cache.read("SBIN", "26-Sep-2024")
+
+        on_disk = CacheStats(Path(self.tmp.name) / STATS_FILE)
+        self.assertEqual(on_disk.counters()["hits"], 0)
+        self.cache.flush_stats()
+        self.assertEqual(
+            on_disk.counters(), {"hits": 1, "misses": 1, "evictions": 0}
+        )
+        self.assertEqual(list(on_disk.last_reads()), [("SBIN", "29-Aug-2024")])
+
+    def test_stale_entry_counts_as_miss(self):
+        fetcher = StubFetcher(self.tmp.name, [ConnectionError("reset")])
+        fetcher.futures_cache.write("SBIN", "30-Dec-2099", self.df, META)
+        args = ("SBIN", "01-12-2099", "30-12-2099", "30-Dec-2099")
+
+        fetcher.get_futures_data(*args)
+        fetcher.get_futures_data(*args, use_cache_for_future=True)
+
+        counters = fetcher.futures_cache.stats.counters()
+        self.assertEqual((counters["hits"], counters["misses"]), (1, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from calendar_spread.expiry_calendar import ExpiryCalendar, format_expiry
+from calendar_spread.futures_data import (
+    SPREADS,
+    build_continuous_table,
+    spread_signal,
+)
+from calendar_spread.market_calendar import trading_days
+
+
+class TestBuildContinuousTable(unittest.TestCase):
+    def setUp(self):
+        self.calendar = ExpiryCalendar(2024, 2025)
+        days = trading_days(date(2024, 1, 1), date(2024, 3, 28))
+        self.futures_data = {}
+        for month, expiry in enumerate(self.calendar.expiries[:5]):
+            traded = days[days <= expiry]
+            self.futures_data[format_expiry(expiry)] = pd.DataFrame(
+                {
+                    "Date": pd.to_datetime(traded),
+                    "Close": 100.0 + 10 * month + np.arange(len(traded)) / 100,
+                }
+            )
+        # A missing print is carried forward within the same contract only
+        jan = self.futures_data["25-Jan-2024"]
+        self.futures_data["25-Jan-2024"] = jan[jan["Date"] != "2024-01-10"]
+
+    def test_legs_and_spreads(self):
+        table = build_continuous_table(self.futures_data, self.calendar)
+
+        self.assertEqual(table["Date"].iloc[0], date(2024, 1, 1))
+        self.assertEqual(table["Date"].iloc[-1], date(2024, 3, 28))
+        row = table[table["Date"] == date(2024, 1, 10)].iloc[0]
+        previous = table[table["Date"] == date(2024, 1, 9)].iloc[0]
+        self.assertEqual(row["Current Month"], previous["Current Month"])
+        self.assertEqual(row["Current Month Expiry"], "25-Jan-2024")
+        self.assertEqual(row["Near Month Expiry"], "29-Feb-2024")
+        self.assertEqual(row["Far Month Expiry"], "28-Mar-2024")
+
+        # On expiry day the expiring contract is still the current month
+        row = table[table["Date"] == date(2024, 1, 25)].iloc[0]
+        self.assertEqual(row["Current Month Expiry"], "25-Jan-2024")
+        row = table[table["Date"] == date(2024, 1, 29)].iloc[0]
+        self.assertEqual(row["Far Month Expiry"], "25-Apr-2024")
+
+        for spread, (front, back) in SPREADS.items():
+            np.testing.assert_allclose(
+                table[spread], table[back] - table[front]
+            )
+        self.assertTrue(table["Far Month"].notna().all())
+
+    def test_empty(self):
+        table = build_continuous_table({}, self.calendar)
+        self.assertTrue(table.empty)
+        self.assertIn("Near-Far Spread", table.columns)
+
+
+class TestSpreadSignal(unittest.TestCase):
+    def test_signal_after_last_trade(self):
+        spreads = [0.0] * 8 + [1.0, 1.0, 5.0, 5.0, 5.0, 5.0]
+        backtest_df = pd.DataFrame(
+            {
+                "Date": pd.date_range("2024-08-01", periods=len(spreads)),
+                "Spread": spreads,
+            }
+        )
+        trades_df = pd.DataFrame({"Exit_Date": [pd.Timestamp("2024-08-09")]})
+
+        self.assertEqual(
+            spread_signal(backtest_df, trades_df), "SELL (Active 3d)"
+        )
+        self.assertEqual(
+            spread_signal(backtest_df.iloc[:-3], trades_df), "SELL (Fresh)"
+        )
+        backtest_df.loc[len(spreads) - 1, "Spread"] = 2.0
+        self.assertEqual(spread_signal(backtest_df, trades_df), "NEUTRAL")
+
+
+if __name__ == "__main__":
+    unittest.main()
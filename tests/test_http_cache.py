@@ -0,0 +1,62 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+import requests
+
+from calendar_spread.http_cache import ResponseCache, endpoint_ttl
+from calendar_spread.nse_api import NSEDataFetcher
+
+UNDERLYING_URL = "https://www.nseindia.com/api/underlying-information"
+
+
+def json_response(data):
+    response = requests.Response()
+    response.status_code = 200
+    response._content = json.dumps(data).encode("utf-8")
+    response.headers["Content-Type"] = "application/json"
+    return response
+
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = ResponseCache(Path(self.tmp.name) / "http.sqlite")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_endpoint_ttls(self):
+        self.assertGreater(endpoint_ttl(UNDERLYING_URL), 0)
+        self.assertIsNone(
+            endpoint_ttl(
+                "https://www.nseindia.com/api/historical/fo/derivatives"
+                "?symbol=SBIN"
+            )
+        )
+
+    def test_entries_expire_after_ttl(self):
+        self.cache.set(UNDERLYING_URL, json_response({"a": 1}), now=1000)
+
+        cached = self.cache.get(UNDERLYING_URL, max_age=60, now=1050)
+        self.assertEqual(cached.json(), {"a": 1})
+        self.assertTrue(cached.from_cache)
+        self.assertIsNone(self.cache.get(UNDERLYING_URL, max_age=60, now=1061))
+
+    def test_warm_cache_skips_nse_session(self):
+        stocks = [{"symbol": "SBIN", "underlying": "State Bank of India"}]
+        self.cache.set(
+            UNDERLYING_URL,
+            json_response({"data": {"UnderlyingList": stocks}}),
+        )
+
+        fetcher = NSEDataFetcher(response_cache=self.cache)
+        info = fetcher.get_underlying_info()
+
+        self.assertEqual(info["stocks"], stocks)
+        self.assertIsNone(fetcher._nse_session)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import os
+import tempfile
+import unittest
+
+from candle_stick_patterns import detect_patterns_in_frame
+from incremental_patterns import PatternState, append_to_log, read_log
+from price_panel import PricePanel
+from tests.test_candle_stick_patterns import random_frame
+
+
+class TestPatternState(unittest.TestCase):
+    def test_last_bar_matches_batch_detection(self):
+        frames = {f"S{i}.NS": random_frame(40, i) for i in range(30)}
+
+        for symbol, df in frames.items():
+            state = PatternState(window=len(df))
+            state.update(PricePanel.from_frames({symbol: df.iloc[:-1]}))
+            found = state.update(PricePanel.from_frames({symbol: df}))
+
+            last_date = df.index[-1]
+            expected = sorted(
+                name
+                for name, dates in detect_patterns_in_frame(df).items()
+                if last_date in dates
+            )
+            self.assertEqual(sorted(found["Pattern"]), expected)
+            self.assertTrue((found["Date"] == last_date).all())
+
+    def test_only_new_bars_are_evaluated(self):
+        df = random_frame(30, 1)
+        state = PatternState(window=20)
+        state.update(PricePanel.from_frames({"A.NS": df}))
+        self.assertEqual(state.count[0], 20)
+
+        found = state.update(PricePanel.from_frames({"A.NS": df}))
+        self.assertTrue(found.empty)
+        self.assertEqual(state.count[0], 20)
+
+    def test_state_and_log_round_trip(self):
+        df = random_frame(30, 2)
+        state = PatternState(window=10)
+        found = state.update(PricePanel.from_frames({"A.NS": df.iloc[:-5]}))
+
+        with tempfile.TemporaryDirectory() as tmp:
+            state_path = os.path.join(tmp, "state.npz")
+            log_path = os.path.join(tmp, "log.csv")
+            state.save(state_path)
+            append_to_log(found, log_path)
+
+            loaded = PatternState.load(state_path)
+            more = loaded.update(PricePanel.from_frames({"A.NS": df}))
+            append_to_log(more, log_path)
+
+            full = PatternState(window=10)
+            expected = full.update(PricePanel.from_frames({"A.NS": df}))
+            self.assertEqual(len(read_log(log_path)), len(expected))
@@ -0,0 +1,219 @@
+"""
+Performance regression suite for the core kernels on synthetic data.
+
+Every kernel runs over 1, 100 and 1000 symbols with years of daily history
+and fails when its median round exceeds the time budget in ``BUDGETS``.
+Budgets are seconds per symbol with room for slower machines; set
+BENCHMARK_BUDGET_SCALE (e.g. 2) to loosen them on a slow CI runner. A plain
+test run only has the 1-symbol smoke tier; the 100- and 1000-symbol tiers
+run with ``--run-benchmarks`` (see ``tests/conftest.py``). Larger tiers
+reuse ``DISTINCT_SYMBOLS`` generated symbols cyclically, so data generation
+stays out of the way.
+
+To compare with an earlier run instead of the fixed budgets::
+
+    pytest tests/test_kernel_benchmarks.py --run-benchmarks --benchmark-only \\
+        --benchmark-autosave
+    pytest tests/test_kernel_benchmarks.py --run-benchmarks --benchmark-only \\
+        --benchmark-compare --benchmark-compare-fail=median:25%
+
+``detect_patterns`` and ``check_volume_surge`` download from yfinance, so
+their kernels (per-frame and panel) are benchmarked instead. Without
+pytest-benchmark the budgets are still enforced in every test run, timed by
+``BudgetTimer`` instead of the plugin's fixture.
+"""
+
+import contextlib
+import io
+import os
+import statistics
+import time
+from functools import lru_cache
+
+import pytest
+
+from calendar_spread.futures_data import (
+    backtest_calendar_spread,
+    build_continuous_table,
+)
+from candle_stick_patterns import (
+    detect_patterns_in_frame,
+    detect_patterns_panel,
+)
+from price_panel import PricePanel
+from tests.synthetic import exchange_calendar, futures_chain, ohlcv_frames
+from volume_checker import volume_surge_from_history, volume_surges_panel
+
+try:
+    import pytest_benchmark  # noqa: F401
+
+    HAS_PYTEST_BENCHMARK = True
+except ImportError:
+    HAS_PYTEST_BENCHMARK = False
+
+SCALES = (1, 100, 1000)
+# Rounds per tier; the median round is checked against the budget
+ROUNDS = {1: 5, 100: 3, 1000: 1}
+DISTINCT_SYMBOLS = 100
+FUTURES_YEARS = 5
+OHLCV_YEARS = 10
+
+# Kernel -> budget in seconds per symbol of the median round
+BUDGETS = {
+    "build_continuous_table": 0.25,
+    "backtest_calendar_spread": 0.05,
+    "detect_patterns_in_frame": 0.015,
+    "detect_patterns_panel": 0.015,
+    "volume_surge_from_history": 0.001,
+    "volume_surges_panel": 0.0002,
+}
+# Budget of a whole round, however few symbols it has
+MIN_BUDGET = 0.05
+BUDGET_SCALE = float(os.environ.get("BENCHMARK_BUDGET_SCALE", "1"))
+
+
+class BudgetTimer:
+    """Stand-in for the benchmark fixture: times rounds, keeps the median."""
+
+    def __init__(self):
+        self.group = None
+        self.median = None
+
+    def pedantic(self, target, args=(), rounds=1, iterations=1):
+        seconds = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            result = target(*args)
+            seconds.append(time.perf_counter() - start)
+        self.median = statistics.median(seconds)
+        return result
+
+
+if not HAS_PYTEST_BENCHMARK:
+
+    @pytest.fixture
+    def benchmark():
+        return BudgetTimer()
+
+
+@pytest.fixture(autouse=True)
+def benchmark_tier(request):
+    """Skip tiers above one symbol, before their data is built."""
+    n = request.node.callspec.params["n"]
+    if n > 1 and not request.config.getoption("run_benchmarks"):
+        pytest.skip(f"{n}-symbol tier runs with --run-benchmarks")
+
+
+def median_seconds(benchmark):
+    """Median round of the last run, None when benchmarks are disabled."""
+    if isinstance(benchmark, BudgetTimer):
+        return benchmark.median
+    if benchmark.stats is None:
+        return None
+    return benchmark.stats.stats.median
+
+
+@lru_cache(maxsize=None)
+def calendar():
+    return exchange_calendar(2015, FUTURES_YEARS)
+
+
+@lru_cache(maxsize=None)
+def chain(seed):
+    return futures_chain(calendar(), seed)
+
+
+@lru_cache(maxsize=None)
+def table(seed):
+    return build_continuous_table(chain(seed), calendar().expiry_calendar)
+
+
+@lru_cache(maxsize=None)
+def frames():
+    return list(ohlcv_frames(DISTINCT_SYMBOLS, OHLCV_YEARS).values())
+
+
+@lru_cache(maxsize=None)
+def panel(n):
+    return PricePanel.from_frames(
+        {f"SYM{i:04d}": frames()[i % DISTINCT_SYMBOLS] for i in range(n)}
+    )
+
+
+def symbols(n):
+    return [i % DISTINCT_SYMBOLS for i in range(n)]
+
+
+def run(request, benchmark, n, kernel, *args):
+    """Benchmark ``kernel(*args)`` and enforce its budget."""
+    name = request.node.originalname.replace("test_", "", 1)
+    benchmark.group = name
+    result = benchmark.pedantic(
+        kernel, args=args, rounds=ROUNDS[n], iterations=1
+    )
+    median = median_seconds(benchmark)
+    if median is not None:
+        budget = max(MIN_BUDGET, BUDGETS[name] * n) * BUDGET_SCALE
+        assert median <= budget, (
+            f"{name} over {n} symbols took {median:.3f}s, "
+            f"budget {budget:.3f}s"
+        )
+    return result
+
+
+@pytest.mark.parametrize("n", SCALES)
+def test_build_continuous_table(request, benchmark, n):
+    chains = [chain(seed) for seed in symbols(n)]
+    expiry_calendar = calendar().expiry_calendar
+
+    def kernel():
+        return [build_continuous_table(c, expiry_calendar) for c in chains]
+
+    tables = run(request, benchmark, n, kernel)
+    assert len(tables) == n and not tables[-1].empty
+
+
+@pytest.mark.parametrize("n", SCALES)
+def test_backtest_calendar_spread(request, benchmark, n):
+    tables = [table(seed) for seed in symbols(n)]
+
+    def kernel():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return [backtest_calendar_spread(t) for t in tables]
+
+    results = run(request, benchmark, n, kernel)
+    assert len(results) == n
+
+
+@pytest.mark.parametrize("n", SCALES)
+def test_detect_patterns_in_frame(request, benchmark, n):
+    bars = [frames()[i] for i in symbols(n)]
+
+    def kernel():
+        return [detect_patterns_in_frame(df) for df in bars]
+
+    results = run(request, benchmark, n, kernel)
+    assert len(results) == n and any(results[0].values())
+
+
+@pytest.mark.parametrize("n", SCALES)
+def test_detect_patterns_panel(request, benchmark, n):
+    results = run(request, benchmark, n, detect_patterns_panel, panel(n))
+    assert len(results) == n
+
+
+@pytest.mark.parametrize("n", SCALES)
+def test_volume_surge_from_history(request, benchmark, n):
+    bars = [frames()[i] for i in symbols(n)]
+
+    def kernel():
+        return [volume_surge_from_history(df) for df in bars]
+
+    results = run(request, benchmark, n, kernel)
+    assert len(results) == n
+
+
+@pytest.mark.parametrize("n", SCALES)
+def test_volume_surges_panel(request, benchmark, n):
+    surges = run(request, benchmark, n, volume_surges_panel, panel(n))
+    assert len(surges) == n
@@ -0,0 +1,167 @@
+import os
+import tempfile
+import unittest
+import warnings
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from calendar_spread.expiry_calendar import (
+    THURSDAY,
+    ExpiryCalendar,
+    format_expiries,
+    format_expiry,
+    monthly_expiries,
+)
+from calendar_spread.futures_data import build_continuous_table
+from calendar_spread.long_history import (
+    get_long_history,
+    iter_continuous_chunks,
+    write_parquet,
+)
+from calendar_spread.market_calendar import trading_days
+
+try:
+    import pyarrow  # noqa: F401
+
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+
+class FakeFetcher:
+    """Serves synthetic contracts and records the requested expiries."""
+
+    def __init__(self, calendar, first_day=date(2024, 1, 1), listed=()):
+        days = trading_days(first_day, date(2025, 12, 31))
+        self.contracts = {}
+        for month, expiry in enumerate(calendar.expiries):
+            traded = days[(days <= expiry) & (days > expiry - 95)]
+            if len(traded) == 0:
+                continue
+            self.contracts[format_expiry(expiry)] = pd.DataFrame(
+                {
+                    "Date": pd.to_datetime(traded),
+                    "Close": 100.0 + month + np.arange(len(traded)) / 10,
+                }
+            )
+        self.listed = format_expiries(listed)
+        self.requested = []
+
+    def get_futures_data(self, symbol, from_date, to_date, expiry, use_cache):
+        self.requested.append(expiry)
+        return self.contracts.get(expiry)
+
+    def get_expiry_dates(self, symbol, year):
+        return [expiry for expiry in self.listed if expiry.endswith(str(year))]
+
+
+class TestLongHistory(unittest.TestCase):
+    def setUp(self):
+        self.calendar = ExpiryCalendar(2024, 2026)
+        self.fetcher = FakeFetcher(self.calendar)
+        self.start, self.end = date(2024, 2, 10), date(2025, 6, 15)
+
+    def expected(self):
+        start, end = pd.Timestamp(self.start), pd.Timestamp(self.end)
+        return build_continuous_table(
+            {
+                expiry: df[(df["Date"] >= start) & (df["Date"] <= end)]
+                for expiry, df in self.fetcher.contracts.items()
+            },
+            self.calendar,
+        )
+
+    def test_rejects_start_before_calendar(self):
+        chunks = iter_continuous_chunks(
+            "SBIN",
+            date(2023, 6, 1),
+            self.end,
+            fetcher=self.fetcher,
+            expiry_calendar=self.calendar,
+        )
+        with self.assertRaises(ValueError):
+            next(chunks)
+        self.assertEqual(self.fetcher.requested, [])
+
+    def test_listed_expiries_reach_before_holidays(self):
+        # NSE moved the March 2023 expiry off the 30-Mar-2023 holiday
+        holidays = np.busdaycalendar(holidays=["2023-03-30"])
+        listed = monthly_expiries(2020, 2023, THURSDAY, holidays)
+        calendar = ExpiryCalendar(2020, 2026, listed_expiries=listed)
+        fetcher = FakeFetcher(calendar, date(2020, 1, 1), listed)
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            df = get_long_history(
+                "SBIN", date(2020, 3, 2), self.end, fetcher=fetcher
+            )
+        self.assertEqual(df["Date"].iloc[0], date(2020, 3, 2))
+        self.assertEqual(df["Date"].iloc[-1], date(2025, 6, 13))
+        self.assertIn("29-Mar-2023", fetcher.requested)
+        self.assertNotIn("30-Mar-2023", fetcher.requested)
+
+        start, end = pd.Timestamp(2020, 3, 2), pd.Timestamp(self.end)
+        expected = build_continuous_table(
+            {
+                expiry: rows[(rows["Date"] >= start) & (rows["Date"] <= end)]
+                for expiry, rows in fetcher.contracts.items()
+            },
+            calendar,
+        )
+        pd.testing.assert_frame_equal(df, expected)
+
+        fetcher.listed = [e for e in fetcher.listed if "2021" not in e]
+        with self.assertRaises(ValueError):
+            get_long_history("SBIN", date(2020, 3, 2), fetcher=fetcher)
+
+    def test_chunks_match_full_build(self):
+        chunks = list(
+            iter_continuous_chunks(
+                "SBIN",
+                self.start,
+                self.end,
+                fetcher=self.fetcher,
+                expiry_calendar=self.calendar,
+            )
+        )
+        # One chunk per current month contract, each contract fetched once
+        self.assertEqual(len(chunks), 17)
+        self.assertEqual(
+            len(self.fetcher.requested), len(set(self.fetcher.requested))
+        )
+        pd.testing.assert_frame_equal(
+            pd.concat(chunks, ignore_index=True), self.expected()
+        )
+
+    @unittest.skipUnless(HAS_PYARROW, "pyarrow is not installed")
+    def test_write_parquet(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "sbin.parquet")
+            rows = write_parquet(
+                "SBIN",
+                path,
+                self.start,
+                self.end,
+                fetcher=self.fetcher,
+                expiry_calendar=self.calendar,
+            )
+            df = pd.read_parquet(path)
+        self.assertEqual(rows, len(self.expected()))
+        self.assertEqual(list(df.columns), list(self.expected().columns))
+
+    def test_get_long_history(self):
+        df = get_long_history(
+            "SBIN",
+            self.start,
+            self.end,
+            fetcher=self.fetcher,
+            expiry_calendar=self.calendar,
+        )
+        self.assertEqual(df["Date"].iloc[0], date(2024, 2, 12))
+        self.assertEqual(df["Date"].iloc[-1], date(2025, 6, 13))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import tempfile
+import unittest
+from datetime import date, datetime
+from pathlib import Path
+
+from calendar_spread import market_calendar as mc
+from calendar_spread.fetch_log import FetchLog
+from calendar_spread.http_cache import ResponseCache
+from calendar_spread.nse_api import NSEDataFetcher
+
+
+def ist(*args):
+    return datetime(*args, tzinfo=mc.IST)
+
+
+class TestMarketCalendar(unittest.TestCase):
+    def test_trading_days_skip_weekends_and_holidays(self):
+        self.assertFalse(mc.is_trading_day(date(2025, 8, 15)))
+        self.assertFalse(mc.is_trading_day(date(2025, 8, 16)))
+        self.assertTrue(mc.is_trading_day(date(2025, 8, 18)))
+        # Monday after Friday's Independence Day holiday
+        self.assertEqual(
+            mc.previous_trading_day(date(2025, 8, 18)), date(2025, 8, 14)
+        )
+        self.assertEqual(
+            len(mc.trading_days(date(2025, 8, 11), date(2025, 8, 17))), 4
+        )
+
+    def test_last_published_session(self):
+        # Tuesday before and after the end-of-day publication
+        self.assertEqual(
+            mc.last_published_session(ist(2025, 8, 19, 11, 0)),
+            date(2025, 8, 18),
+        )
+        self.assertEqual(
+            mc.last_published_session(ist(2025, 8, 19, 23, 0)),
+            date(2025, 8, 19),
+        )
+        # Sunday still points at Friday
+        self.assertEqual(
+            mc.last_published_session(ist(2025, 8, 24, 12, 0)),
+            date(2025, 8, 22),
+        )
+
+    def test_fetches_stay_fresh_until_next_publication(self):
+        fetched = ist(2025, 8, 22, 20, 0)
+        self.assertTrue(mc.is_fresh(fetched, ist(2025, 8, 24, 10, 0)))
+        self.assertTrue(mc.is_fresh(fetched, ist(2025, 8, 25, 14, 0)))
+        self.assertFalse(mc.is_fresh(fetched, ist(2025, 8, 25, 19, 0)))
+        self.assertFalse(
+            mc.is_fresh(ist(2025, 8, 22, 14, 0), ist(2025, 8, 22, 23, 0))
+        )
+
+
+class TestCacheFreshness(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        path = Path(self.tmp.name) / "http.sqlite"
+        self.fetcher = NSEDataFetcher(ResponseCache(path), FetchLog(path))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_meta_decides_freshness(self):
+        cache = {
+            "28-Aug-2025": {
+                "fetched_at": "2025-08-22T20:00:00+05:30",
+                "final": False,
+            },
+            "31-Jul-2025": {
+                "fetched_at": "2025-08-01T09:00:00+05:30",
+                "final": True,
+            },
+        }
+        weekend = ist(2025, 8, 23, 22, 0)
+        next_evening = ist(2025, 8, 25, 22, 0)
+
+        self.assertTrue(
+            self.fetcher._is_cache_fresh(
+                "28-Aug-2025", cache["28-Aug-2025"], weekend
+            )
+        )
+        self.assertFalse(
+            self.fetcher._is_cache_fresh(
+                "28-Aug-2025", cache["28-Aug-2025"], next_evening
+            )
+        )
+        self.assertTrue(
+            self.fetcher._is_cache_fresh(
+                "31-Jul-2025", cache["31-Jul-2025"], next_evening
+            )
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
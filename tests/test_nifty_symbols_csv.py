@@ -0,0 +1,109 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from nifty_symbols_csv import refresh_indices
+
+
+class IndexCSVHandler(BaseHTTPRequestHandler):
+    """Serves index CSVs with ETags and answers matching requests with 304."""
+
+    files = {}
+    requests = []
+
+    def do_GET(self):
+        name = self.path.strip("/")
+        self.requests.append(name)
+        if name not in self.files:
+            self.send_response(404)
+            self.end_headers()
+            return
+
+        body = self.files[name].encode("utf-8")
+        etag = f'"{hash(body)}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def constituents(*symbols):
+    return "Company Name,Industry,Symbol\n" + "".join(
+        f"{s} Ltd,IT,{s}\n" for s in symbols
+    )
+
+
+class TestRefreshIndices(unittest.TestCase):
+    def setUp(self):
+        IndexCSVHandler.files = {
+            "a.csv": constituents("INFY", "TCS"),
+            "b.csv": constituents("HDFCBANK", "SBIN"),
+        }
+        IndexCSVHandler.requests = []
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), IndexCSVHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        base = f"http://127.0.0.1:{self.server.server_port}"
+        self.urls = {"index_a": f"{base}/a.csv", "index_b": f"{base}/b.csv"}
+
+        self.tmp = tempfile.TemporaryDirectory()
+        self.indices_file = os.path.join(self.tmp.name, "indices.json")
+        self.validators_file = os.path.join(self.tmp.name, "validators.json")
+        with open(self.indices_file, "w") as f:
+            json.dump({"manual": ["ABB"]}, f)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmp.cleanup()
+
+    def refresh(self, urls=None):
+        return refresh_indices(
+            urls or self.urls, self.indices_file, self.validators_file
+        )
+
+    def test_unchanged_refresh_is_one_conditional_request_per_file(self):
+        indices, changes, _ = self.refresh()
+        self.assertEqual(indices["index_a"], ["INFY", "TCS"])
+        self.assertEqual(indices["manual"], ["ABB"])
+        self.assertEqual(changes["index_b"]["added"], ["HDFCBANK", "SBIN"])
+
+        IndexCSVHandler.requests = []
+        mtime = os.path.getmtime(self.indices_file)
+        indices, changes, statuses = self.refresh()
+
+        self.assertEqual(sorted(IndexCSVHandler.requests), ["a.csv", "b.csv"])
+        self.assertEqual(set(statuses.values()), {"unchanged"})
+        self.assertEqual(changes, {})
+        self.assertEqual(indices["index_b"], ["HDFCBANK", "SBIN"])
+        self.assertEqual(os.path.getmtime(self.indices_file), mtime)
+
+    def test_membership_diff_and_failures_keep_stored_symbols(self):
+        self.refresh()
+        IndexCSVHandler.files["a.csv"] = constituents("INFY", "WIPRO")
+        del IndexCSVHandler.files["b.csv"]
+
+        indices, changes, statuses = self.refresh()
+
+        self.assertEqual(statuses, {"index_a": "updated", "index_b": "failed"})
+        self.assertEqual(
+            changes, {"index_a": {"added": ["WIPRO"], "removed": ["TCS"]}}
+        )
+        with open(self.indices_file) as f:
+            self.assertEqual(json.load(f), indices)
+        self.assertEqual(indices["index_b"], ["HDFCBANK", "SBIN"])
+
+
+if __name__ == "__main__":
+    unittest.main()
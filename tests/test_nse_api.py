@@ -0,0 +1,81 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import pandas as pd
+
+from calendar_spread.fetch_log import FetchLog
+from calendar_spread.http_cache import ResponseCache
+from calendar_spread.nse_api import (
+    FUTURES_SCHEMA,
+    NSEDataFetcher,
+    parse_futures_frame,
+)
+
+PAYLOAD_ROW = {
+    "_id": "66cc975b90fb8e05d9127ba1",
+    "FH_EXPIRY_DT": "29-Aug-2024",
+    "FH_MARKET_TYPE": "N",
+    "TIMESTAMP": "2024-08-25T18:30:00.000Z",
+    "FH_TIMESTAMP": "26-Aug-2024",
+    "FH_OPENING_PRICE": "817.85",
+    "FH_TRADE_HIGH_PRICE": "823.60",
+    "FH_TRADE_LOW_PRICE": "815.75",
+    "FH_CLOSING_PRICE": "816.50",
+    "FH_LAST_TRADED_PRICE": "816.60",
+    "FH_SETTLE_PRICE": "816.50",
+    "FH_TOT_TRADED_QTY": "30,543,750",
+    "FH_OPEN_INT": "62,370,000",
+    "FH_CHANGE_IN_OI": "-18513000.00",
+    "FH_MARKET_LOT": "750",
+}
+
+
+class TestParseFuturesFrame(unittest.TestCase):
+    def test_payload_is_projected_and_typed(self):
+        later = dict(PAYLOAD_ROW, FH_TIMESTAMP="27-Aug-2024")
+        df = parse_futures_frame(pd.DataFrame([later, PAYLOAD_ROW]))
+
+        expected = [column for column, _ in FUTURES_SCHEMA.values()]
+        self.assertEqual(list(df.columns), expected)
+        self.assertEqual(
+            {column: str(dtype) for column, dtype in df.dtypes.items()},
+            dict(FUTURES_SCHEMA.values()),
+        )
+        first = df.iloc[0]
+        self.assertEqual(first["Date"], pd.Timestamp("2024-08-26"))
+        self.assertAlmostEqual(first["High"], 823.6, places=3)
+        self.assertEqual(first["Volume"], 30543750)
+        self.assertEqual(first["Change in OI"], -18513000)
+        self.assertEqual(first["Lot Size"], 750)
+
+    def test_legacy_cache_entries(self):
+        # Entries cached before the schema kept every field and renamed a few
+        legacy = dict(PAYLOAD_ROW, Close=816.5, Volume=30543750)
+        for field in ("FH_CLOSING_PRICE", "FH_TOT_TRADED_QTY", "FH_TIMESTAMP"):
+            del legacy[field]
+        legacy["Date"] = pd.Timestamp("2024-08-26")
+
+        df = parse_futures_frame(pd.DataFrame([legacy]))
+
+        self.assertNotIn("_id", df.columns)
+        self.assertEqual(df["Close"].dtype, "float32")
+        self.assertAlmostEqual(df["Low"].iloc[0], 815.75, places=3)
+
+    def test_cache_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache_path = Path(tmp) / "http.sqlite"
+            fetcher = NSEDataFetcher(
+                ResponseCache(cache_path), FetchLog(cache_path)
+            )
+            fetcher.CACHE_DIR = Path(tmp)
+            df = parse_futures_frame(pd.DataFrame([PAYLOAD_ROW]))
+
+            fetcher._write_cache("SBIN", "29-Aug-2024", df)
+            cached = fetcher._read_cache("SBIN", "29-Aug-2024")
+
+        pd.testing.assert_frame_equal(cached, df)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import requests
+
+import nifty_symbols_csv
+from calendar_spread.fetch_log import FetchLog
+from calendar_spread.http_cache import ResponseCache
+from calendar_spread.nse_api import NSEDataFetcher, NSESession
+from calendar_spread.nse_replay import (
+    Faults,
+    RecordingStore,
+    ReplayServer,
+    historical_path,
+    json_record,
+    make_record,
+)
+from tests.test_nse_api import PAYLOAD_ROW
+
+ROWS = [
+    dict(PAYLOAD_ROW, FH_TIMESTAMP=day)
+    for day in ("26-Aug-2024", "27-Aug-2024", "28-Aug-2024")
+]
+CSV_PATH = "/content/indices/ind_nifty50list.csv"
+CSV = b"Company Name,Industry,Symbol\nState Bank of India,Financial,SBIN\n"
+
+
+class TestNSEReplay(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.store = RecordingStore(Path(self.tmp.name) / "recordings")
+        self.store.put(
+            historical_path("SBIN", "29-Aug-2024"), json_record({"data": ROWS})
+        )
+        self.store.put(
+            CSV_PATH,
+            make_record(200, {"Content-Type": "text/csv", "ETag": '"v1"'}, CSV),
+        )
+
+    def serve(self, store, **kwargs):
+        server = ReplayServer(store, **kwargs).start()
+        self.addCleanup(server.stop)
+        return server
+
+    def test_fetcher_against_replay(self):
+        server = self.serve(self.store, faults=Faults(require_cookies=True))
+        for name, value in (("BASE_URL", server.url), ("COOKIE_WAIT", 0)):
+            patcher = mock.patch.object(NSESession, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        NSESession._instance = None
+        self.addCleanup(setattr, NSESession, "_instance", None)
+
+        cache_path = Path(self.tmp.name) / "http.sqlite"
+        fetcher = NSEDataFetcher(
+            ResponseCache(cache_path), FetchLog(cache_path)
+        )
+        fetcher.CACHE_DIR = Path(self.tmp.name) / "cache"
+        df = fetcher.get_futures_data(
+            "SBIN", "27-08-2024", "28-08-2024", "29-Aug-2024"
+        )
+
+        self.assertEqual(
+            [day.day for day in df["Date"]],
+            [27, 28],
+        )
+        self.assertIn("nsit", fetcher.cookies)
+
+    def test_faults(self):
+        server = self.serve(
+            self.store, faults=Faults(rate_limit=3, require_cookies=True)
+        )
+        api = f"{server.url}{historical_path('SBIN', '29-Aug-2024')}"
+
+        self.assertEqual(requests.get(api).status_code, 401)
+        self.assertEqual(
+            requests.get(f"{server.url}/api/unknown").status_code, 401
+        )
+        self.assertEqual(requests.get(f"{server.url}/").status_code, 200)
+        self.assertEqual(requests.get(api).status_code, 429)
+
+        forbidden = self.serve(self.store, faults=Faults(forbidden_rate=1.0))
+        self.assertEqual(requests.get(f"{forbidden.url}/").status_code, 403)
+
+    def test_record_then_replay(self):
+        upstream = self.serve(self.store)
+        recorded = RecordingStore(Path(self.tmp.name) / "recorded")
+        recorder = self.serve(
+            recorded, upstream={"nse": upstream.url, "archives": upstream.url}
+        )
+        path = historical_path("SBIN", "29-Aug-2024")
+        window = "&from=01-08-2024&to=29-08-2024"
+        response = requests.get(recorder.url + path + window)
+        self.assertEqual(len(response.json()["data"]), 3)
+        self.assertEqual(requests.get(recorder.url + CSV_PATH).content, CSV)
+        # A narrower window later on must not truncate the recording
+        narrow = "&from=27-08-2024&to=27-08-2024"
+        response = requests.get(recorder.url + path + narrow)
+        self.assertEqual(len(response.json()["data"]), 1)
+        self.assertEqual(len(json.loads(recorded.get(path)["body"])["data"]), 3)
+
+        # Replayed for any window within the recorded one
+        replay = self.serve(recorded)
+        window = "&from=26-08-2024&to=26-08-2024"
+        response = requests.get(replay.url + path + window)
+        self.assertEqual(len(response.json()["data"]), 1)
+        url = replay.url + CSV_PATH
+        status, symbols, validators = nifty_symbols_csv.fetch_index_csv(
+            "nifty50", url
+        )
+        self.assertEqual((status, symbols), ("updated", ["SBIN"]))
+        self.assertEqual(
+            nifty_symbols_csv.fetch_index_csv("nifty50", url, validators)[0],
+            "unchanged",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
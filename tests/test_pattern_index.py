@@ -0,0 +1,109 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from candle_stick_patterns import (
+    AVG_BODY_BARS,
+    PATTERNS,
+    detect_patterns_in_frame,
+    trailing_avg_body,
+)
+from pattern_index import PatternIndex, encode_patterns, mask_dtype
+from tests.test_candle_stick_patterns import make_frame, random_frame
+
+
+class TestPatternIndex(unittest.TestCase):
+    def setUp(self):
+        self.frames = {
+            f"S{i}.NS": random_frame(40 + 9 * i, i) for i in range(6)
+        }
+        self.index = PatternIndex.from_panel(self.frames)
+
+    def test_masks_use_compact_dtype(self):
+        self.assertEqual(mask_dtype(len(PATTERNS)), np.uint16)
+        self.assertEqual(self.index.masks.dtype, np.uint16)
+        self.assertEqual(mask_dtype(20), np.uint32)
+
+    def test_encode_sets_one_bit_per_pattern(self):
+        hits = {"A": np.array([True, False]), "B": np.array([True, True])}
+        masks = encode_patterns(hits, ["A", "B"])
+        self.assertEqual(masks.tolist(), [3, 2])
+
+    def test_decode_round_trips_detection(self):
+        # Average bodies over every bar, as detect_patterns_in_frame does
+        index = PatternIndex.from_panel(self.frames, avg_body_bars=100)
+        for symbol, df in self.frames.items():
+            expected = {
+                name: dates
+                for name, dates in detect_patterns_in_frame(df).items()
+                if dates
+            }
+            self.assertEqual(index.decode(symbol), expected)
+
+    def test_long_history_matches_recent_detection(self):
+        df = random_frame(5 * 250, 7)
+        # Bodies were wider years ago, so a full-history average would
+        # move the body thresholds of recent bars
+        scale = np.linspace(3, 1, len(df))[:, None]
+        df = (df - 100) * scale + 100
+        index = PatternIndex.from_panel({"A.NS": df})
+
+        recent = df.iloc[-AVG_BODY_BARS:]
+        expected = {
+            name: [date for date in dates if date >= recent.index[-20]]
+            for name, dates in detect_patterns_in_frame(recent).items()
+        }
+        expected = {name: dates for name, dates in expected.items() if dates}
+        self.assertTrue(expected)
+        self.assertEqual(index.decode("A.NS", last_bars=20), expected)
+
+    def test_trailing_index_ignores_later_bars(self):
+        df = random_frame(300, 3)
+        full = PatternIndex.from_panel({"A.NS": df}, trailing=True)
+        head = PatternIndex.from_panel({"A.NS": df.iloc[:150]}, trailing=True)
+        np.testing.assert_array_equal(full.masks[:, :150], head.masks)
+
+        body = (df["Close"] - df["Open"]).abs()
+        expected = body.rolling(AVG_BODY_BARS, min_periods=1).mean()
+        np.testing.assert_allclose(
+            trailing_avg_body(df["Open"], df["Close"]), expected
+        )
+
+    def test_symbols_with_pattern_in_window(self):
+        df = make_frame(
+            [
+                [100, 101, 94, 99],
+                [98.5, 102, 98, 101.5],
+                [101, 101.5, 99, 100],
+                [100, 101, 99.5, 100.2],
+            ]
+        )
+        index = PatternIndex.from_panel({"A.NS": df, "B.NS": df.iloc[:1]})
+
+        self.assertEqual(index.symbols_with("Bullish Engulfing"), ["A.NS"])
+        self.assertEqual(
+            index.symbols_with("Bullish Engulfing", since=df.index[1]), ["A.NS"]
+        )
+        self.assertEqual(
+            index.symbols_with("Bullish Engulfing", last_bars=2), []
+        )
+
+        occurrences = index.occurrences("Bullish Engulfing")
+        self.assertEqual(occurrences["Symbol"].tolist(), ["A.NS"])
+        self.assertEqual(pd.Timestamp(occurrences["Date"].iloc[0]), df.index[1])
+
+    def test_to_frame_lists_hits_in_window(self):
+        frame = self.index.to_frame(last_bars=3)
+        self.assertTrue((frame["Bars Ago"] < 3).all())
+        for row in frame.to_dict("records"):
+            decoded = self.index.decode(row["Symbol"], last_bars=3)
+            self.assertIn(pd.Timestamp(row["Date"]), decoded[row["Pattern"]])
+
+    def test_to_frame_without_patterns_is_empty(self):
+        for frame in (self.index.to_frame([]), self.index.to_frame(["Doji"])):
+            self.assertEqual(
+                frame.columns.tolist(),
+                ["Symbol", "Pattern", "Direction", "Date", "Bars Ago"],
+            )
+        self.assertTrue(self.index.to_frame([]).empty)
@@ -0,0 +1,60 @@
+import unittest
+
+import numpy as np
+
+from pattern_index import PatternIndex
+from pattern_stats import forward_returns, pattern_statistics
+from price_panel import PricePanel
+from tests.test_candle_stick_patterns import random_frame
+
+
+class TestPatternStatistics(unittest.TestCase):
+    def setUp(self):
+        frames = {f"S{i}.NS": random_frame(60 + 7 * i, i) for i in range(8)}
+        self.panel = PricePanel.from_frames(frames)
+        self.index = PatternIndex.from_panel(self.panel, trailing=True)
+
+    def test_forward_returns(self):
+        close = np.array([[100.0, 110.0, 99.0]])
+        returns = forward_returns(close, 1)
+        np.testing.assert_allclose(returns[0, :2], [0.1, -0.1])
+        self.assertTrue(np.isnan(returns[0, 2]))
+
+    def test_matches_per_occurrence_loop(self):
+        stats = pattern_statistics(self.panel, horizons=(3,), index=self.index)
+        close, high, low = self.panel.close, self.panel.high, self.panel.low
+
+        for row in stats.to_dict("records"):
+            sign = np.sign(row["Direction"])
+            returns, favorable = [], []
+            for r, t in zip(*self.index.postings(row["Pattern"])):
+                if t + 3 >= close.shape[1]:
+                    continue
+                change = close[r, t + 3] / close[r, t] - 1
+                returns.append(sign * change if sign else abs(change))
+                if sign == 0:
+                    continue
+                if sign > 0:
+                    favorable.append(
+                        high[r, t + 1 : t + 4].max() / close[r, t] - 1
+                    )
+                else:
+                    favorable.append(
+                        1 - low[r, t + 1 : t + 4].min() / close[r, t]
+                    )
+
+            self.assertEqual(row["Occurrences"], len(returns))
+            if returns:
+                self.assertAlmostEqual(
+                    row["Avg Return %"], np.mean(returns) * 100
+                )
+            if returns and sign == 0:
+                self.assertTrue(np.isnan(row["Hit Rate %"]))
+                self.assertTrue(np.isnan(row["Avg Favorable Excursion %"]))
+            elif returns:
+                self.assertAlmostEqual(
+                    row["Hit Rate %"], np.mean(np.array(returns) > 0) * 100
+                )
+                self.assertAlmostEqual(
+                    row["Avg Favorable Excursion %"], np.mean(favorable) * 100
+                )
@@ -0,0 +1,60 @@
+import os
+import tempfile
+import unittest
+from datetime import date, timedelta
+from unittest import mock
+
+import pandas as pd
+
+import price_store
+from price_store import load_history, save_history, update_history
+from tests.test_candle_stick_patterns import random_frame
+
+
+class TestUpdateHistory(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store_dir = self.tmp.name
+        dates = pd.DatetimeIndex(
+            pd.bdate_range(end=date.today(), periods=30), name="Date"
+        )
+        self.full = random_frame(30, 1).set_axis(dates).assign(Volume=1e5)
+        save_history("A.NS", self.full.iloc[:25], self.store_dir)
+
+        # Last refreshed yesterday, so today's update is due
+        yesterday = date.today() - timedelta(days=1)
+        stamp = pd.Timestamp(yesterday).timestamp()
+        os.utime(price_store._store_path("A.NS", self.store_dir), (stamp,) * 2)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def update(self, download):
+        calls = []
+
+        def fake_download(symbols, **kwargs):
+            calls.append(kwargs)
+            if "period" in kwargs:
+                return {s: download for s in symbols}
+            return {s: download.loc[kwargs["start"] :] for s in symbols}
+
+        with mock.patch.object(price_store, "_download", fake_download):
+            update_history(["A.NS"], store_dir=self.store_dir)
+        return calls, load_history("A.NS", self.store_dir)
+
+    def test_appends_new_bars(self):
+        calls, stored = self.update(self.full)
+        self.assertEqual(len(calls), 1)
+        pd.testing.assert_frame_equal(stored, self.full, check_freq=False)
+
+    def test_reloads_period_when_adjustment_changes(self):
+        # A 1:2 split rescales every bar of the fresh download
+        split = self.full.copy()
+        split[["Open", "High", "Low", "Close"]] /= 2
+        calls, stored = self.update(split)
+        self.assertEqual(calls[-1], {"period": "5y"})
+        pd.testing.assert_frame_equal(stored, split, check_freq=False)
+
+
+if __name__ == "__main__":
+    unittest.main()
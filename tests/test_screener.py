@@ -0,0 +1,81 @@
+import unittest
+
+import numpy as np
+
+from candle_stick_patterns import PATTERNS
+from pattern_index import PatternIndex
+from price_panel import PricePanel
+from screener import (
+    Screener,
+    Stage,
+    candle_pattern,
+    max_daily_move,
+    volume_surge,
+)
+from tests.test_candle_stick_patterns import random_frame
+
+
+class TestScreener(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        frames = {}
+        for i in range(40):
+            frames[f"S{i}.NS"] = random_frame(80, seed=i)
+            frames[f"S{i}.NS"]["Volume"] = rng.integers(1000, 5000, 80)
+        self.panel = PricePanel.from_frames(frames)
+
+    def test_matches_intersection_of_single_stages(self):
+        stages = [
+            candle_pattern(list(PATTERNS), last_bars=3),
+            volume_surge(0),
+            max_daily_move(8, window=20),
+        ]
+        expected = set(self.panel.symbols)
+        for stage in stages:
+            result = Screener([stage]).run(self.panel)
+            expected &= set(result.index)
+
+        combined = Screener(stages).run(self.panel)
+
+        self.assertTrue(expected)
+        self.assertEqual(set(combined.index), expected)
+        self.assertEqual(
+            list(combined.columns),
+            ["Volume Surge %", "Max Move %", "Avg Move %", "Patterns"],
+        )
+
+    def test_patterns_match_pattern_index_on_long_history(self):
+        frames = {f"L{i}.NS": random_frame(1250, seed=i) for i in range(10)}
+        panel = PricePanel.from_frames(frames)
+        index = PatternIndex.from_panel(panel)
+        for name in ("Doji", "Spinning Top", "Bullish Marubozu"):
+            result = Screener([candle_pattern(name, last_bars=5)]).run(panel)
+            self.assertEqual(
+                list(result.index), index.symbols_with(name, last_bars=5)
+            )
+
+    def test_expensive_stages_only_see_survivors(self):
+        seen = []
+
+        def expensive(panel):
+            seen.append(list(panel.symbols))
+            return np.ones(len(panel), dtype=bool), {}
+
+        keep = {"S1.NS", "S5.NS"}
+        cheap = Stage(
+            "cheap",
+            lambda panel: (np.isin(panel.symbols, list(keep)), {}),
+            cost=0,
+        )
+        screener = Screener([Stage("expensive", expensive, cost=5), cheap])
+        result = screener.run(self.panel)
+
+        self.assertEqual(seen, [["S1.NS", "S5.NS"]])
+        self.assertEqual(set(result.index), keep)
+        self.assertEqual(
+            screener.counts, [("universe", 40), ("cheap", 2), ("expensive", 2)]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
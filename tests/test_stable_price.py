@@ -0,0 +1,41 @@
+import unittest
+
+import numpy as np
+
+from price_panel import PricePanel
+from stable_price import stability_statistics
+from tests.test_timeframes import daily_bars
+
+
+class TestStablePrice(unittest.TestCase):
+    def test_matches_per_stock_pct_change(self):
+        frames = {"AAA.NS": daily_bars(60), "BBB.NS": daily_bars(40) * 1.5}
+        stats = stability_statistics(PricePanel.from_frames(frames), window=30)
+
+        for symbol, df in frames.items():
+            change = df["Close"].pct_change().abs().iloc[-30:] * 100
+            self.assertAlmostEqual(
+                stats.loc[symbol, "max_change"], change.max()
+            )
+            self.assertAlmostEqual(
+                stats.loc[symbol, "avg_daily_change"], change.mean()
+            )
+
+    def test_short_history_and_large_move_are_not_stable(self):
+        calm = daily_bars(40)
+        calm["Close"] = np.linspace(100, 101, 40)
+        jump = calm.copy()
+        jump.iloc[-5, jump.columns.get_loc("Close")] *= 1.08
+        frames = {"CALM.NS": calm, "JUMP.NS": jump, "NEW.NS": calm.iloc[-10:]}
+
+        stats = stability_statistics(PricePanel.from_frames(frames), window=30)
+
+        self.assertEqual(
+            stats["is_stable"].to_dict(),
+            {"CALM.NS": True, "JUMP.NS": False, "NEW.NS": False},
+        )
+        self.assertEqual(stats.loc["NEW.NS", "moves"], 9)
+
+
+if __name__ == "__main__":
+    unittest.main()
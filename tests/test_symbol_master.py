@@ -0,0 +1,87 @@
+import json
+import os
+import tempfile
+import unittest
+
+from symbol_master import SymbolMaster, parse_lot_sizes, save_futures_metadata
+
+MARKET_LOTS_CSV = (
+    b"UNDERLYING                    ,SYMBOL    ,OCT-26    ,NOV-26    \n"
+    b"Derivatives on Individual Securities,Symbol,OCT-26,NOV-26\n"
+    b"INFOSYS LIMITED               ,INFY      ,400       ,400       \n"
+    b"NEW LISTING LIMITED           ,NEWCO     ,          ,1200      \n"
+)
+
+
+class TestSymbolMaster(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.indices_file = os.path.join(self.tmp.name, "indices.json")
+        self.futures_file = os.path.join(self.tmp.name, "futures.json")
+        self.write_indices({"nifty50": ["INFY", "TCS"], "nifty_it": ["INFY"]})
+        save_futures_metadata(
+            {
+                "indices": [],
+                "stocks": [
+                    {"symbol": "INFY", "underlying": "Infosys Limited"},
+                    {
+                        "symbol": "TCS",
+                        "underlying": "TCS Ltd",
+                        "lotSize": "175",
+                    },
+                ],
+            },
+            self.futures_file,
+        )
+        self.master = SymbolMaster(self.indices_file, self.futures_file)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write_indices(self, indices, mtime=None):
+        with open(self.indices_file, "w") as f:
+            json.dump(indices, f)
+        if mtime is not None:
+            os.utime(self.indices_file, (mtime, mtime))
+
+    def test_lookups(self):
+        self.assertEqual(
+            self.master.index_symbols("NIFTY50", ".NS"), ["INFY.NS", "TCS.NS"]
+        )
+        self.assertEqual(
+            self.master.indices_of("INFY.NS"), ["nifty50", "nifty_it"]
+        )
+        self.assertTrue(self.master.is_member("tcs", "nifty50"))
+        self.assertFalse(self.master.is_member("TCS", "nifty_it"))
+        self.assertEqual(
+            self.master.futures_info("TCS.NS"),
+            {"underlying": "TCS Ltd", "lot_size": 175},
+        )
+        self.assertIsNone(self.master.futures_info("INFY")["lot_size"])
+        self.assertIsNone(self.master.futures_info("ABB"))
+
+    def test_lot_sizes_from_market_lots(self):
+        lot_sizes = parse_lot_sizes(MARKET_LOTS_CSV)
+        self.assertEqual(lot_sizes, {"INFY": 400, "NEWCO": 1200})
+
+        save_futures_metadata(
+            {"stocks": [{"symbol": "INFY", "underlying": "Infosys Limited"}]},
+            self.futures_file,
+            lot_sizes,
+        )
+        self.assertEqual(self.master.futures_info("INFY.NS")["lot_size"], 400)
+
+    def test_reloads_only_when_file_changes(self):
+        self.master.index_names
+        mtimes = self.master._mtimes
+
+        self.master.index_symbols("nifty50")
+        self.assertIs(self.master._mtimes, mtimes)
+
+        self.write_indices({"nifty50": ["WIPRO"]}, mtime=mtimes[0] + 10)
+        self.assertEqual(self.master.index_symbols("nifty50"), ["WIPRO"])
+        self.assertEqual(self.master.indices_of("INFY"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from calendar_spread.expiry_calendar import parse_expiry
+from calendar_spread.futures_data import build_continuous_table
+from calendar_spread.nse_api import FUTURES_SCHEMA
+from tests.synthetic import exchange_calendar, futures_chain, ohlcv_frames
+
+
+class TestSyntheticData(unittest.TestCase):
+    def setUp(self):
+        self.calendar = exchange_calendar(2015, years=2, seed=1)
+
+    def test_futures_chain_rolls(self):
+        chain = futures_chain(self.calendar, seed=3)
+        busdaycal = self.calendar.busdaycal
+
+        self.assertEqual(len(self.calendar.days), len(set(self.calendar.days)))
+        self.assertLess(len(self.calendar.days), 2 * 261)
+        for expiry, df in chain.items():
+            expiry_day = np.datetime64(parse_expiry(expiry))
+            self.assertTrue(np.is_busday(expiry_day, busdaycal=busdaycal))
+            dates = df["Date"].to_numpy(dtype="datetime64[D]")
+            self.assertLessEqual(dates.max(), expiry_day)
+            # Listed after the expiry three months earlier
+            self.assertLess(expiry_day - dates.min(), np.timedelta64(100, "D"))
+            self.assertEqual(
+                {column: str(dtype) for column, dtype in df.dtypes.items()},
+                dict(FUTURES_SCHEMA.values()),
+            )
+        pd.testing.assert_frame_equal(
+            chain[expiry], futures_chain(self.calendar, seed=3)[expiry]
+        )
+
+        table = build_continuous_table(chain, self.calendar.expiry_calendar)
+        self.assertEqual(len(table), len(self.calendar.days))
+        self.assertFalse(
+            table[["Current Month", "Near Month"]].isna().any().any()
+        )
+        # Carry keeps later contracts above earlier ones on average
+        self.assertGreater(table["Spread"].mean(), 0)
+
+    def test_ohlcv_frames(self):
+        frames = ohlcv_frames(20, years=3, seed=2)
+
+        lengths = [len(df) for df in frames.values()]
+        self.assertEqual(len(set(lengths[:9])), 1)
+        self.assertLess(lengths[9], lengths[0])
+        for df in frames.values():
+            self.assertTrue(
+                (df["High"] >= df[["Open", "Close"]].max(axis=1)).all()
+            )
+            self.assertTrue(
+                (df["Low"] <= df[["Open", "Close"]].min(axis=1)).all()
+            )
+        pd.testing.assert_frame_equal(
+            frames["SYM0005"], ohlcv_frames(6, years=3, seed=2)["SYM0005"]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from timeframes import resample_bars, update_resampled
+
+
+def daily_bars(n_days, start="2024-01-01"):
+    index = pd.bdate_range(start, periods=n_days)
+    rng = np.random.default_rng(0)
+    close = 100 + np.cumsum(rng.normal(0, 1, n_days))
+    return pd.DataFrame(
+        {
+            "Open": close + rng.normal(0, 0.5, n_days),
+            "High": close + 2,
+            "Low": close - 2,
+            "Close": close,
+            "Volume": rng.integers(1000, 5000, n_days).astype(float),
+        },
+        index=index,
+    )
+
+
+class TestTimeframes(unittest.TestCase):
+    def test_weekly_matches_pandas_resample(self):
+        daily = daily_bars(60)
+        weekly = resample_bars(daily, "1wk")
+        expected = daily.resample("W-FRI").agg(
+            {
+                "Open": "first",
+                "High": "max",
+                "Low": "min",
+                "Close": "last",
+                "Volume": "sum",
+            }
+        )
+
+        np.testing.assert_allclose(weekly.to_numpy(), expected.to_numpy())
+        self.assertEqual(weekly.index[-1], daily.index[-1])
+
+    def test_incremental_update_matches_full_resample(self):
+        daily = daily_bars(90)
+        for timeframe in ("1wk", "1mo"):
+            cached = resample_bars(daily.iloc[:47], timeframe)
+            for end in range(48, len(daily) + 1):
+                cached = update_resampled(daily.iloc[:end], cached, timeframe)
+
+            pd.testing.assert_frame_equal(
+                cached, resample_bars(daily, timeframe), check_freq=False
+            )
+
+    def test_daily_is_passed_through(self):
+        daily = daily_bars(5)
+        self.assertIs(resample_bars(daily, "1d"), daily)
@@ -0,0 +1,78 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from volume_watch import VolumeRingBuffer, VolumeWatcher
+
+
+class TestVolumeRingBuffer(unittest.TestCase):
+    def test_window_keeps_latest_completed_bars(self):
+        buffer = VolumeRingBuffer(["A.NS"], window=3)
+        dates = pd.date_range("2024-01-01", periods=5).values
+
+        for date, volume in zip(dates, [10, 20, 30, 40, 50]):
+            buffer.update(np.array([date]), np.array([volume]))
+
+        # The last bar is still forming; the window holds the three before it
+        self.assertEqual(buffer.current[0], 50)
+        self.assertEqual(buffer.previous_volumes("A.NS").tolist(), [20, 30, 40])
+        self.assertAlmostEqual(buffer.average()[0], 30)
+
+    def test_same_date_replaces_current_bar(self):
+        buffer = VolumeRingBuffer(["A.NS"], window=2)
+        day = np.datetime64("2024-01-01")
+
+        buffer.update(np.array([day]), np.array([100.0]))
+        buffer.update(np.array([day]), np.array([250.0]))
+
+        self.assertEqual(buffer.current[0], 250)
+        self.assertEqual(buffer.count[0], 0)
+
+    def test_missing_values_are_ignored(self):
+        buffer = VolumeRingBuffer(["A.NS", "B.NS"], window=2)
+        day = np.datetime64("2024-01-01")
+
+        buffer.update(np.array([day, day]), np.array([100.0, np.nan]))
+
+        self.assertEqual(buffer.current.tolist(), [100.0, 0.0])
+        self.assertTrue(np.isnat(buffer.last_date[1]))
+
+
+class TestVolumeWatcher(unittest.TestCase):
+    def setUp(self):
+        self.dates = pd.date_range("2024-01-01", periods=11, freq="B")
+        self.frames = [
+            pd.DataFrame(
+                {"A.NS": [100.0] * 11, "B.NS": [100.0] * 11}, index=self.dates
+            )
+        ]
+
+    def fetch(self, tickers, period):
+        return self.frames.pop(0)
+
+    def test_poll_emits_only_changed_tickers(self):
+        watcher = VolumeWatcher(
+            ["A.NS", "B.NS"], surge_threshold=50, fetch=self.fetch
+        )
+        self.assertEqual(watcher.poll(), [])
+
+        # Intraday update of today's bar pushes A above the threshold
+        self.frames.append(
+            pd.DataFrame(
+                {"A.NS": [200.0], "B.NS": [110.0]}, index=self.dates[-1:]
+            )
+        )
+        changes = watcher.poll()
+        self.assertEqual([c["ticker"] for c in changes], ["A.NS"])
+        self.assertTrue(changes[0]["is_surge"])
+        self.assertAlmostEqual(changes[0]["percent_increase"], 100)
+
+        # A new day starts with normal volume, clearing the surge
+        next_day = self.dates[-1] + pd.offsets.BDay()
+        self.frames.append(
+            pd.DataFrame({"A.NS": [100.0], "B.NS": [110.0]}, index=[next_day])
+        )
+        changes = watcher.poll()
+        self.assertEqual([c["ticker"] for c in changes], ["A.NS"])
+        self.assertFalse(changes[0]["is_surge"])
@@ -0,0 +1,138 @@
+"""
+Weekly and monthly bars derived on demand from the daily price store.
+
+Resampled series are cached next to the daily bars and updated
+incrementally: when new daily bars arrive only the last, possibly partial,
+week or month is recomputed, so pattern and volume analysis can run on any
+timeframe without extra downloads.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from price_panel import PricePanel
+from price_store import STORE_DIR, load_history, save_history, update_history
+
+# Timeframe -> pandas period frequency used to group daily bars
+TIMEFRAMES = {"1d": None, "1wk": "W-FRI", "1mo": "M"}
+TIMEFRAME_LABELS = {"1d": "Daily", "1wk": "Weekly", "1mo": "Monthly"}
+
+
+def resample_bars(daily, timeframe):
+    """
+    Aggregate daily OHLCV bars into weekly or monthly bars.
+
+    Each bar is labelled with the last trading day it contains, so the
+    latest bar of an unfinished period carries the latest daily date.
+
+    Args:
+        daily (pandas.DataFrame): Sorted daily bars indexed by date
+        timeframe (str): '1d', '1wk' or '1mo'
+
+    Returns:
+        pandas.DataFrame: Resampled OHLCV bars
+    """
+    freq = TIMEFRAMES[timeframe]
+    if freq is None or daily.empty:
+        return daily
+
+    codes = daily.index.to_period(freq).asi8
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    ends = np.r_[starts[1:] - 1, len(daily) - 1]
+
+    return pd.DataFrame(
+        {
+            "Open": daily["Open"].to_numpy()[starts],
+            "High": np.maximum.reduceat(daily["High"].to_numpy(), starts),
+            "Low": np.minimum.reduceat(daily["Low"].to_numpy(), starts),
+            "Close": daily["Close"].to_numpy()[ends],
+            "Volume": np.add.reduceat(daily["Volume"].to_numpy(), starts),
+        },
+        index=daily.index[ends],
+    )
+
+
+def _cache_dir(timeframe, store_dir=STORE_DIR):
+    return os.path.join(os.path.dirname(store_dir), timeframe)
+
+
+def update_resampled(daily, cached, timeframe):
+    """
+    Extend cached resampled bars with new daily bars.
+
+    The last cached bar may belong to an unfinished period, so it is dropped
+    and its period is rebuilt together with any later periods. Everything
+    before it is kept untouched.
+
+    Args:
+        daily (pandas.DataFrame): Full daily history
+        cached (pandas.DataFrame): Previously resampled bars, or None
+        timeframe (str): '1wk' or '1mo'
+
+    Returns:
+        pandas.DataFrame: Up-to-date resampled bars
+    """
+    if cached is None or cached.empty:
+        return resample_bars(daily, timeframe)
+    if cached.index[-1] >= daily.index[-1]:
+        return cached
+
+    freq = TIMEFRAMES[timeframe]
+    last_period = cached.index[-1:].to_period(freq)[0]
+    tail = daily[daily.index >= last_period.start_time]
+    return pd.concat([cached.iloc[:-1], resample_bars(tail, timeframe)])
+
+
+def get_bars(symbol, timeframe="1d", store_dir=STORE_DIR):
+    """
+    Bars of one symbol on any timeframe, built from stored daily bars.
+
+    Args:
+        symbol (str): Ticker symbol (e.g. 'INFY.NS')
+        timeframe (str): '1d', '1wk' or '1mo'
+        store_dir (str): Daily store directory
+
+    Returns:
+        pandas.DataFrame: OHLCV bars, or None if the symbol is not stored
+    """
+    daily = load_history(symbol, store_dir)
+    if daily is None or TIMEFRAMES[timeframe] is None:
+        return daily
+
+    cache_dir = _cache_dir(timeframe, store_dir)
+    cached = load_history(symbol, cache_dir)
+    bars = update_resampled(daily, cached, timeframe)
+    if cached is None or not bars.index.equals(cached.index):
+        save_history(symbol, bars, cache_dir)
+    return bars
+
+
+def load_timeframe_panel(
+    symbols, timeframe="1d", update=True, store_dir=STORE_DIR, max_workers=8
+):
+    """
+    Panel of many symbols on any timeframe from the daily store.
+
+    Args:
+        symbols (list): Ticker symbols (e.g. 'INFY.NS')
+        timeframe (str): '1d', '1wk' or '1mo'
+        update (bool): Refresh stale daily bars from yfinance first
+        store_dir (str): Daily store directory
+        max_workers (int): Threads loading and resampling symbols
+
+    Returns:
+        PricePanel: Panel of every symbol with stored bars
+    """
+    if update:
+        update_history(symbols, store_dir=store_dir)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        bars = pool.map(lambda s: get_bars(s, timeframe, store_dir), symbols)
+        frames = {
+            symbol: df
+            for symbol, df in zip(symbols, bars)
+            if df is not None and not df.empty
+        }
+    return PricePanel.from_frames(frames)
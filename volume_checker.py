@@ -1,10 +1,14 @@
-import json
+import warnings
 from datetime import datetime, timedelta
 
+import numpy as np
 import pandas as pd
 import yfinance as yf
 
-from candle_stick_patterns import get_recent_patterns, print_recent_patterns
+from candle_stick_patterns import print_recent_patterns
+from pattern_index import get_recent_patterns_batch
+from symbol_master import get_symbol_master
+from timeframes import get_bars
 
 
 def get_stock_history(ticker_symbol, start_date, end_date):
@@ -25,48 +29,104 @@ def get_stock_history(ticker_symbol, start_date, end_date):
     return hist
 
 
-def check_volume_surge(ticker_symbol):
+def check_volume_surge(ticker_symbol, timeframe="1d"):
     """
-    Check if stock's current day volume is higher than the last 10 working days.
+    Check if stock's current bar volume is higher than the last 10 bars.
+
+    Daily bars are fetched from yfinance; weekly and monthly bars are
+    derived from the local daily price store without any download.
 
     Args:
         ticker_symbol (str): Stock ticker symbol (e.g., 'AAPL' for Apple)
+        timeframe (str): '1d', '1wk' or '1mo' (default: '1d')
 
     Returns:
         tuple: (bool, float) - (whether volume surged, % increase from average)
     """
     try:
-        # Get stock data for last 15 days (to ensure we have 10 working days)
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=15)
+        if timeframe == "1d":
+            # Get stock data for last 15 days (to ensure we have 10 working days)
+            end_date = datetime.now()
+            start_date = end_date - timedelta(days=15)
 
-        # Fetch historical data using cache
-        hist = get_stock_history(ticker_symbol, start_date, end_date)
+            # Fetch historical data using cache
+            hist = get_stock_history(ticker_symbol, start_date, end_date)
+        else:
+            hist = get_bars(ticker_symbol, timeframe)
 
-        if hist.empty:
+        if hist is None or hist.empty:
             return False, 0, 0, 0, 0
 
-        # pdb.set_trace()
+        return volume_surge_from_history(hist)
+
+    except Exception as e:
+        print(f"Error checking volume for {ticker_symbol}: {str(e)}")
+        return False, 0, 0, 0, 0
+
+
+def volume_surge_from_history(hist, window=10):
+    """
+    Compare the latest bar's volume with the average of the previous bars.
 
-        # Get the latest volume
-        current_volume = hist["Volume"].iloc[-1]
+    Args:
+        hist (pandas.DataFrame): Bars with a Volume column, oldest first
+        window (int): Number of previous bars in the average
 
-        # Get the previous 10 working days volumes
-        previous_volumes = hist["Volume"].iloc[-11:-1]
+    Returns:
+        tuple: (is_surge, current_volume, avg_volume, previous_volumes,
+            percent_increase)
+    """
+    # Get the latest volume
+    current_volume = hist["Volume"].iloc[-1]
 
-        avg_volume = previous_volumes.mean()
+    # Get the previous 10 working days volumes
+    previous_volumes = hist["Volume"].iloc[-window - 1 : -1]
 
-        # Calculate percentage increase
-        percent_increase = ((current_volume - avg_volume) / avg_volume) * 100
+    avg_volume = previous_volumes.mean()
 
-        # Check if current volume is higher than all previous 10 days
-        is_surge = current_volume > avg_volume
+    # Calculate percentage increase
+    percent_increase = ((current_volume - avg_volume) / avg_volume) * 100
 
-        return is_surge, current_volume, avg_volume, previous_volumes, percent_increase
+    # Check if current volume is higher than all previous 10 days
+    is_surge = current_volume > avg_volume
 
-    except Exception as e:
-        print(f"Error checking volume for {ticker_symbol}: {str(e)}")
-        return False, 0, 0, 0, 0
+    return (
+        is_surge,
+        current_volume,
+        avg_volume,
+        previous_volumes,
+        percent_increase,
+    )
+
+
+def volume_surges_panel(panel, window=10):
+    """
+    Volume surge statistics for every symbol of a panel at once.
+
+    Args:
+        panel (PricePanel): Bars of many symbols
+        window (int): Number of previous bars in the average
+
+    Returns:
+        pandas.DataFrame: current_volume, avg_volume, percent_increase and
+            is_surge per symbol, indexed by symbol
+    """
+    volume = panel.volume
+    current_volume = volume[:, -1]
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        avg_volume = np.nanmean(volume[:, -window - 1 : -1], axis=1)
+        percent_increase = (current_volume - avg_volume) / avg_volume * 100
+
+    return pd.DataFrame(
+        {
+            "current_volume": current_volume,
+            "avg_volume": avg_volume,
+            "percent_increase": percent_increase,
+            "is_surge": current_volume > avg_volume,
+        },
+        index=pd.Index(panel.symbols, name="ticker"),
+    )
 
 
 def get_stocks(file_name):
@@ -95,31 +155,16 @@ def get_stocks_from_json(index_name):
     Returns:
         list: List of stock symbols
     """
-    try:
-        with open("data/nifty_indices.json", "r") as f:
-            indices_data = json.load(f)
-
-        if index_name.lower() in indices_data:
-            return indices_data[index_name.lower()]
-        else:
-            print(f"Index {index_name} not found in nifty_indices.json")
-            return []
-    except Exception as e:
-        print(f"Error loading nifty_indices.json: {str(e)}")
-        return []
+    symbols = get_symbol_master().index_symbols(index_name)
+    if not symbols:
+        print(f"Index {index_name} not found in nifty_indices.json")
+    return symbols
 
 
 def main():
-    # Load available indices
-    try:
-        with open("data/nifty_indices.json", "r") as f:
-            indices_data = json.load(f)
-
-        # Use nifty100 by default
-        index_name = "nifty100"
-        tickers = indices_data.get(index_name, [])
-    except Exception as e:
-        print(f"Error loading indices: {str(e)}")
+    # Use nifty100 by default
+    tickers = get_symbol_master().index_symbols("nifty100")
+    if not tickers:
         # Fallback to nifty100 CSV if JSON fails
         tickers = get_stocks("ind_nifty100list.csv")
 
@@ -148,14 +193,16 @@ def main():
     if surge_results:
         print("\nToday's Stocks:")
         print("-" * 80)
+        recent_patterns = get_recent_patterns_batch(
+            [result["ticker"] for result in surge_results]
+        )
         for result in surge_results:
             print(
                 f"{result['ticker']}: Volume surge detected! {result['percent_increase']:.2f}% above 10-day average. "
                 f"Current Volume: {result['current_volume']}, Average Volume: {int(result['avg_volume'])}"
             )
 
-            recent_patterns = get_recent_patterns(result["ticker"])
-            print_recent_patterns(recent_patterns)
+            print_recent_patterns(recent_patterns.get(result["ticker"], {}))
             print("\n" + "-" * 80 + "\n")
     else:
         print("No volume surges detected.")
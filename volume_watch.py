@@ -0,0 +1,260 @@
+"""
+Long-running watch mode for volume surges.
+
+Keeps a rolling window of daily volumes for every ticker in one compact
+ring buffer and updates surge state incrementally as new bars arrive, so a
+poll only touches the latest bar of each ticker instead of re-scanning the
+whole history.
+"""
+
+import argparse
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+from symbol_master import get_symbol_master
+
+
+class VolumeRingBuffer:
+    """Fixed-size rolling volume windows for many tickers in a single array."""
+
+    def __init__(self, tickers, window=10):
+        """
+        Args:
+            tickers (list): Ticker symbols tracked by the buffer
+            window (int): Number of completed bars kept per ticker
+        """
+        self.tickers = list(tickers)
+        self.window = window
+        self.rows = {ticker: i for i, ticker in enumerate(self.tickers)}
+
+        n = len(self.tickers)
+        self.history = np.zeros((n, window), dtype=np.float64)
+        self.position = np.zeros(n, dtype=np.intp)
+        self.count = np.zeros(n, dtype=np.intp)
+        self.total = np.zeros(n, dtype=np.float64)
+
+        # The bar currently being formed (today's volume while the market is open)
+        self.current = np.zeros(n, dtype=np.float64)
+        self.last_date = np.full(n, np.datetime64("NaT"), dtype="datetime64[D]")
+
+    def push(self, rows, volumes):
+        """Append completed-bar volumes for the given rows, evicting the oldest."""
+        rows = np.asarray(rows, dtype=np.intp)
+        if rows.size == 0:
+            return
+        slots = self.position[rows]
+        self.total[rows] += volumes - self.history[rows, slots]
+        self.history[rows, slots] = volumes
+        self.position[rows] = (slots + 1) % self.window
+        self.count[rows] = np.minimum(self.count[rows] + 1, self.window)
+
+    def update(self, dates, volumes):
+        """
+        Apply one bar per ticker.
+
+        A bar dated after the ticker's current bar completes the current bar
+        (it is pushed into the window) and starts a new one. A bar with the
+        same date replaces the current bar's volume, which is how intraday
+        polls of today's daily bar are absorbed. Older bars and missing
+        values (NaT dates or NaN volumes) are ignored.
+
+        Args:
+            dates (np.ndarray): datetime64[D] bar dates aligned with tickers
+            volumes (np.ndarray): Bar volumes aligned with tickers
+        """
+        dates = np.asarray(dates, dtype="datetime64[D]")
+        volumes = np.asarray(volumes, dtype=np.float64)
+        valid = ~np.isnat(dates) & ~np.isnan(volumes)
+
+        unseeded = valid & np.isnat(self.last_date)
+        newer = valid & ~unseeded & (dates > self.last_date)
+        same = valid & ~unseeded & (dates == self.last_date)
+
+        rolled = np.flatnonzero(newer)
+        self.push(rolled, self.current[rolled])
+
+        changed = unseeded | newer | same
+        self.current[changed] = volumes[changed]
+        self.last_date[unseeded | newer] = dates[unseeded | newer]
+
+    def average(self):
+        """Average volume of each ticker's completed bars (NaN when empty)."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(self.count > 0, self.total / self.count, np.nan)
+
+    def previous_volumes(self, ticker):
+        """Completed-bar volumes of one ticker, oldest first."""
+        row = self.rows[ticker]
+        count = self.count[row]
+        order = (self.position[row] - count + np.arange(count)) % self.window
+        return pd.Series(self.history[row, order])
+
+
+def fetch_volume_bars(tickers, period="5d", interval="1d"):
+    """
+    Download recent volume bars for many tickers in one request.
+
+    Args:
+        tickers (list): Ticker symbols (e.g. 'INFY.NS')
+        period (str): Time period to download (default: '5d')
+        interval (str): Data interval (default: '1d')
+
+    Returns:
+        pandas.DataFrame: Volumes indexed by date with one column per ticker
+    """
+    data = yf.download(
+        tickers,
+        period=period,
+        interval=interval,
+        group_by="column",
+        progress=False,
+        threads=True,
+    )
+    if data is None or data.empty:
+        return pd.DataFrame(columns=tickers, dtype=np.float64)
+
+    volumes = data["Volume"]
+    if isinstance(volumes, pd.Series):
+        volumes = volumes.to_frame(tickers[0])
+    return volumes.reindex(columns=tickers)
+
+
+class VolumeWatcher:
+    """Poll for new bars and report tickers whose surge status changed."""
+
+    def __init__(
+        self, tickers, surge_threshold=50, window=10, fetch=fetch_volume_bars
+    ):
+        """
+        Args:
+            tickers (list): Ticker symbols to watch (e.g. 'INFY.NS')
+            surge_threshold (float): Minimum % increase over the average
+            window (int): Number of previous bars in the average
+            fetch (callable): Returns a dates x tickers volume DataFrame
+        """
+        self.tickers = list(tickers)
+        self.surge_threshold = surge_threshold
+        self.fetch = fetch
+        self.buffer = VolumeRingBuffer(self.tickers, window=window)
+        self.is_surge = np.zeros(len(self.tickers), dtype=bool)
+        self.seeded = False
+
+    def _apply(self, volumes):
+        """Feed a dates x tickers volume frame into the ring buffer."""
+        if volumes.empty:
+            return
+        volumes = volumes.reindex(columns=self.tickers)
+        dates = pd.DatetimeIndex(volumes.index).tz_localize(None)
+        dates = dates.values.astype("datetime64[D]")
+        values = volumes.to_numpy(dtype=np.float64)
+
+        # Skip rows every ticker has already moved past
+        oldest = self.buffer.last_date.min()
+        for date, row in zip(dates, values):
+            if not np.isnat(oldest) and date < oldest:
+                continue
+            self.buffer.update(np.full(len(self.tickers), date), row)
+
+    def seed(self, period="1mo"):
+        """Fill the rolling windows from recent history."""
+        self._apply(self.fetch(self.tickers, period=period))
+        self.is_surge, _ = self._evaluate()
+        self.seeded = True
+
+    def _evaluate(self):
+        """Return the surge flags and % increase of every ticker."""
+        average = self.buffer.average()
+        with np.errstate(invalid="ignore", divide="ignore"):
+            percent = (self.buffer.current - average) / average * 100
+        is_surge = (
+            (self.buffer.current > average)
+            & (percent > self.surge_threshold)
+            & np.isfinite(percent)
+        )
+        return is_surge, percent
+
+    def results(self, rows=None):
+        """Build result dicts in the same shape as the one-shot scanner."""
+        _, percent = self._evaluate()
+        average = self.buffer.average()
+        rows = range(len(self.tickers)) if rows is None else rows
+        return [
+            {
+                "ticker": self.tickers[i],
+                "is_surge": bool(self.is_surge[i]),
+                "percent_increase": float(percent[i]),
+                "current_volume": float(self.buffer.current[i]),
+                "avg_volume": float(average[i]),
+                "previous_volumes": self.buffer.previous_volumes(
+                    self.tickers[i]
+                ),
+            }
+            for i in rows
+        ]
+
+    def surges(self):
+        """Results for every ticker currently in a surge, largest first."""
+        results = self.results(np.flatnonzero(self.is_surge))
+        results.sort(key=lambda x: x["percent_increase"], reverse=True)
+        return results
+
+    def poll(self, period="5d"):
+        """
+        Fetch the latest bars and update surge state.
+
+        Returns:
+            list: Result dicts for tickers whose surge status changed
+        """
+        if not self.seeded:
+            self.seed()
+            return self.surges()
+
+        self._apply(self.fetch(self.tickers, period=period))
+        is_surge, _ = self._evaluate()
+        changed = np.flatnonzero(is_surge != self.is_surge)
+        self.is_surge = is_surge
+        return self.results(changed)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Watch an index for volume surges and print changes."
+    )
+    parser.add_argument("--index", default="nifty100", help="Index to watch")
+    parser.add_argument(
+        "--threshold", type=float, default=50, help="Surge threshold in %%"
+    )
+    parser.add_argument(
+        "--interval", type=int, default=60, help="Seconds between polls"
+    )
+    args = parser.parse_args()
+
+    tickers = get_symbol_master().index_symbols(args.index, ".NS")
+
+    if not tickers:
+        print(f"Index {args.index} not found in nifty_indices.json")
+        return
+
+    watcher = VolumeWatcher(tickers, surge_threshold=args.threshold)
+    print(f"Watching {len(tickers)} tickers every {args.interval}s...")
+
+    while True:
+        changes = watcher.poll()
+        stamp = datetime.now().strftime("%H:%M:%S")
+        for result in changes:
+            status = "SURGE" if result["is_surge"] else "cleared"
+            print(
+                f"[{stamp}] {result['ticker']}: {status} "
+                f"{result['percent_increase']:.2f}% vs average "
+                f"(Current Volume: {result['current_volume']:,.0f}, "
+                f"Average Volume: {result['avg_volume']:,.0f})"
+            )
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()